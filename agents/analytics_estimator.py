@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime, timedelta
@@ -89,18 +90,31 @@ class AnalyticsEstimator(BaseAgent):
         # Analyze historical patterns
         historical_insights = self._analyze_historical_data(historical_data, project_type)
         
+        # Shared across every agent on the project as a stable prompt prefix
+        shared_brief = self._share_project_context('project brief', brief)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('deliverables', deliverables, priority=4),
+            PromptSection('constraints', constraints, priority=3),
+            PromptSection('timeline', timeline, priority=3),
+            PromptSection('complexity_analysis', complexity_analysis, priority=2),
+            PromptSection('historical_insights', historical_insights, priority=0),
+            PromptSection('team_info', team_info, priority=2)
+        ])
+        
         # Use AI to generate comprehensive analysis
         ai_prompt = f"""
         Analyze the following project brief and provide data-driven predictions for effort, timeline, and costs:
 
-        Project Brief: {json.dumps(brief, indent=2)}
+        Project Brief: {shared_brief.reference}
         Project Type: {project_type}
-        Deliverables: {json.dumps(deliverables, indent=2)}
-        Constraints: {json.dumps(constraints, indent=2)}
-        Timeline Requirements: {json.dumps(timeline, indent=2)}
-        Complexity Analysis: {json.dumps(complexity_analysis, indent=2)}
-        Historical Insights: {json.dumps(historical_insights, indent=2)}
-        Team Information: {json.dumps(team_info, indent=2)}
+        Deliverables: {prompt_context['deliverables']}
+        Constraints: {prompt_context['constraints']}
+        Timeline Requirements: {prompt_context['timeline']}
+        Complexity Analysis: {prompt_context['complexity_analysis']}
+        Historical Insights: {prompt_context['historical_insights']}
+        Team Information: {prompt_context['team_info']}
 
         Please provide a JSON response with the following analytics structure:
         {{
@@ -226,10 +240,12 @@ class AnalyticsEstimator(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(
+            ai_prompt, shared_context=shared_brief, response_mime_type="application/json"
+        )
         
         try:
-            analytics_report = json.loads(ai_response)
+            analytics_report = self._parse_json_response(ai_response)
             
             # Enhance with statistical analysis
             analytics_report['statistical_analysis'] = self._perform_statistical_analysis(
@@ -722,5 +738,7 @@ class AnalyticsEstimator(BaseAgent):
             'analysis_types': ['complexity_analysis', 'statistical_analysis', 'scenario_analysis'],
             'features': ['predictive_modeling', 'risk_assessment', 'cost_benefit_analysis'],
             'supported_project_types': list(self.historical_patterns.keys()),
+            'cacheable': True,
+            'result_cache_ttl': 900,
             'version': '1.0.0'
         }
@@ -1,5 +1,6 @@
 from core.base_agent import BaseAgent
-from typing import Dict, Any, List
+from utils.token_budget import PromptSection
+from typing import Dict, Any, List, Optional
 import json
 from datetime import datetime
 import os
@@ -76,7 +77,8 @@ class AssetValidator(BaseAgent):
         Validate deliverables against brief requirements
         
         Args:
-            input_data: Dictionary containing 'assets', 'brief', 'validation_criteria'
+            input_data: Dictionary containing 'assets', 'brief', 'validation_criteria',
+                and optionally 'model_classification' to add a model quality review per asset
             
         Returns:
             Dictionary with validation results and recommendations
@@ -102,19 +104,35 @@ class AssetValidator(BaseAgent):
         # Validate each asset
         validation_results = []
         
-        for asset in assets:
-            asset_result = await self._validate_single_asset(asset, deliverables, project_type, validation_criteria)
+        # Opt-in model quality review of every asset in a few packed calls
+        if input_data.get('model_classification', False):
+            quality_reviews = await self._review_asset_quality(assets, project_type)
+        else:
+            quality_reviews = [None] * len(assets)
+        
+        for asset, quality_review in zip(assets, quality_reviews):
+            asset_result = await self._validate_single_asset(asset, deliverables, project_type, validation_criteria, quality_review)
             validation_results.append(asset_result)
         
+        # Shared across every agent on the project as a stable prompt prefix
+        shared_brief = self._share_project_context('project brief', brief)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('deliverables', deliverables, priority=3),
+            PromptSection('validation_results', validation_results, priority=4),
+            PromptSection('validation_criteria', validation_criteria, priority=2)
+        ])
+        
         # Generate comprehensive validation report
         ai_prompt = f"""
         Analyze the following asset validation results and provide a comprehensive quality assurance report:
 
-        Project Brief: {json.dumps(brief, indent=2)}
-        Deliverables Required: {json.dumps(deliverables, indent=2)}
-        Asset Validation Results: {json.dumps(validation_results, indent=2)}
+        Project Brief: {shared_brief.reference}
+        Deliverables Required: {prompt_context['deliverables']}
+        Asset Validation Results: {prompt_context['validation_results']}
         Project Type: {project_type}
-        Validation Criteria: {json.dumps(validation_criteria, indent=2)}
+        Validation Criteria: {prompt_context['validation_criteria']}
 
         Please provide a JSON response with the following QA report structure:
         {{
@@ -206,10 +224,12 @@ class AssetValidator(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(
+            ai_prompt, shared_context=shared_brief, response_mime_type="application/json"
+        )
         
         try:
-            qa_report = json.loads(ai_response)
+            qa_report = self._parse_json_response(ai_response)
             
             # Enhance with additional analysis
             qa_report['detailed_metrics'] = self._generate_detailed_metrics(validation_results)
@@ -231,7 +251,35 @@ class AssetValidator(BaseAgent):
             self.logger.warning("AI response wasn't valid JSON, using fallback validation")
             return self._fallback_validation_report(validation_results, brief)
     
-    async def _validate_single_asset(self, asset: Dict[str, Any], deliverables: List[Dict], project_type: str, criteria: Dict[str, Any]) -> Dict[str, Any]:
+    async def _review_asset_quality(self, assets: List[Dict[str, Any]], project_type: str) -> List[Optional[Dict[str, Any]]]:
+        """Review asset metadata for quality problems, one result per asset (None where unavailable)"""
+        
+        try:
+            results = await self._generate_packed_ai_responses(
+                [
+                    {
+                        'filename': asset.get('filename', 'unknown'),
+                        'type': asset.get('type', 'unknown'),
+                        'format': asset.get('format', 'unknown'),
+                        'size': asset.get('size', 'unknown'),
+                        'dimensions': asset.get('dimensions', 'unknown')
+                    }
+                    for asset in assets
+                ],
+                f"Review each asset's metadata for quality problems in a {project_type} project "
+                f"(resolution, dimensions, format suitability, file size).",
+                {'status': 'pass/warning/fail', 'details': 'One sentence explaining the status'},
+                validator=lambda result: result['status'] in ('pass', 'warning', 'fail'),
+                task='classification'
+            )
+        except Exception as e:
+            self.logger.warning(f"Asset quality review failed, using basic checks: {str(e)}")
+            return [None] * len(assets)
+        
+        return [result['data'] if result['success'] else None for result in results]
+    
+    async def _validate_single_asset(self, asset: Dict[str, Any], deliverables: List[Dict], project_type: str, criteria: Dict[str, Any],
+                                     quality_review: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Validate a single asset against requirements"""
         
         asset_name = asset.get('filename', 'unknown')
@@ -253,7 +301,7 @@ class AssetValidator(BaseAgent):
         }
         
         # Technical validation
-        technical_score = await self._perform_technical_validation(asset, asset_type)
+        technical_score = await self._perform_technical_validation(asset, asset_type, quality_review)
         validation_result['technical_checks'] = technical_score
         
         # Requirements validation
@@ -273,7 +321,8 @@ class AssetValidator(BaseAgent):
         
         return validation_result
     
-    async def _perform_technical_validation(self, asset: Dict[str, Any], asset_type: str) -> Dict[str, Any]:
+    async def _perform_technical_validation(self, asset: Dict[str, Any], asset_type: str,
+                                            quality_review: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Perform technical validation of asset"""
         
         technical_checks = {
@@ -308,8 +357,11 @@ class AssetValidator(BaseAgent):
         else:
             technical_checks['size_check'] = {'status': 'unknown', 'details': 'Could not determine file size'}
         
-        # Quality check (would require actual file analysis in real implementation)
-        technical_checks['quality_check'] = {'status': 'pass', 'details': 'Basic quality check passed'}
+        # Quality check from the model review of the asset metadata, when available
+        if quality_review:
+            technical_checks['quality_check'] = {'status': quality_review['status'], 'details': quality_review['details']}
+        else:
+            technical_checks['quality_check'] = {'status': 'pass', 'details': 'Basic quality check passed'}
         
         # Calculate technical score
         passes = sum(1 for check in technical_checks.values() if isinstance(check, dict) and check.get('status') == 'pass')
@@ -511,5 +563,7 @@ class AssetValidator(BaseAgent):
             'supported_formats': ['images', 'documents', 'web_files', 'design_files'],
             'validation_types': ['technical', 'design', 'content', 'functionality'],
             'features': ['automated_fixes', 'compliance_checking', 'quality_scoring'],
+            'cacheable': True,
+            'result_cache_ttl': 900,
             'version': '1.0.0'
         }
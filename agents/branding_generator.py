@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime
@@ -65,14 +66,24 @@ class BrandingGenerator(BaseAgent):
         # Analyze brief to determine brand direction
         brand_analysis = self._analyze_brand_direction(brief, target_audience)
         
+        # Shared across every agent on the project as a stable prompt prefix
+        shared_brief = self._share_project_context('project brief', brief)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('target_audience', target_audience, priority=3),
+            PromptSection('brand_analysis', brand_analysis, priority=3),
+            PromptSection('brand_preferences', brand_preferences, priority=4)
+        ])
+        
         # Generate comprehensive brand kit using AI
         ai_prompt = f"""
         Create a comprehensive brand kit based on the following information:
 
-        Project Brief: {json.dumps(brief, indent=2)}
-        Target Audience: {json.dumps(target_audience, indent=2)}
-        Brand Analysis: {json.dumps(brand_analysis, indent=2)}
-        Client Preferences: {json.dumps(brand_preferences, indent=2)}
+        Project Brief: {shared_brief.reference}
+        Target Audience: {prompt_context['target_audience']}
+        Brand Analysis: {prompt_context['brand_analysis']}
+        Client Preferences: {prompt_context['brand_preferences']}
 
         Please provide a JSON response with the following comprehensive brand kit structure:
         {{
@@ -206,10 +217,12 @@ class BrandingGenerator(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(
+            ai_prompt, shared_context=shared_brief, response_mime_type="application/json"
+        )
         
         try:
-            brand_kit = json.loads(ai_response)
+            brand_kit = self._parse_json_response(ai_response)
             
             # Enhance with additional components
             brand_kit['templates'] = self._generate_brand_templates(brand_kit)
@@ -532,5 +545,7 @@ class BrandingGenerator(BaseAgent):
             'features': ['brand_archetypes', 'color_psychology', 'typography_pairing'],
             'supported_archetypes': list(self.brand_archetypes.keys()),
             'template_types': ['business_cards', 'letterhead', 'social_media', 'presentations'],
+            'cacheable': True,
+            'result_cache_ttl': 1800,
             'version': '1.0.0'
         }
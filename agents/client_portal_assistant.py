@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime
@@ -22,6 +23,16 @@ class ClientPortalAssistant(BaseAgent):
             'general': 'General project questions'
         }
         
+        # Keywords for the rule-based query classification
+        self.query_keywords = {
+            'project_status': ['status', 'progress', 'how is', 'update', 'where are we'],
+            'deliverables': ['deliverable', 'files', 'final', 'receive', 'download'],
+            'billing': ['invoice', 'payment', 'cost', 'bill', 'price'],
+            'revisions': ['change', 'revision', 'modify', 'edit', 'different'],
+            'timeline': ['deadline', 'when', 'timeline', 'schedule', 'date'],
+            'general': []  # catch-all
+        }
+        
         # Response templates for common scenarios
         self.response_templates = {
             'project_update': {
@@ -73,6 +84,12 @@ class ClientPortalAssistant(BaseAgent):
         # Get relevant project information
         relevant_info = self._extract_relevant_info(project_data, query_classification)
         
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('relevant_info', relevant_info, priority=4),
+            PromptSection('context', context, priority=2)
+        ])
+        
         # Generate contextual response using AI
         ai_prompt = f"""
         You are a helpful AI assistant for a creative agency's client portal. 
@@ -84,10 +101,10 @@ class ClientPortalAssistant(BaseAgent):
         Client ID: {client_id}
         
         Relevant Project Information:
-        {json.dumps(relevant_info, indent=2)}
+        {prompt_context['relevant_info']}
         
         Project Context:
-        {json.dumps(context, indent=2)}
+        {prompt_context['context']}
 
         Please provide a JSON response with the following structure:
         {{
@@ -137,10 +154,10 @@ class ClientPortalAssistant(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(ai_prompt, response_mime_type="application/json")
         
         try:
-            portal_response = json.loads(ai_response)
+            portal_response = self._parse_json_response(ai_response)
             
             # Enhance response with additional context
             portal_response['query_metadata'] = {
@@ -169,20 +186,58 @@ class ClientPortalAssistant(BaseAgent):
     async def _classify_query(self, query: str) -> Dict[str, Any]:
         """Classify the type of client query"""
         
-        query_lower = query.lower()
+        return self._classify_query_keywords(query)
+    
+    async def classify_queries(self, queries: List[str], use_model: bool = False) -> List[Dict[str, Any]]:
+        """
+        Classify many client queries, e.g. to triage a support inbox
         
-        # Simple keyword-based classification (could be enhanced with ML)
-        classifications = {
-            'project_status': ['status', 'progress', 'how is', 'update', 'where are we'],
-            'deliverables': ['deliverable', 'files', 'final', 'receive', 'download'],
-            'billing': ['invoice', 'payment', 'cost', 'bill', 'price'],
-            'revisions': ['change', 'revision', 'modify', 'edit', 'different'],
-            'timeline': ['deadline', 'when', 'timeline', 'schedule', 'date'],
-            'general': []  # catch-all
-        }
+        Queries are classified by keyword rules. With use_model, the ones the
+        rules are not confident about are reclassified by the model in a few
+        packed calls.
+        
+        Args:
+            queries: Client queries
+            use_model: Reclassify low-confidence queries with the model
+            
+        Returns:
+            One classification per query, in input order
+        """
+        classifications = [self._classify_query_keywords(query) for query in queries]
+        uncertain = [index for index, classification in enumerate(classifications) if classification['confidence'] != 'high']
+        if not use_model or not uncertain:
+            return classifications
+        
+        query_types = list(self.query_types.keys())
+        type_guide = "\n".join(f"- {query_type}: {description}" for query_type, description in self.query_types.items())
+        try:
+            results = await self._generate_packed_ai_responses(
+                [queries[index] for index in uncertain],
+                f"Classify each client query by what the client is asking about:\n{type_guide}",
+                {'type': '/'.join(query_types), 'confidence': 'high/medium/low'},
+                validator=lambda result: result['type'] in query_types,
+                task='classification'
+            )
+        except Exception as e:
+            self.logger.warning(f"Model query classification failed, using keywords: {str(e)}")
+            return classifications
+        
+        for index, result in zip(uncertain, results):
+            if result['success']:
+                classifications[index].update(
+                    type=result['data']['type'],
+                    confidence=result['data']['confidence'],
+                    source='model'
+                )
+        return classifications
+    
+    def _classify_query_keywords(self, query: str) -> Dict[str, Any]:
+        """Keyword-based classification of a client query"""
+        
+        query_lower = query.lower()
         
         scores = {}
-        for query_type, keywords in classifications.items():
+        for query_type, keywords in self.query_keywords.items():
             score = sum(1 for keyword in keywords if keyword in query_lower)
             if score > 0:
                 scores[query_type] = score
@@ -197,7 +252,8 @@ class ClientPortalAssistant(BaseAgent):
         return {
             'type': best_match,
             'confidence': confidence,
-            'keywords_found': [k for k, v in scores.items() if v > 0]
+            'keywords_found': [k for k, v in scores.items() if v > 0],
+            'source': 'keywords'
         }
     
     def _extract_relevant_info(self, project_data: Dict[str, Any], query_classification: Dict[str, Any]) -> Dict[str, Any]:
@@ -413,5 +469,7 @@ class ClientPortalAssistant(BaseAgent):
             'supported_query_types': list(self.query_types.keys()),
             'features': ['query_classification', 'personalized_responses', 'proactive_suggestions'],
             'integrations': ['project_management', 'client_database', 'notification_system'],
+            'context_token_budget': 3000,
+            'latency_tier': 'fast',
             'version': '1.0.0'
         }
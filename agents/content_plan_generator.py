@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime, timedelta
@@ -107,16 +108,28 @@ class ContentPlanGenerator(BaseAgent):
         # Determine content strategy based on project type
         content_strategy = self._determine_content_strategy(project_type, goals, target_audience)
         
+        # Shared across every agent on the project as a stable prompt prefix
+        shared_brief = self._share_project_context('project brief', brief)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('content_prefs', content_prefs, priority=4),
+            PromptSection('timeline', timeline, priority=3),
+            PromptSection('content_strategy', content_strategy, priority=3),
+            PromptSection('target_audience', target_audience, priority=3),
+            PromptSection('brand_context', brand_context, priority=2)
+        ])
+        
         # Use AI to generate comprehensive content plan
         ai_prompt = f"""
         Create a comprehensive content plan based on the following information:
 
-        Project Brief: {json.dumps(brief, indent=2)}
-        Content Preferences: {json.dumps(content_prefs, indent=2)}
-        Timeline: {json.dumps(timeline, indent=2)}
-        Content Strategy: {json.dumps(content_strategy, indent=2)}
-        Target Audience: {json.dumps(target_audience, indent=2)}
-        Brand Context: {json.dumps(brand_context, indent=2)}
+        Project Brief: {shared_brief.reference}
+        Content Preferences: {prompt_context['content_prefs']}
+        Timeline: {prompt_context['timeline']}
+        Content Strategy: {prompt_context['content_strategy']}
+        Target Audience: {prompt_context['target_audience']}
+        Brand Context: {prompt_context['brand_context']}
 
         Please provide a JSON response with the following content plan structure:
         {{
@@ -226,10 +239,12 @@ class ContentPlanGenerator(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(
+            ai_prompt, shared_context=shared_brief, response_mime_type="application/json"
+        )
         
         try:
-            content_plan = json.loads(ai_response)
+            content_plan = self._parse_json_response(ai_response)
             
             # Enhance with detailed calendar
             content_plan['detailed_calendar'] = self._generate_detailed_calendar(content_plan)
@@ -592,5 +607,7 @@ class ContentPlanGenerator(BaseAgent):
             'supported_content_types': list(self.content_types.keys()),
             'supported_channels': list(self.channel_specs.keys()),
             'features': ['seo_optimization', 'multi_channel_planning', 'performance_tracking'],
+            'cacheable': True,
+            'result_cache_ttl': 900,
             'version': '1.0.0'
         }
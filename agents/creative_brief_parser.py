@@ -106,10 +106,10 @@ class CreativeBriefParser(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(ai_prompt, response_mime_type="application/json")
         
         try:
-            structured_brief = json.loads(ai_response)
+            structured_brief = self._parse_json_response(ai_response)
             
             # Enhance with quick analysis findings
             self._merge_quick_analysis(structured_brief, quick_analysis)
@@ -358,5 +358,7 @@ class CreativeBriefParser(BaseAgent):
             'supported_input_types': ['email', 'chat', 'call_transcript', 'text'],
             'integrations': ['project_management', 'file_system'],
             'learning_features': ['project_type_recognition', 'clarity_improvement'],
+            'cacheable': True,
+            'result_cache_ttl': 1800,
             'version': '1.0.0'
         }
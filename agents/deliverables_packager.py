@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime
@@ -97,16 +98,24 @@ class DeliverablesPackager(BaseAgent):
         # Organize files according to project type
         file_organization = self._organize_files(assets, project_type, project_info)
         
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('project_info', project_info, priority=2),
+            PromptSection('assets', assets, priority=4),
+            PromptSection('file_organization', file_organization, priority=3),
+            PromptSection('packaging_prefs', packaging_prefs, priority=3)
+        ])
+        
         # Generate comprehensive delivery package using AI
         ai_prompt = f"""
         Create a comprehensive deliverables package for a creative project with the following information:
 
-        Project Information: {json.dumps(project_info, indent=2)}
+        Project Information: {prompt_context['project_info']}
         Client: {client_name}
         Project Type: {project_type}
-        Assets to Package: {json.dumps(assets, indent=2)}
-        File Organization: {json.dumps(file_organization, indent=2)}
-        Packaging Preferences: {json.dumps(packaging_prefs, indent=2)}
+        Assets to Package: {prompt_context['assets']}
+        File Organization: {prompt_context['file_organization']}
+        Packaging Preferences: {prompt_context['packaging_prefs']}
 
         Please provide a JSON response with the following delivery package structure:
         {{
@@ -208,10 +217,10 @@ class DeliverablesPackager(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(ai_prompt, response_mime_type="application/json")
         
         try:
-            packaging_plan = json.loads(ai_response)
+            packaging_plan = self._parse_json_response(ai_response)
             
             # Enhance with additional components
             packaging_plan['technical_specs'] = self._generate_technical_specs(file_organization)
@@ -80,11 +80,11 @@ class MeetingNotesProcessor(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(ai_prompt, response_mime_type="application/json")
         
         try:
             # Parse AI response
-            structured_data = json.loads(ai_response)
+            structured_data = self._parse_json_response(ai_response)
             
             # Enhance with quick actions found
             if quick_actions:
@@ -193,6 +193,8 @@ class MeetingNotesProcessor(BaseAgent):
             'outputs': ['action_items', 'decisions', 'summary', 'follow_ups'],
             'integrations': ['jira', 'slack', 'notion'],
             'learning_features': ['team_preferences', 'accuracy_improvement'],
+            'cacheable': True,
+            'result_cache_ttl': 1800,
             'version': '1.0.0'
         }
     
@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime, timedelta
@@ -73,18 +74,31 @@ class ProposalGenerator(BaseAgent):
         template_func = self.proposal_templates.get(project_type, self.proposal_templates['general'])
         base_proposal = template_func(brief, pricing_prefs)
         
+        # Shared across every agent on the project as a stable prompt prefix
+        shared_brief = self._share_project_context('project brief', brief)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('deliverables', deliverables, priority=4),
+            PromptSection('timeline', timeline, priority=3),
+            PromptSection('budget', constraints.get('budget', 'Not specified'), priority=4),
+            PromptSection('company_info', company_info, priority=2),
+            PromptSection('pricing_prefs', pricing_prefs, priority=3),
+            PromptSection('base_proposal', base_proposal, priority=2)
+        ])
+        
         # Use AI to enhance and customize proposal
         ai_prompt = f"""
         Create a professional proposal based on the following creative brief:
 
-        Project Brief: {json.dumps(brief, indent=2)}
-        Deliverables: {json.dumps(deliverables, indent=2)}
-        Timeline: {json.dumps(timeline, indent=2)}
-        Budget Constraints: {json.dumps(constraints.get('budget', 'Not specified'), indent=2)}
-        Company Info: {json.dumps(company_info, indent=2)}
-        Pricing Preferences: {json.dumps(pricing_prefs, indent=2)}
+        Project Brief: {shared_brief.reference}
+        Deliverables: {prompt_context['deliverables']}
+        Timeline: {prompt_context['timeline']}
+        Budget Constraints: {prompt_context['budget']}
+        Company Info: {prompt_context['company_info']}
+        Pricing Preferences: {prompt_context['pricing_prefs']}
 
-        Base Proposal Structure: {json.dumps(base_proposal, indent=2)}
+        Base Proposal Structure: {prompt_context['base_proposal']}
 
         Please enhance this proposal and provide a JSON response with the following structure:
         {{
@@ -188,10 +202,12 @@ class ProposalGenerator(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(
+            ai_prompt, shared_context=shared_brief, response_mime_type="application/json"
+        )
         
         try:
-            enhanced_proposal = json.loads(ai_response)
+            enhanced_proposal = self._parse_json_response(ai_response)
             
             # Add additional components
             enhanced_proposal['risk_mitigation'] = self._generate_risk_mitigation(brief)
@@ -470,5 +486,8 @@ class ProposalGenerator(BaseAgent):
             'supported_project_types': ['website', 'branding', 'marketing', 'general'],
             'pricing_models': list(self.pricing_models.keys()),
             'features': ['risk_assessment', 'legal_compliance', 'contract_generation'],
+            'context_token_budget': 8000,
+            'cacheable': True,
+            'result_cache_ttl': 1800,
             'version': '1.0.0'
         }
@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime, timedelta
@@ -53,7 +54,8 @@ class SentimentAnalyzer(BaseAgent):
         Analyze sentiment from client communications
         
         Args:
-            input_data: Dictionary containing 'communications', 'client_id', 'context'
+            input_data: Dictionary containing 'communications', 'client_id', 'context',
+                and optionally 'model_classification' to refine keyword sentiment with the model
             
         Returns:
             Dictionary with sentiment analysis and recommended actions
@@ -78,15 +80,25 @@ class SentimentAnalyzer(BaseAgent):
             comm_analysis = await self._analyze_single_communication(comm, client_id, context)
             analyzed_communications.append(comm_analysis)
         
+        # Opt-in model sentiment for every message in a few packed calls
+        if input_data.get('model_classification', False):
+            await self._classify_communications(communications, analyzed_communications)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('context', context, priority=2),
+            PromptSection('analyzed_communications', analyzed_communications, priority=4)
+        ])
+        
         # Generate comprehensive sentiment report using AI
         ai_prompt = f"""
         Analyze the following client communications for sentiment patterns and provide actionable insights:
 
         Client ID: {client_id}
-        Communication Context: {json.dumps(context, indent=2)}
+        Communication Context: {prompt_context['context']}
         
         Individual Communication Analysis:
-        {json.dumps(analyzed_communications, indent=2)}
+        {prompt_context['analyzed_communications']}
 
         Please provide a JSON response with the following sentiment analysis structure:
         {{
@@ -169,10 +181,10 @@ class SentimentAnalyzer(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(ai_prompt, response_mime_type="application/json")
         
         try:
-            sentiment_report = json.loads(ai_response)
+            sentiment_report = self._parse_json_response(ai_response)
             
             # Enhance with additional analysis
             sentiment_report['historical_comparison'] = self._compare_with_historical_sentiment(client_id, sentiment_report)
@@ -243,6 +255,38 @@ class SentimentAnalyzer(BaseAgent):
         
         return sentiment_analysis
     
+    async def _classify_communications(self, communications: List[Dict[str, Any]], analyzed_communications: List[Dict[str, Any]]):
+        """Refine keyword sentiment with per-message model classification, packed into few calls"""
+        
+        def is_valid(result: Dict[str, Any]) -> bool:
+            return result['sentiment_label'] in self.sentiment_scale and 0 <= float(result['sentiment_score']) <= 100
+        
+        try:
+            results = await self._generate_packed_ai_responses(
+                [{'channel': comm.get('channel', 'email'), 'message': comm.get('message', '')} for comm in communications],
+                "Classify the sentiment of each client message.",
+                {
+                    'sentiment_score': 'Number from 0 (very negative) to 100 (very positive)',
+                    'sentiment_label': '/'.join(self.sentiment_scale.keys()),
+                    'urgency_level': 'high/medium/low'
+                },
+                validator=is_valid,
+                task='sentiment'
+            )
+        except Exception as e:
+            self.logger.warning(f"Model sentiment classification failed, keeping keyword scores: {str(e)}")
+            return
+        
+        for analysis, result in zip(analyzed_communications, results):
+            if not result['success']:
+                analysis['sentiment_source'] = 'keywords'
+                continue
+            analysis['keyword_sentiment_score'] = analysis['preliminary_sentiment_score']
+            analysis['preliminary_sentiment_score'] = float(result['data']['sentiment_score'])
+            analysis['preliminary_sentiment_label'] = result['data']['sentiment_label']
+            analysis['urgency_level'] = result['data']['urgency_level']
+            analysis['sentiment_source'] = 'model'
+    
     def _extract_concerns(self, message: str) -> List[str]:
         """Extract specific concerns from message"""
         
@@ -632,5 +676,6 @@ class SentimentAnalyzer(BaseAgent):
             'sentiment_scale': list(self.sentiment_scale.keys()),
             'features': ['trend_monitoring', 'automated_alerts', 'predictive_insights'],
             'analysis_types': ['individual_communication', 'aggregate_sentiment', 'historical_comparison'],
+            'latency_tier': 'fast',
             'version': '1.0.0'
         }
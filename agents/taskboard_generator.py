@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime, timedelta
@@ -55,25 +56,29 @@ class TaskboardGenerator(BaseAgent):
         
         # Extract project information
         project_type = brief.get('project_type', 'general').lower()
-        deliverables = brief.get('deliverables', [])
-        timeline = brief.get('timeline', {})
         
         # Generate base tasks using template
         template_func = self.project_templates.get(project_type, self.project_templates['general'])
         base_tasks = template_func(brief)
         
+        # Shared across every agent on the project as a stable prompt prefix
+        shared_brief = self._share_project_context('project brief', brief)
+        
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('base_tasks', base_tasks, priority=4)
+        ])
+        
         # Use AI to enhance and customize tasks
         ai_prompt = f"""
         Based on the following creative brief, enhance and customize the task list:
 
         Project Type: {project_type}
-        Brief Summary: {brief.get('goals', {}).get('primary', 'Not specified')}
-        Deliverables: {json.dumps(deliverables, indent=2)}
-        Timeline: {json.dumps(timeline, indent=2)}
+        Project Brief (goals, deliverables, timeline): {shared_brief.reference}
         Team Members: {', '.join(team_members) if team_members else 'Not specified'}
 
         Base Tasks Generated:
-        {json.dumps(base_tasks, indent=2)}
+        {prompt_context['base_tasks']}
 
         Please enhance this task list and provide a JSON response with the following structure:
         {{
@@ -126,10 +131,12 @@ class TaskboardGenerator(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(
+            ai_prompt, shared_context=shared_brief, response_mime_type="application/json"
+        )
         
         try:
-            enhanced_taskboard = json.loads(ai_response)
+            enhanced_taskboard = self._parse_json_response(ai_response)
             
             # Validate and enhance the taskboard
             self._validate_taskboard(enhanced_taskboard)
@@ -566,5 +573,7 @@ class TaskboardGenerator(BaseAgent):
             'supported_project_types': ['website', 'branding', 'marketing', 'general'],
             'integrations': ['jira', 'trello', 'notion'],
             'features': ['dependency_management', 'priority_optimization', 'resource_allocation'],
+            'cacheable': True,
+            'result_cache_ttl': 900,
             'version': '1.0.0'
         }
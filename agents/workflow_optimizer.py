@@ -1,4 +1,5 @@
 from core.base_agent import BaseAgent
+from utils.token_budget import PromptSection
 from typing import Dict, Any, List
 import json
 from datetime import datetime, timedelta
@@ -75,16 +76,26 @@ class WorkflowOptimizer(BaseAgent):
         # Analyze team performance patterns
         team_analysis = self._analyze_team_performance(team_metrics, workflow_history)
         
+        # Compact and trim context sections to the agent's token budget
+        prompt_context = self._fit_prompt_context([
+            PromptSection('project_data', project_data, priority=2),
+            PromptSection('team_metrics', team_metrics, priority=3),
+            PromptSection('workflow_history', workflow_history[-10:], priority=1),
+            PromptSection('workflow_analysis', workflow_analysis, priority=4),
+            PromptSection('bottleneck_analysis', bottleneck_analysis, priority=4),
+            PromptSection('team_analysis', team_analysis, priority=3)
+        ])
+        
         # Use AI to generate comprehensive optimization recommendations
         ai_prompt = f"""
         Analyze the following workflow data and provide actionable optimization recommendations:
 
-        Project Data: {json.dumps(project_data, indent=2)}
-        Team Metrics: {json.dumps(team_metrics, indent=2)}
-        Workflow History: {json.dumps(workflow_history[-10:], indent=2)}  # Last 10 entries
-        Current Workflow Analysis: {json.dumps(workflow_analysis, indent=2)}
-        Bottleneck Analysis: {json.dumps(bottleneck_analysis, indent=2)}
-        Team Performance Analysis: {json.dumps(team_analysis, indent=2)}
+        Project Data: {prompt_context['project_data']}
+        Team Metrics: {prompt_context['team_metrics']}
+        Workflow History: {prompt_context['workflow_history']}  # Last 10 entries
+        Current Workflow Analysis: {prompt_context['workflow_analysis']}
+        Bottleneck Analysis: {prompt_context['bottleneck_analysis']}
+        Team Performance Analysis: {prompt_context['team_analysis']}
 
         Please provide a JSON response with the following workflow optimization structure:
         {{
@@ -207,10 +218,10 @@ class WorkflowOptimizer(BaseAgent):
         }}
         """
         
-        ai_response = await self._generate_ai_response(ai_prompt)
+        ai_response = await self._generate_ai_response(ai_prompt, response_mime_type="application/json")
         
         try:
-            optimization_report = json.loads(ai_response)
+            optimization_report = self._parse_json_response(ai_response)
             
             # Enhance with additional analysis
             optimization_report['competitive_benchmarking'] = self._perform_competitive_analysis(workflow_analysis)
@@ -1,6 +1,6 @@
 import streamlit as st
 from core.agent_orchestrator import AgentOrchestrator
-from core.database import DatabaseManager
+from core.resources import get_database_manager
 import os
 
 # Configure page
@@ -13,7 +13,7 @@ st.set_page_config(
 
 # Initialize session state
 if 'db_manager' not in st.session_state:
-    st.session_state.db_manager = DatabaseManager()
+    st.session_state.db_manager = get_database_manager()
 
 if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
@@ -3,68 +3,81 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
-from utils.ai_client import AIClient
-from utils.config import Config
-
-# Import all agents
-from agents.meeting_notes_processor import MeetingNotesProcessor
-from agents.creative_brief_parser import CreativeBriefParser
-from agents.taskboard_generator import TaskboardGenerator
-from agents.branding_generator import BrandingGenerator
-from agents.proposal_generator import ProposalGenerator
-from agents.content_plan_generator import ContentPlanGenerator
-from agents.asset_validator import AssetValidator
-from agents.client_portal_assistant import ClientPortalAssistant
-from agents.deliverables_packager import DeliverablesPackager
-from agents.analytics_estimator import AnalyticsEstimator
-from agents.workflow_optimizer import WorkflowOptimizer
-from agents.sentiment_analyzer import SentimentAnalyzer
+from utils.config import config
+from utils.loop_runner import get_loop_runner
+from core.workflow_engine import WorkflowEngine
+from core.job_queue import JobQueue, get_job_queue, SUCCEEDED, ACTIVE_STATES
+from core.resources import get_ai_client, get_agent_registry, get_database_manager
+from core.session_context import SessionContext
+from core.event_bus import EventBus
+from core.result_store import AgentResultStore, get_result_store
 
 class AgentOrchestrator:
     """
     Central orchestrator for managing all AI agents and their interactions
+    
+    The AI client, database and agents are process-wide and shared by every
+    session; an orchestrator only carries its session's SessionContext
+    (agent memory and status) and event bus, so one per session is cheap.
     """
     
-    def __init__(self):
-        self.config = Config()
-        self.ai_client = AIClient()
-        self.agents = {}
-        self.message_queue = []
+    def __init__(self, session: SessionContext = None):
+        self.config = config
+        self.ai_client = get_ai_client()
+        self.session = session or SessionContext()
+        self.agents = None
+        self.loop_runner = get_loop_runner()
         self.logger = logging.getLogger(__name__)
         
-        # Initialize all agents
+        # Inter-agent messages, dispatched on the shared event loop
+        app_config = self.config.get_app_config()
+        self.event_bus = EventBus(
+            self.loop_runner,
+            max_queue=app_config['event_bus_queue_size'],
+            policy=app_config['event_bus_policy'],
+            history=app_config['event_bus_history']
+        )
+        self._agent_subscriptions = {}
+        
+        # Memoized results of cacheable agents, shared by every session
+        self.result_store = None
+        if app_config['result_cache_enabled']:
+            self.result_store = get_result_store(app_config['result_cache_entries'], app_config['result_cache_ttl'])
+        
+        # Shared agent registry; each agent is constructed on first use
         self._initialize_agents()
     
     def _initialize_agents(self):
-        """Initialize all 12 AI agents"""
-        try:
-            self.agents = {
-                'meeting_notes_processor': MeetingNotesProcessor(self.ai_client),
-                'creative_brief_parser': CreativeBriefParser(self.ai_client),
-                'taskboard_generator': TaskboardGenerator(self.ai_client),
-                'branding_generator': BrandingGenerator(self.ai_client),
-                'proposal_generator': ProposalGenerator(self.ai_client),
-                'content_plan_generator': ContentPlanGenerator(self.ai_client),
-                'asset_validator': AssetValidator(self.ai_client),
-                'client_portal_assistant': ClientPortalAssistant(self.ai_client),
-                'deliverables_packager': DeliverablesPackager(self.ai_client),
-                'analytics_estimator': AnalyticsEstimator(self.ai_client),
-                'workflow_optimizer': WorkflowOptimizer(self.ai_client),
-                'sentiment_analyzer': SentimentAnalyzer(self.ai_client)
-            }
-            self.logger.info("All agents initialized successfully")
-        except Exception as e:
-            self.logger.error(f"Error initializing agents: {str(e)}")
-            raise
+        """Attach the process-wide registry of all 12 AI agents"""
+        self.agents = get_agent_registry()
     
     def get_agent(self, agent_name: str):
-        """Get a specific agent by name"""
-        return self.agents.get(agent_name)
+        """Get a specific agent by name, bound to this session's agent state"""
+        return self.session.bind(self.agents.get(agent_name))
+    
+    def run_sync(self, coro, timeout: float = None):
+        """
+        Run a coroutine from synchronous code (pages, sync facades) on the
+        process-wide event loop thread instead of a fresh asyncio.run loop
+        
+        Args:
+            coro: Coroutine to run, e.g. agent.process(input_data)
+            timeout: Seconds to wait (default SYNC_CALL_TIMEOUT); the
+                coroutine is cancelled on expiry
+            
+        Returns:
+            Coroutine result
+        """
+        return self.loop_runner.run_sync(coro, timeout or self.config.get_app_config()['sync_call_timeout'])
     
     def get_agent_status(self) -> Dict[str, str]:
         """Get status of all agents"""
         status = {}
-        for name, agent in self.agents.items():
+        for name in self.agents.names():
+            if not self.agents.is_loaded(name):
+                status[name] = "idle"  # not constructed yet; loading it just to check would defeat lazy loading
+                continue
+            agent = self.agents.get(name)
             try:
                 # Check if agent is responsive
                 health = agent.health_check()
@@ -73,6 +86,43 @@ class AgentOrchestrator:
                 status[name] = "error"
         return status
     
+    async def _process(self, agent_name: str, agent, input_data: Dict[str, Any]):
+        """
+        Run agent.process, serving a memoized result when the agent is cacheable
+        
+        Args:
+            agent_name: Agent name
+            agent: Session view of the agent
+            input_data: Input for the agent
+            
+        Returns:
+            (agent result, True if it was served from the result store)
+        """
+        capabilities = agent.get_capabilities()
+        ttl = self.result_store.policy(capabilities) if self.result_store else None
+        if ttl is None:
+            return await agent.process(input_data), False
+        
+        key = AgentResultStore.make_key(
+            agent_name, capabilities.get('version', ''), input_data, capabilities.get('result_cache_ignore', ())
+        )
+        result, cached = await self.result_store.get_or_run(key, agent_name, ttl, lambda: agent.process(input_data))
+        if cached:
+            self.logger.info(f"Served memoized result for {agent_name}")
+        return result, cached
+    
+    def invalidate_agent_results(self, agent_name: str = None) -> int:
+        """
+        Drop memoized agent results, e.g. after data an agent reads has changed
+        
+        Args:
+            agent_name: Only this agent's results (default: all agents)
+            
+        Returns:
+            Number of results dropped
+        """
+        return self.result_store.invalidate(agent_name) if self.result_store else 0
+    
     async def execute_agent_task(self, agent_name: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a task using a specific agent"""
         try:
@@ -85,15 +135,17 @@ class AgentOrchestrator:
             task_data['request_id'] = self._generate_request_id()
             
             # Execute the task
-            result = await agent.process(task_data)
+            result, cached = await self._process(agent_name, agent, task_data)
             
             # Log the execution
-            self._log_agent_execution(agent_name, task_data, result)
+            if not cached:
+                self._log_agent_execution(agent_name, task_data, result)
             
             return {
                 'success': True,
                 'agent': agent_name,
                 'result': result,
+                'cached': cached,
                 'timestamp': task_data['timestamp'],
                 'request_id': task_data['request_id']
             }
@@ -107,8 +159,21 @@ class AgentOrchestrator:
                 'timestamp': datetime.now().isoformat()
             }
     
+    def _subscribe_agent(self, agent_name: str):
+        """Subscribe this session's view of an agent to its topic on first use"""
+        if agent_name in self._agent_subscriptions:
+            return
+        recipient_agent = self.get_agent(agent_name)
+        if not hasattr(recipient_agent, 'receive_message'):
+            return
+        self._agent_subscriptions[agent_name] = self.event_bus.subscribe(
+            f"agent.{agent_name}",
+            lambda message: recipient_agent.receive_message(message.payload),
+            name=agent_name
+        )
+    
     def route_message(self, from_agent: str, to_agent: str, message: Dict[str, Any]):
-        """Route messages between agents"""
+        """Route a message to an agent through the event bus; its handler runs asynchronously"""
         try:
             message_data = {
                 'from': from_agent,
@@ -118,44 +183,136 @@ class AgentOrchestrator:
                 'id': self._generate_request_id()
             }
             
-            self.message_queue.append(message_data)
-            self.logger.info(f"Message routed from {from_agent} to {to_agent}")
-            
-            # Process message immediately if recipient agent exists
             if to_agent in self.agents:
-                recipient_agent = self.agents[to_agent]
-                if hasattr(recipient_agent, 'receive_message'):
-                    recipient_agent.receive_message(message_data)
+                self._subscribe_agent(to_agent)
+                # Feedback may change what the agent produces; don't serve its old results
+                self.invalidate_agent_results(to_agent)
+            
+            self.event_bus.publish(f"agent.{to_agent}", message_data, sender=from_agent)
+            self.logger.info(f"Message routed from {from_agent} to {to_agent}")
             
         except Exception as e:
             self.logger.error(f"Error routing message: {str(e)}")
     
     async def execute_workflow(self, workflow_definition: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a multi-agent workflow"""
+        """
+        Execute a multi-agent workflow
+        
+        Steps declared with 'id' / 'inputs' / 'depends_on' form a graph: each
+        step starts as soon as the steps it depends on have succeeded, up to
+        the workflow concurrency cap, and receives only the outputs it names
+        in 'inputs'; a step whose agent reports success=False counts as
+        failed. Definitions without them run in order as before: each step
+        waits for the previous one to finish, and only a failed
+        orchestrator call counts as a failed step.
+        
+        The definition and each step's input hash and result are checkpointed
+        in the database, so a failed run can be retried with resume_workflow.
+        
+        Args:
+            workflow_definition: Dictionary with 'steps' and optional
+                'stop_on_error', 'max_concurrency' and 'fail_on_agent_error'
+                (count agent-reported failures in a legacy workflow too)
+            
+        Returns:
+            Dictionary with per-step results and timings, skipped steps and
+            the critical path
+        """
+        workflow_id = self._generate_request_id()
         try:
-            workflow_id = self._generate_request_id()
-            results = {}
-            
-            for step in workflow_definition.get('steps', []):
-                agent_name = step.get('agent')
-                task_data = step.get('data', {})
-                
-                # Add previous results to context if specified
-                if step.get('use_previous_results'):
-                    task_data['previous_results'] = results
-                
-                # Execute the step
-                step_result = await self.execute_agent_task(agent_name, task_data)
-                results[agent_name] = step_result
-                
-                # Check if step failed and handle according to workflow config
-                if not step_result.get('success') and workflow_definition.get('stop_on_error', True):
-                    break
+            store = self._get_checkpoint_store()
+        except Exception as e:
+            self.logger.warning(f"Workflow {workflow_id} will not be checkpointed: {str(e)}")
+            store = None
+        if store is not None and not await asyncio.to_thread(store.save_workflow, workflow_id, workflow_definition):
+            self.logger.warning(f"Workflow {workflow_id} will not be checkpointed")
+            store = None
+        return await self._run_workflow(workflow_id, workflow_definition, store, resume=False)
+    
+    async def resume_workflow(self, workflow_id: str, workflow_definition: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Re-run a checkpointed workflow, skipping the work that already succeeded
+        
+        A step whose input hash matches its stored checkpoint and which
+        succeeded before gets its stored result instead of calling the agent;
+        the others (failed, skipped, or with changed inputs) run again.
+        
+        Args:
+            workflow_id: Id returned by execute_workflow
+            workflow_definition: Replacement definition (default: the stored one);
+                steps whose input it changes are re-run
+            
+        Returns:
+            Same as execute_workflow, plus 'reused_steps' and 'saved'
+            (step time in milliseconds and prompt/completion tokens not spent again)
+        """
+        try:
+            store = self._get_checkpoint_store()
+            if store is None:
+                raise Exception("Workflow checkpointing is disabled or the database is unavailable")
+            workflow = await asyncio.to_thread(store.get_workflow, workflow_id)
+            if workflow is None:
+                raise ValueError(f"Workflow '{workflow_id}' not found")
+            if workflow_definition is not None:
+                if not await asyncio.to_thread(store.save_workflow, workflow_id, workflow_definition):
+                    raise Exception(f"Could not store the new definition of workflow '{workflow_id}'")
+            else:
+                workflow_definition = workflow['definition']
+                if not await asyncio.to_thread(store.update_workflow_status, workflow_id, 'running'):
+                    self.logger.warning(f"Could not mark workflow {workflow_id} as running")
+        except Exception as e:
+            self.logger.error(f"Error resuming workflow {workflow_id}: {str(e)}")
+            return {
+                'workflow_id': workflow_id,
+                'success': False,
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+        return await self._run_workflow(workflow_id, workflow_definition, store, resume=True)
+    
+    def _get_checkpoint_store(self):
+        """The database used for workflow checkpoints, or None when checkpointing is disabled"""
+        if not self.config.get_app_config()['workflow_checkpoints']:
+            return None
+        return get_database_manager()
+    
+    async def _run_workflow(self, workflow_id: str, workflow_definition: Dict[str, Any], store,
+                            resume: bool) -> Dict[str, Any]:
+        """Run a workflow through the engine and record its final status"""
+        try:
+            engine = WorkflowEngine(
+                self.execute_agent_task,
+                self.config.get_app_config()['workflow_max_concurrency'],
+                checkpoint_store=store
+            )
+            run = await engine.run(workflow_definition, workflow_id=workflow_id, resume=resume)
+            
+            saved = run['saved']
+            self.logger.info(
+                f"Workflow {workflow_id} finished in {run['wall_time_ms']:.0f}ms "
+                f"(steps total {run['total_step_time_ms']:.0f}ms, critical path {' -> '.join(run['critical_path'])})"
+                + (f"; reused {len(run['reused_steps'])} steps, saving {saved['time_ms']:.0f}ms and "
+                   f"{saved['prompt_tokens'] + saved['completion_tokens']} tokens" if resume else "")
+            )
+            
+            status = 'completed' if run['success'] else 'failed'
+            if store is not None and not await asyncio.to_thread(store.update_workflow_status, workflow_id, status):
+                self.logger.warning(f"Could not record status of workflow {workflow_id}")
             
             return {
                 'workflow_id': workflow_id,
                 'success': True,
-                'results': results,
+                'completed': run['success'],
+                'resumed': resume,
+                'results': run['results'],
+                'timings': run['timings'],
+                'failed_steps': run['failed_steps'],
+                'skipped': run['skipped'],
+                'critical_path': run['critical_path'],
+                'wall_time_ms': run['wall_time_ms'],
+                'total_step_time_ms': run['total_step_time_ms'],
+                'reused_steps': run['reused_steps'],
+                'saved': saved,
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -168,26 +325,125 @@ class AgentOrchestrator:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def check_ai_service(self) -> bool:
-        """Check if AI service is available"""
+    async def _execute_job(self, agent_name: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one background job; the job result is the agent's own result"""
+        outcome = await self.execute_agent_task(agent_name, task_data)
+        if not outcome['success']:
+            return {'success': False, 'error': outcome['error']}
+        return outcome['result']
+    
+    def _get_job_queue(self) -> JobQueue:
+        """Get the process-wide job queue, creating it (with database persistence) on first use"""
+        queue = get_job_queue()
+        if queue is not None:
+            return queue
+        
+        store = None
+        try:
+            store = get_database_manager()
+        except Exception as e:
+            self.logger.warning(f"Job state will not be persisted: {str(e)}")
+        # Jobs resumed after a restart have no submitting session; they run in a background one
+        background = AgentOrchestrator(SessionContext('background-jobs'))
+        return get_job_queue(background._execute_job, store, self.config.get_app_config()['job_workers'])
+    
+    def submit_job(self, agent_name: str, input_data: Dict[str, Any]) -> str:
+        """
+        Run an agent in the background worker pool
+        
+        Args:
+            agent_name: Agent to run
+            input_data: Input for the agent
+            
+        Returns:
+            Job id for get_job_status / cancel_job
+        """
+        if agent_name not in self.agents:
+            raise ValueError(f"Agent '{agent_name}' not found")
+        # Run with this session's executor so the job uses this session's agent state
+        return self._get_job_queue().submit(agent_name, input_data or {}, execute=self._execute_job)
+    
+    def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a background job's status, progress and result
+        
+        Args:
+            job_id: Job id from submit_job
+            
+        Returns:
+            Dictionary with 'status' (queued, running, succeeded, failed or
+            cancelled), 'progress' (0-1), 'progress_message', 'result' and
+            'error', or None if the job is unknown
+        """
+        return self._get_job_queue().get_job(job_id)
+    
+    def list_jobs(self, statuses: List[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """List recent background jobs from every session, newest first"""
+        return self._get_job_queue().list_jobs(statuses, limit)
+    
+    def cancel_job(self, job_id: str) -> bool:
+        """Cancel a queued or running background job; False if it already finished"""
+        return self._get_job_queue().cancel(job_id)
+    
+    def get_job_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a background job's outcome without waiting for it
+        
+        Pages submit a job, keep its id in session state and call this on
+        every rerun; the run itself continues in the worker pool across
+        reruns and disconnects.
+        
+        Args:
+            job_id: Job id from submit_job
+            
+        Returns:
+            The agent's result dictionary with the 'job_id' added once the
+            job has finished, None while it is queued or running
+        """
+        job = self.get_job_status(job_id)
+        
+        if job is None:
+            return {'success': False, 'error': 'Job was lost', 'job_id': job_id}
+        if job['status'] in ACTIVE_STATES:
+            return None
+        if job['status'] == SUCCEEDED:
+            return {**job['result'], 'job_id': job_id}
+        return {**(job.get('result') or {}), 'success': False, 'error': job.get('error'), 'job_id': job_id}
+    
+    def check_ai_service(self, force: bool = False) -> bool:
+        """Check if AI service is available (cached unless force is set)"""
         try:
-            return self.ai_client.health_check()
+            return self.ai_client.health_check(force=force)
         except Exception:
             return False
     
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get system performance metrics"""
         try:
+            event_bus_stats = self.event_bus.get_stats()
             metrics = {
                 'agents_count': len(self.agents),
+                'loaded_agents': len(self.agents.loaded_agents()),
+                'agent_load_times': self.agents.get_stats(),
+                'session': self.session.get_stats(),
                 'active_agents': len([a for a in self.get_agent_status().values() if a == 'active']),
-                'message_queue_size': len(self.message_queue),
+                'message_queue_size': event_bus_stats['queue_depth'],
+                'event_bus': event_bus_stats,
                 'ai_service_status': self.check_ai_service(),
+                'ai_health': self.ai_client.get_health_status(),
                 'timestamp': datetime.now().isoformat()
             }
             
+            if self.result_store is not None:
+                metrics['result_cache'] = self.result_store.get_stats()
+            
+            job_queue = get_job_queue()
+            if job_queue is not None:
+                metrics['jobs'] = job_queue.get_stats()
+            
             # Add agent-specific metrics
-            for name, agent in self.agents.items():
+            for name in self.agents.loaded_agents():
+                agent = self.get_agent(name)
                 if hasattr(agent, 'get_metrics'):
                     metrics[f'{name}_metrics'] = agent.get_metrics()
             
@@ -201,14 +457,14 @@ class AgentOrchestrator:
         import uuid
         return str(uuid.uuid4())[:8]
     
-    def process_with_agent(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process input using specified agent with comprehensive error handling"""
+    def process_with_agent(self, agent_name: str, input_data: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+        """Process input using specified agent with comprehensive error handling (sync facade over agent.process)"""
         start_time = datetime.now()
         
         try:
             # Validate agent exists
             if agent_name not in self.agents:
-                error_msg = f"Agent '{agent_name}' not found. Available agents: {list(self.agents.keys())}"
+                error_msg = f"Agent '{agent_name}' not found. Available agents: {self.agents.names()}"
                 self.logger.error(error_msg)
                 return {
                     'success': False,
@@ -223,7 +479,9 @@ class AgentOrchestrator:
                 self.logger.warning(f"Empty input data provided to agent {agent_name}")
                 input_data = {}
             
-            agent = self.agents[agent_name]
+            agent = self.get_agent(agent_name)
+            if agent is None:
+                raise Exception(f"Agent '{agent_name}' failed to initialize")
             
             # Check if agent is healthy/available
             if hasattr(agent, 'is_available') and not agent.is_available():
@@ -237,8 +495,10 @@ class AgentOrchestrator:
                     'retry_suggestion': 'Please try again in a few moments'
                 }
             
-            # Process with the agent
-            result = agent.process(input_data)
+            # Process with the agent on the shared event loop
+            result, cached = self.run_sync(self._process(agent_name, agent, input_data), timeout)
+            if isinstance(result, dict) and result.get('success') is False:
+                raise Exception(result.get('error') or f"Agent '{agent_name}' failed")
             
             # Log successful execution
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -259,6 +519,7 @@ class AgentOrchestrator:
                 'success': True,
                 'result': result,
                 'agent': agent_name,
+                'cached': cached,
                 'execution_time': execution_time,
                 'timestamp': datetime.now().isoformat()
             }
@@ -300,7 +561,7 @@ class AgentOrchestrator:
     
     def _suggest_similar_agents(self, agent_name: str) -> List[str]:
         """Suggest similar agent names in case of typos"""
-        available_agents = list(self.agents.keys())
+        available_agents = self.agents.names()
         suggestions = []
         
         # Simple similarity check
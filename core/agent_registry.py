@@ -0,0 +1,154 @@
+import sys
+import time
+import logging
+import importlib
+import threading
+from typing import Dict, Any, List, Optional, Iterable
+
+# Agent name -> "module:ClassName"; modules are imported on first use
+AGENT_PATHS = {
+    'meeting_notes_processor': 'agents.meeting_notes_processor:MeetingNotesProcessor',
+    'creative_brief_parser': 'agents.creative_brief_parser:CreativeBriefParser',
+    'taskboard_generator': 'agents.taskboard_generator:TaskboardGenerator',
+    'branding_generator': 'agents.branding_generator:BrandingGenerator',
+    'proposal_generator': 'agents.proposal_generator:ProposalGenerator',
+    'content_plan_generator': 'agents.content_plan_generator:ContentPlanGenerator',
+    'asset_validator': 'agents.asset_validator:AssetValidator',
+    'client_portal_assistant': 'agents.client_portal_assistant:ClientPortalAssistant',
+    'deliverables_packager': 'agents.deliverables_packager:DeliverablesPackager',
+    'analytics_estimator': 'agents.analytics_estimator:AnalyticsEstimator',
+    'workflow_optimizer': 'agents.workflow_optimizer:WorkflowOptimizer',
+    'sentiment_analyzer': 'agents.sentiment_analyzer:SentimentAnalyzer'
+}
+
+# Module -> milliseconds its first import took in this process (modules are process-wide)
+_import_times = {}
+_import_times_lock = threading.Lock()
+
+def _import_agent_class(path: str):
+    module_name, _, class_name = path.partition(':')
+    already_imported = module_name in sys.modules
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if not already_imported:
+        with _import_times_lock:
+            _import_times.setdefault(module_name, round((time.perf_counter() - started) * 1000, 2))
+    return getattr(module, class_name)
+
+class AgentRegistry:
+    """
+    Lazily constructed agents
+
+    Maps agent names to import paths; an agent's module is imported and the
+    agent constructed on its first get(), so a session only pays for the
+    agents its page actually uses. Selected agents can be warmed up in a
+    background thread.
+    """
+
+    def __init__(self, ai_client, agent_paths: Dict[str, str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.ai_client = ai_client
+        self.agent_paths = dict(agent_paths or AGENT_PATHS)
+
+        self._agents = {}
+        self._construct_times = {}  # agent name -> construction milliseconds
+        self._errors = {}  # agent name -> last construction error
+        self._agent_locks = {name: threading.Lock() for name in self.agent_paths}
+
+    def names(self) -> List[str]:
+        """All registered agent names, loaded or not"""
+        return list(self.agent_paths)
+
+    def __contains__(self, agent_name: str) -> bool:
+        return agent_name in self.agent_paths
+
+    def __len__(self) -> int:
+        return len(self.agent_paths)
+
+    def is_loaded(self, agent_name: str) -> bool:
+        """Whether the agent has been constructed"""
+        return agent_name in self._agents
+
+    def loaded_agents(self) -> Dict[str, Any]:
+        """Agents constructed so far, by name"""
+        return dict(self._agents)
+
+    def get(self, agent_name: str):
+        """
+        Get an agent, importing and constructing it on first use
+
+        Args:
+            agent_name: Registered agent name
+
+        Returns:
+            Agent instance, or None if unknown or it failed to construct
+        """
+        agent = self._agents.get(agent_name)
+        if agent is not None or agent_name not in self.agent_paths:
+            return agent
+
+        with self._agent_locks[agent_name]:
+            if agent_name in self._agents:
+                return self._agents[agent_name]
+            try:
+                agent_class = _import_agent_class(self.agent_paths[agent_name])
+                started = time.perf_counter()
+                agent = agent_class(self.ai_client)
+                self._construct_times[agent_name] = round((time.perf_counter() - started) * 1000, 2)
+            except Exception as e:
+                self.logger.error(f"Error initializing agent {agent_name}: {str(e)}")
+                self._errors[agent_name] = str(e)
+                return None
+            self._errors.pop(agent_name, None)
+            self._agents[agent_name] = agent
+            return agent
+
+    def warm_up(self, agent_names: Iterable[str] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Construct agents ahead of their first use
+
+        Args:
+            agent_names: Agents to load (default: all)
+            background: Load in a daemon thread instead of blocking
+
+        Returns:
+            The warm-up thread when loading in the background
+        """
+        names = [name for name in (agent_names or self.names()) if name in self.agent_paths and not self.is_loaded(name)]
+        unknown = [name for name in (agent_names or []) if name not in self.agent_paths]
+        if unknown:
+            self.logger.warning(f"Cannot warm up unknown agents: {unknown}")
+        if not names:
+            return None
+
+        def load():
+            for name in names:
+                self.get(name)
+            self.logger.info(f"Warmed up agents: {names}")
+
+        if not background:
+            load()
+            return None
+        thread = threading.Thread(target=load, name="agent-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-agent load statistics
+
+        Returns:
+            Dictionary of agent name to 'loaded', 'import_ms' (first import
+            of its module in this process; None if not imported here) and
+            'construct_ms', plus 'error' if construction failed
+        """
+        stats = {}
+        for name, path in self.agent_paths.items():
+            stats[name] = {
+                'loaded': self.is_loaded(name),
+                'import_ms': _import_times.get(path.partition(':')[0]),
+                'construct_ms': self._construct_times.get(name)
+            }
+            if name in self._errors:
+                stats[name]['error'] = self._errors[name]
+        return stats
@@ -1,9 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator, Iterator, List
 from datetime import datetime
+import json
 import logging
 import asyncio
 from utils.ai_client import AIClient
+from utils.token_budget import PromptSection
+from utils.metrics import agent_scope
+from utils.json_extract import extract_json
+from utils.context_store import SharedContext
+from core.job_queue import report_progress
+from core.session_context import AgentState
 
 class BaseAgent(ABC):
     """
@@ -14,11 +21,30 @@ class BaseAgent(ABC):
         self.ai_client = ai_client
         self.agent_name = agent_name
         self.logger = logging.getLogger(f"agent.{agent_name}")
-        self.status = "idle"
-        self.last_activity = None
-        self.memory = {}  # Agent memory for learning preferences
+        self._state = AgentState()  # replaced by session state in SessionContext.bind views
         self.message_handlers = {}
     
+    @property
+    def status(self) -> str:
+        return self._state.status
+    
+    @status.setter
+    def status(self, value: str):
+        self._state.status = value
+    
+    @property
+    def last_activity(self) -> Optional[datetime]:
+        return self._state.last_activity
+    
+    @last_activity.setter
+    def last_activity(self, value: Optional[datetime]):
+        self._state.last_activity = value
+    
+    @property
+    def memory(self) -> Dict[str, Any]:
+        """Agent memory for learning preferences (per session)"""
+        return self._state.memory
+    
     @abstractmethod
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -135,6 +161,10 @@ class BaseAgent(ABC):
             
             if message_type in self.message_handlers:
                 handler = self.message_handlers[message_type]
+                bound_to = getattr(handler, '__self__', None)
+                if isinstance(bound_to, BaseAgent) and bound_to is not self and bound_to.agent_name == self.agent_name:
+                    # Handlers registered in __init__ are bound to the shared agent; run them on this session view
+                    handler = handler.__func__.__get__(self)
                 handler(message_data)
             else:
                 self.logger.warning(f"No handler for message type: {message_type}")
@@ -181,20 +211,20 @@ class BaseAgent(ABC):
             'uptime': (datetime.now() - self.last_activity).total_seconds() if self.last_activity else 0
         }
     
-    async def _generate_ai_response(self, prompt: str, context: Dict[str, Any] = None) -> str:
+    def _build_ai_prompt(self, prompt: str, context: Dict[str, Any] = None, shared_context: SharedContext = None) -> str:
         """
-        Generate AI response using the configured AI client
+        Wrap a task prompt with the agent's role and context
         
         Args:
             prompt: The prompt to send to AI
             context: Additional context for the AI
+            shared_context: Shared project context, placed first as a stable prefix
             
         Returns:
-            AI-generated response
+            Full prompt text
         """
-        try:
-            # Add agent context to prompt
-            enhanced_prompt = f"""
+        prefix = shared_context.prefix if shared_context else ""
+        return f"""{prefix}
 You are {self.agent_name}, a specialized AI agent for creative workflow automation.
 
 Context: {context if context else 'No additional context provided'}
@@ -203,14 +233,192 @@ Task: {prompt}
 
 Please provide a detailed, actionable response that aligns with your role as {self.agent_name}.
 """
+    
+    def _with_latency_tier(self, generation_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Default the routing tier to the 'latency_tier' declared in get_capabilities"""
+        tier = self.get_capabilities().get('latency_tier')
+        if tier and 'model' not in generation_kwargs:
+            generation_kwargs.setdefault('latency_tier', tier)
+        return generation_kwargs
+    
+    def _share_project_context(self, name: str, content: Any, project_key: str = None) -> SharedContext:
+        """
+        Register content every agent on a project sends (e.g. the parsed brief)
+        as a shared prompt prefix
+        
+        Args:
+            name: What the content is, e.g. 'project brief'
+            content: Content to share; serialized canonically once per change
+            project_key: Project identity; derived from the content if omitted
+            
+        Returns:
+            SharedContext to pass to _generate_ai_response; reference its
+            .reference in the prompt instead of embedding the content
+        """
+        return self.ai_client.context_store.put(name, content, project_key)
+    
+    def _report_progress(self, fraction: float = None, message: str = None):
+        """
+        Report progress to the background job running this agent, if any
+        
+        Args:
+            fraction: Completed share, 0-1
+            message: Current stage, shown to the user while polling
+        """
+        report_progress(fraction, message)
+    
+    async def _generate_ai_response(self, prompt: str, context: Dict[str, Any] = None,
+                                    shared_context: SharedContext = None, **generation_kwargs) -> str:
+        """
+        Generate AI response using the configured AI client
+        
+        Args:
+            prompt: The prompt to send to AI
+            context: Additional context for the AI
+            shared_context: Shared project context from _share_project_context
+            **generation_kwargs: Passed to the AI client (temperature, max_tokens, use_cache,
+                latency_tier, task, similarity_threshold, ...)
+            
+        Returns:
+            AI-generated response
+        """
+        try:
+            # Add agent context to prompt
+            enhanced_prompt = self._build_ai_prompt(prompt, context, shared_context)
             
-            response = await self.ai_client.generate_response(enhanced_prompt)
+            self._report_progress(message="Waiting for the AI model")
+            with agent_scope(self.agent_name):
+                response = await self.ai_client.agenerate_response(enhanced_prompt, **self._with_latency_tier(generation_kwargs))
+            self._report_progress(message="Processing the AI response")
             return response
             
         except Exception as e:
             self.logger.error(f"AI response generation failed: {str(e)}")
             raise
     
+    async def _generate_packed_ai_responses(self, items: List[Any], instruction: str, output_schema: Dict[str, Any],
+                                            validator=None, **generation_kwargs) -> List[Dict[str, Any]]:
+        """
+        Apply one small instruction to many items in a few packed AI calls
+        
+        Args:
+            items: Items to process
+            instruction: What to do with each item
+            output_schema: Example result object; every key is required in each result
+            validator: Optional extra check per result
+            **generation_kwargs: Passed to the AI client (temperature, task, max_items, ...)
+            
+        Returns:
+            One record per item in input order with 'success' and 'data' or 'error'
+        """
+        with agent_scope(self.agent_name):
+            return await self.ai_client.agenerate_packed(
+                items, instruction, output_schema, validator, **self._with_latency_tier(generation_kwargs)
+            )
+    
+    async def _stream_ai_response(self, prompt: str, context: Dict[str, Any] = None, **generation_kwargs) -> AsyncIterator[str]:
+        """
+        Streaming variant of _generate_ai_response that yields text chunks as they arrive
+        
+        Args:
+            prompt: The prompt to send to AI
+            context: Additional context for the AI
+            **generation_kwargs: Passed to the AI client (temperature, max_tokens, use_cache,
+                latency_tier, task, ...)
+            
+        Yields:
+            AI-generated text chunks
+        """
+        enhanced_prompt = self._build_ai_prompt(prompt, context)
+        self.status = "processing"
+        
+        try:
+            with agent_scope(self.agent_name):
+                async for chunk in self.ai_client.agenerate_stream(enhanced_prompt, **self._with_latency_tier(generation_kwargs)):
+                    yield chunk
+            self.last_activity = datetime.now()
+            self.status = "idle"
+        except Exception as e:
+            self.status = "error"
+            self.logger.error(f"AI response streaming failed: {str(e)}")
+            raise
+    
+    def stream_ai_response(self, prompt: str, context: Dict[str, Any] = None, **generation_kwargs) -> Iterator[str]:
+        """
+        Blocking streaming generator for synchronous callers such as Streamlit's st.write_stream
+        
+        Args:
+            prompt: The prompt to send to AI
+            context: Additional context for the AI
+            **generation_kwargs: Passed to the AI client (temperature, max_tokens, use_cache,
+                latency_tier, task, ...)
+            
+        Yields:
+            AI-generated text chunks
+        """
+        enhanced_prompt = self._build_ai_prompt(prompt, context)
+        self.status = "processing"
+        
+        try:
+            with agent_scope(self.agent_name):
+                yield from self.ai_client.generate_stream(enhanced_prompt, **self._with_latency_tier(generation_kwargs))
+            self.last_activity = datetime.now()
+            self.status = "idle"
+        except Exception as e:
+            self.status = "error"
+            self.logger.error(f"AI response streaming failed: {str(e)}")
+            raise
+    
+    def _fit_prompt_context(self, sections: List[PromptSection], budget: int = None) -> Dict[str, str]:
+        """
+        Serialize prompt context sections compactly and trim them to the agent's token budget
+        
+        Args:
+            sections: Context sections to embed in the prompt
+            budget: Token budget; defaults to the 'context_token_budget' declared in
+                get_capabilities, then the AI client's default
+            
+        Returns:
+            Dictionary mapping section name to rendered text
+        """
+        budget = budget or self.get_capabilities().get('context_token_budget') or self.ai_client.context_token_budget
+        report = self.ai_client.fit_prompt_sections(sections, budget)
+        
+        if report['trimmed'] or report['dropped']:
+            self.logger.info(
+                f"Prompt context trimmed from {report['original_tokens']} to {report['total_tokens']} tokens "
+                f"(budget {budget}); trimmed={report['trimmed']}, dropped={report['dropped']}"
+            )
+        return report['sections']
+    
+    def _parse_json_response(self, ai_response: str) -> Any:
+        """
+        Parse a JSON AI response, tolerating code fences, surrounding prose,
+        trailing commas and truncated output
+        
+        Args:
+            ai_response: Raw AI response text
+            
+        Returns:
+            Parsed JSON object
+            
+        Raises:
+            json.JSONDecodeError: If no JSON object could be recovered (a bare
+                array or scalar counts as unusable)
+        """
+        extraction = extract_json(ai_response, prefer='{')
+        
+        if extraction['repairs']:
+            self.logger.info(f"Repaired AI JSON response: {', '.join(extraction['repairs'])}")
+        
+        if not extraction['success']:
+            raise json.JSONDecodeError(extraction['error'], ai_response or "", 0)
+        if not isinstance(extraction['data'], dict):
+            raise json.JSONDecodeError(
+                f"Expected a JSON object, got {type(extraction['data']).__name__}", ai_response or "", 0
+            )
+        return extraction['data']
+    
     def _validate_input(self, input_data: Dict[str, Any], required_fields: list) -> bool:
         """
         Validate input data has required fields
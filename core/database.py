@@ -1,11 +1,19 @@
 import os
 import logging
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
-from sqlalchemy import create_engine, text, MetaData, Table, Column, String, Text, DateTime, Boolean, Integer
+from sqlalchemy import create_engine, text, MetaData, Table, Column, String, Text, DateTime, Boolean, Integer, Float
 from sqlalchemy.exc import SQLAlchemyError
 import sqlite3
+from utils.config import config
+from utils.metrics import get_ai_metrics
+
+JOB_COLUMNS = ('id', 'agent_name', 'status', 'progress', 'progress_message', 'input_data',
+               'result', 'error', 'created_at', 'started_at', 'finished_at')
+
+WORKFLOW_STEP_COLUMNS = ('workflow_id', 'step_id', 'agent_name', 'input_hash', 'status', 'output',
+                         'duration_ms', 'prompt_tokens', 'completion_tokens', 'updated_at')
 
 class DatabaseManager:
     """
@@ -21,6 +29,9 @@ class DatabaseManager:
         # Initialize database connection
         self._initialize_connection()
         self._create_tables()
+        
+        # Persist AI usage metrics periodically (first manager in the process wins)
+        get_ai_metrics().start_periodic_flush(self.log_ai_metrics, config.get_ai_config().metrics_flush_interval)
     
     def _initialize_connection(self):
         """Initialize database connection (PostgreSQL or SQLite fallback)"""
@@ -132,6 +143,67 @@ class DatabaseManager:
                 Column('metadata', Text)
             )
             
+            # AI usage metrics table (one row per model or agent per flush window)
+            ai_usage_metrics_table = Table(
+                'ai_usage_metrics', self.metadata,
+                Column('id', String(50), primary_key=True),
+                Column('scope', String(20), nullable=False),  # model or agent
+                Column('name', String(100), nullable=False),
+                Column('window_start', DateTime),
+                Column('window_end', DateTime),
+                Column('requests', Integer, default=0),
+                Column('errors', Integer, default=0),
+                Column('error_types', Text),  # JSON field: error type -> count
+                Column('p50_ms', Integer),
+                Column('p95_ms', Integer),
+                Column('p99_ms', Integer),
+                Column('prompt_tokens', Integer, default=0),
+                Column('completion_tokens', Integer, default=0),
+                Column('cache_hits', Integer, default=0),
+                Column('fallbacks', Integer, default=0)
+            )
+            
+            # Background agent jobs (see core.job_queue)
+            agent_jobs_table = Table(
+                'agent_jobs', self.metadata,
+                Column('id', String(50), primary_key=True),
+                Column('agent_name', String(100), nullable=False),
+                Column('status', String(20), nullable=False),  # queued, running, succeeded, failed, cancelled
+                Column('progress', Float, default=0.0),  # 0-1
+                Column('progress_message', String(255)),
+                Column('input_data', Text),  # JSON field
+                Column('result', Text),  # JSON field
+                Column('error', Text),
+                Column('created_at', DateTime, default=datetime.utcnow),
+                Column('started_at', DateTime),
+                Column('finished_at', DateTime)
+            )
+            
+            # Workflow runs and their per-step checkpoints (see core.workflow_engine)
+            workflow_runs_table = Table(
+                'workflow_runs', self.metadata,
+                Column('id', String(50), primary_key=True),
+                Column('name', String(255)),
+                Column('definition', Text),  # JSON field
+                Column('status', String(20), nullable=False),  # running, completed, failed
+                Column('created_at', DateTime, default=datetime.utcnow),
+                Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+            )
+            
+            workflow_steps_table = Table(
+                'workflow_steps', self.metadata,
+                Column('workflow_id', String(50), primary_key=True),
+                Column('step_id', String(100), primary_key=True),
+                Column('agent_name', String(100)),
+                Column('input_hash', String(64)),  # sha256 of the step's task data
+                Column('status', String(20), nullable=False),  # succeeded, failed
+                Column('output', Text),  # JSON field: the orchestrator step result
+                Column('duration_ms', Float),
+                Column('prompt_tokens', Integer, default=0),
+                Column('completion_tokens', Integer, default=0),
+                Column('updated_at', DateTime, default=datetime.utcnow)
+            )
+            
             # Create all tables
             self.metadata.create_all(self.engine)
             self.logger.info("Database tables created successfully")
@@ -296,6 +368,337 @@ class DatabaseManager:
             self.logger.error(f"Error getting recent activity: {str(e)}")
             return []
     
+    def log_ai_metrics(self, rows: List[Dict[str, Any]]):
+        """Persist a flushed window of AI usage metrics (see AIMetrics.flush)"""
+        try:
+            records = []
+            for row in rows:
+                latency = row.get('latency', {})
+                records.append({
+                    'id': self._generate_id(),
+                    'scope': row['scope'],
+                    'name': row['name'],
+                    'window_start': row.get('window_start'),
+                    'window_end': row.get('window_end'),
+                    'requests': row.get('requests', 0),
+                    'errors': row.get('errors', 0),
+                    'error_types': json.dumps(row.get('error_types', {})),
+                    'p50_ms': latency.get('p50_ms'),
+                    'p95_ms': latency.get('p95_ms'),
+                    'p99_ms': latency.get('p99_ms'),
+                    'prompt_tokens': row.get('prompt_tokens', 0),
+                    'completion_tokens': row.get('completion_tokens', 0),
+                    'cache_hits': row.get('cache_hits', 0),
+                    'fallbacks': row.get('fallbacks', 0)
+                })
+            
+            if not records:
+                return
+            
+            with self.engine.connect() as conn:
+                conn.execute(
+                    text("""
+                        INSERT INTO ai_usage_metrics 
+                        (id, scope, name, window_start, window_end, requests, errors, error_types,
+                         p50_ms, p95_ms, p99_ms, prompt_tokens, completion_tokens, cache_hits, fallbacks)
+                        VALUES (:id, :scope, :name, :window_start, :window_end, :requests, :errors, :error_types,
+                                :p50_ms, :p95_ms, :p99_ms, :prompt_tokens, :completion_tokens, :cache_hits, :fallbacks)
+                    """),
+                    records
+                )
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"Error logging AI metrics: {str(e)}")
+    
+    def get_ai_usage_summary(self, scope: str = 'agent', hours: int = 24) -> List[Dict[str, Any]]:
+        """
+        Get persisted AI usage aggregated per model or agent
+        
+        Args:
+            scope: 'agent' or 'model'
+            hours: How far back to look
+            
+        Returns:
+            One dictionary per name, busiest first; p95_ms is the worst window's p95
+        """
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(
+                    text("""
+                        SELECT name,
+                               SUM(requests) AS requests,
+                               SUM(errors) AS errors,
+                               MAX(p95_ms) AS p95_ms,
+                               SUM(prompt_tokens) AS prompt_tokens,
+                               SUM(completion_tokens) AS completion_tokens,
+                               SUM(cache_hits) AS cache_hits,
+                               SUM(fallbacks) AS fallbacks
+                        FROM ai_usage_metrics
+                        WHERE scope = :scope AND window_end >= :since
+                        GROUP BY name
+                        ORDER BY SUM(requests) DESC
+                    """),
+                    {'scope': scope, 'since': datetime.now() - timedelta(hours=hours)}
+                )
+                
+                return [
+                    {
+                        'name': row.name,
+                        'requests': row.requests or 0,
+                        'errors': row.errors or 0,
+                        'p95_ms': row.p95_ms,
+                        'prompt_tokens': row.prompt_tokens or 0,
+                        'completion_tokens': row.completion_tokens or 0,
+                        'cache_hits': row.cache_hits or 0,
+                        'fallbacks': row.fallbacks or 0
+                    }
+                    for row in result
+                ]
+        except Exception as e:
+            self.logger.error(f"Error getting AI usage summary: {str(e)}")
+            return []
+    
+    def save_job(self, job: Dict[str, Any]) -> bool:
+        """Persist a newly queued background job"""
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(
+                    text("""
+                        INSERT INTO agent_jobs 
+                        (id, agent_name, status, progress, progress_message, input_data, result, error, created_at, started_at, finished_at)
+                        VALUES (:id, :agent_name, :status, :progress, :progress_message, :input_data, :result, :error, :created_at, :started_at, :finished_at)
+                    """),
+                    {
+                        **{column: job.get(column) for column in JOB_COLUMNS},
+                        'input_data': json.dumps(job.get('input_data', {}), default=str),
+                        'result': json.dumps(job['result'], default=str) if job.get('result') is not None else None
+                    }
+                )
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error persisting job {job.get('id')}: {str(e)}")
+            return False
+    
+    def update_job(self, job_id: str, updates: Dict[str, Any]) -> bool:
+        """Update a background job's status, progress or outcome"""
+        values = {column: updates[column] for column in JOB_COLUMNS if column in updates and column != 'id'}
+        if not values:
+            return True
+        if 'input_data' in values:
+            values['input_data'] = json.dumps(values['input_data'], default=str)
+        if 'result' in values:
+            values['result'] = json.dumps(values['result'], default=str) if values['result'] is not None else None
+        
+        assignments = ", ".join(f"{column} = :{column}" for column in values)
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(
+                    text(f"UPDATE agent_jobs SET {assignments} WHERE id = :job_id"),
+                    {**values, 'job_id': job_id}
+                )
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating job {job_id}: {str(e)}")
+            return False
+    
+    def _job_from_row(self, row, payloads: bool = True) -> Dict[str, Any]:
+        job = {
+            'id': row.id,
+            'agent_name': row.agent_name,
+            'status': row.status,
+            'progress': row.progress or 0.0,
+            'progress_message': row.progress_message,
+            'error': row.error,
+            'created_at': row.created_at,
+            'started_at': row.started_at,
+            'finished_at': row.finished_at
+        }
+        if payloads:
+            job['input_data'] = json.loads(row.input_data) if row.input_data else {}
+            job['result'] = json.loads(row.result) if row.result else None
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a background job with its input and result"""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text("SELECT * FROM agent_jobs WHERE id = :job_id"),
+                    {'job_id': job_id}
+                ).fetchone()
+                return self._job_from_row(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting job {job_id}: {str(e)}")
+            return None
+    
+    def list_jobs(self, statuses: List[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        List background jobs, newest first
+        
+        Args:
+            statuses: Only jobs in these states
+            limit: Maximum number of jobs
+            
+        Returns:
+            List of jobs; only queued jobs carry their input (needed to resume them)
+        """
+        params = {'limit': limit}
+        where = ""
+        if statuses:
+            placeholders = ", ".join(f":status_{index}" for index in range(len(statuses)))
+            where = f"WHERE status IN ({placeholders})"
+            params.update({f"status_{index}": status for index, status in enumerate(statuses)})
+        
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(
+                    text(f"SELECT * FROM agent_jobs {where} ORDER BY created_at DESC LIMIT :limit"),
+                    params
+                )
+                jobs = []
+                for row in result:
+                    job = self._job_from_row(row, payloads=False)
+                    if row.status == 'queued':
+                        job['input_data'] = json.loads(row.input_data) if row.input_data else {}
+                    jobs.append(job)
+                return jobs
+        except Exception as e:
+            self.logger.error(f"Error listing jobs: {str(e)}")
+            return []
+    
+    def save_workflow(self, workflow_id: str, definition: Dict[str, Any], status: str = 'running') -> bool:
+        """Persist a workflow run's definition, replacing an earlier one for the same id"""
+        try:
+            now = datetime.utcnow()
+            with self.engine.connect() as conn:
+                existing = conn.execute(
+                    text("SELECT created_at FROM workflow_runs WHERE id = :id"),
+                    {'id': workflow_id}
+                ).fetchone()
+                conn.execute(text("DELETE FROM workflow_runs WHERE id = :id"), {'id': workflow_id})
+                conn.execute(
+                    text("""
+                        INSERT INTO workflow_runs (id, name, definition, status, created_at, updated_at)
+                        VALUES (:id, :name, :definition, :status, :created_at, :updated_at)
+                    """),
+                    {
+                        'id': workflow_id,
+                        'name': definition.get('name'),
+                        'definition': json.dumps(definition, default=str),
+                        'status': status,
+                        'created_at': existing.created_at if existing else now,
+                        'updated_at': now
+                    }
+                )
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving workflow {workflow_id}: {str(e)}")
+            return False
+    
+    def update_workflow_status(self, workflow_id: str, status: str) -> bool:
+        """Set a workflow run's status"""
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(
+                    text("UPDATE workflow_runs SET status = :status, updated_at = :updated_at WHERE id = :id"),
+                    {'id': workflow_id, 'status': status, 'updated_at': datetime.utcnow()}
+                )
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating status of workflow {workflow_id}: {str(e)}")
+            return False
+    
+    def get_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Get a workflow run with its definition"""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text("SELECT * FROM workflow_runs WHERE id = :id"),
+                    {'id': workflow_id}
+                ).fetchone()
+                if not row:
+                    return None
+                return {
+                    'id': row.id,
+                    'name': row.name,
+                    'definition': json.loads(row.definition) if row.definition else {},
+                    'status': row.status,
+                    'created_at': row.created_at,
+                    'updated_at': row.updated_at
+                }
+        except Exception as e:
+            self.logger.error(f"Error getting workflow {workflow_id}: {str(e)}")
+            return None
+    
+    def save_workflow_step(self, workflow_id: str, step_id: str, checkpoint: Dict[str, Any]) -> bool:
+        """Store (or replace) the checkpoint of one workflow step"""
+        try:
+            values = {column: checkpoint.get(column) for column in WORKFLOW_STEP_COLUMNS}
+            values.update({
+                'workflow_id': workflow_id,
+                'step_id': step_id,
+                'output': json.dumps(checkpoint.get('output'), default=str),
+                'updated_at': datetime.utcnow()
+            })
+            
+            with self.engine.connect() as conn:
+                conn.execute(
+                    text("DELETE FROM workflow_steps WHERE workflow_id = :workflow_id AND step_id = :step_id"),
+                    {'workflow_id': workflow_id, 'step_id': step_id}
+                )
+                conn.execute(
+                    text(f"""
+                        INSERT INTO workflow_steps ({", ".join(WORKFLOW_STEP_COLUMNS)})
+                        VALUES ({", ".join(f":{column}" for column in WORKFLOW_STEP_COLUMNS)})
+                    """),
+                    values
+                )
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving checkpoint of workflow {workflow_id} step '{step_id}': {str(e)}")
+            return False
+    
+    def get_workflow_steps(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a workflow run's step checkpoints
+        
+        Args:
+            workflow_id: Workflow run id
+            
+        Returns:
+            Dictionary of step id to checkpoint ('agent_name', 'input_hash',
+            'status', 'output', 'duration_ms', 'prompt_tokens',
+            'completion_tokens', 'updated_at')
+        """
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(
+                    text("SELECT * FROM workflow_steps WHERE workflow_id = :workflow_id"),
+                    {'workflow_id': workflow_id}
+                )
+                return {
+                    row.step_id: {
+                        'agent_name': row.agent_name,
+                        'input_hash': row.input_hash,
+                        'status': row.status,
+                        'output': json.loads(row.output) if row.output else None,
+                        'duration_ms': row.duration_ms or 0.0,
+                        'prompt_tokens': row.prompt_tokens or 0,
+                        'completion_tokens': row.completion_tokens or 0,
+                        'updated_at': row.updated_at
+                    }
+                    for row in result
+                }
+        except Exception as e:
+            self.logger.error(f"Error getting checkpoints of workflow {workflow_id}: {str(e)}")
+            return {}
+    
     def save_client_communication(self, comm_data: Dict[str, Any]) -> str:
         """Save client communication with sentiment analysis"""
         try:
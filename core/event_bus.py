@@ -0,0 +1,246 @@
+import time
+import uuid
+import asyncio
+import fnmatch
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+
+@dataclass
+class Message:
+    """One published event"""
+    topic: str
+    payload: Any
+    sender: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'id': self.id, 'topic': self.topic, 'sender': self.sender, 'timestamp': self.timestamp, 'payload': self.payload}
+
+class Subscription:
+    """A handler subscribed to a topic pattern, with its own bounded queue"""
+
+    def __init__(self, pattern: str, handler: Callable, max_queue: int, policy: str, name: str = None):
+        self.id = str(uuid.uuid4())[:8]
+        self.pattern = pattern
+        self.handler = handler
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+        self.name = name or pattern
+        self.queue = deque()
+        self.space = asyncio.Event()  # set whenever the queue has room
+        self.space.set()
+        self.draining = False
+        self.active = True
+        self.latencies = deque(maxlen=200)  # handler milliseconds
+        self.stats = {'delivered': 0, 'dropped': 0, 'errors': 0}
+
+    def matches(self, topic: str) -> bool:
+        return fnmatch.fnmatchcase(topic, self.pattern)
+
+class EventBus:
+    """
+    Pub/sub bus dispatching on the shared event loop
+
+    Each subscription has a bounded queue. When it is full, publishing either
+    waits for room (BLOCK, up to block_timeout, then the message is dropped)
+    or evicts the oldest queued message (DROP_OLDEST). Handlers run on the
+    loop, one message at a time per subscription; plain functions are moved
+    to a worker thread so they can't stall the loop. Recent messages are kept
+    in a ring buffer for inspection.
+
+    All queue state is touched only on the loop thread.
+    """
+
+    def __init__(self, loop_runner, max_queue: int = 100, policy: str = DROP_OLDEST,
+                 history: int = 200, block_timeout: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        if policy not in (BLOCK, DROP_OLDEST):
+            raise ValueError(f"Unknown backpressure policy '{policy}' (use '{BLOCK}' or '{DROP_OLDEST}')")
+        self.loop_runner = loop_runner
+        self.max_queue = max_queue
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._subscriptions = []
+        self._history = deque(maxlen=max(1, history))
+        self._lock = threading.Lock()
+        self._stats = {'published': 0, 'undelivered': 0}
+
+    def subscribe(self, pattern: str, handler: Callable, max_queue: int = None,
+                  policy: str = None, name: str = None) -> Subscription:
+        """
+        Subscribe a handler to topics
+
+        Args:
+            pattern: Topic or glob pattern ('agent.*')
+            handler: Called with each Message; may be a coroutine function
+            max_queue: Queue bound for this subscriber
+            policy: BLOCK or DROP_OLDEST for this subscriber
+            name: Label for metrics
+
+        Returns:
+            Subscription (pass to unsubscribe)
+        """
+        subscription = Subscription(pattern, handler, max_queue or self.max_queue, policy or self.policy, name)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to a subscription; queued messages are discarded"""
+        subscription.active = False
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def has_subscriber(self, topic: str) -> bool:
+        """Whether any subscription matches a topic"""
+        with self._lock:
+            return any(subscription.matches(topic) for subscription in self._subscriptions)
+
+    async def apublish(self, topic: str, payload: Any, sender: str = None) -> Message:
+        """
+        Publish from code running on the bus loop
+
+        Args:
+            topic: Message topic
+            payload: Message content
+            sender: Publishing component
+
+        Returns:
+            The published Message
+        """
+        message = Message(topic, payload, sender)
+        with self._lock:
+            self._history.append(message)
+            self._stats['published'] += 1
+            targets = [subscription for subscription in self._subscriptions if subscription.matches(topic)]
+            if not targets:
+                self._stats['undelivered'] += 1
+
+        for subscription in targets:
+            await self._enqueue(subscription, message)
+        return message
+
+    def publish(self, topic: str, payload: Any, sender: str = None) -> Message:
+        """
+        Publish from any thread
+
+        Returns once the message is queued for every subscriber (under the
+        BLOCK policy that may wait for room); handlers run asynchronously.
+        Called from the loop thread itself, queueing is scheduled instead.
+
+        Args:
+            topic: Message topic
+            payload: Message content
+            sender: Publishing component
+
+        Returns:
+            The published Message (None when scheduled from the loop thread)
+        """
+        if self.loop_runner.in_runner_thread():
+            asyncio.ensure_future(self.apublish(topic, payload, sender))
+            return None
+        return self.loop_runner.run_sync(self.apublish(topic, payload, sender), self.block_timeout + 5)
+
+    async def _enqueue(self, subscription: Subscription, message: Message):
+        while subscription.active and len(subscription.queue) >= subscription.max_queue:
+            if subscription.policy == DROP_OLDEST:
+                subscription.queue.popleft()
+                subscription.stats['dropped'] += 1
+                break
+            subscription.space.clear()
+            try:
+                await asyncio.wait_for(subscription.space.wait(), self.block_timeout)
+            except asyncio.TimeoutError:
+                subscription.stats['dropped'] += 1
+                self.logger.warning(f"Dropped message {message.id} for '{subscription.name}': queue full for {self.block_timeout}s")
+                return
+        if not subscription.active:
+            return
+
+        subscription.queue.append(message)
+        if not subscription.draining:
+            subscription.draining = True
+            asyncio.ensure_future(self._drain(subscription))
+
+    async def _drain(self, subscription: Subscription):
+        """Deliver a subscription's queued messages in order, then exit"""
+        try:
+            while subscription.queue and subscription.active:
+                message = subscription.queue.popleft()
+                subscription.space.set()
+                await self._dispatch(subscription, message)
+        finally:
+            subscription.draining = False
+            subscription.space.set()
+
+    async def _dispatch(self, subscription: Subscription, message: Message):
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(subscription.handler):
+                await subscription.handler(message)
+            else:
+                await asyncio.to_thread(subscription.handler, message)
+            subscription.stats['delivered'] += 1
+        except Exception as e:
+            subscription.stats['errors'] += 1
+            self.logger.error(f"Handler '{subscription.name}' failed on {message.topic}: {str(e)}")
+        finally:
+            subscription.latencies.append((time.perf_counter() - started) * 1000)
+
+    def recent(self, limit: int = 20, topic: str = None) -> List[Dict[str, Any]]:
+        """
+        Recently published messages, newest first
+
+        Args:
+            limit: Maximum number of messages
+            topic: Only topics matching this pattern
+
+        Returns:
+            List of message dictionaries
+        """
+        with self._lock:
+            messages = list(self._history)
+        messages = [message for message in reversed(messages) if topic is None or fnmatch.fnmatchcase(message.topic, topic)]
+        return [message.to_dict() for message in messages[:limit]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and handler latency per subscription
+
+        Returns:
+            Dictionary with published/undelivered counts, total queue depth
+            and per-subscription depth, policy, counters and latency
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            stats = dict(self._stats)
+
+        by_subscription = {}
+        for subscription in subscriptions:
+            latencies = sorted(subscription.latencies)
+            by_subscription[subscription.name] = {
+                'pattern': subscription.pattern,
+                'depth': len(subscription.queue),
+                'max_queue': subscription.max_queue,
+                'policy': subscription.policy,
+                **subscription.stats,
+                'latency_ms': {
+                    'avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                    'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+                    'max': round(latencies[-1], 2) if latencies else None
+                }
+            }
+        stats['queue_depth'] = sum(entry['depth'] for entry in by_subscription.values())
+        stats['history'] = len(self._history)
+        stats['subscriptions'] = by_subscription
+        return stats
@@ -0,0 +1,362 @@
+import time
+import queue
+import uuid
+import logging
+import threading
+import contextvars
+import concurrent.futures
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+from utils.loop_runner import get_loop_runner
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Progress callback of the job whose agent run is executing in this context
+_current_job_progress = contextvars.ContextVar('current_job_progress', default=None)
+
+def report_progress(fraction: float = None, message: str = None):
+    """
+    Report progress of the background job running in this context
+
+    Does nothing outside a job, so agents can call it unconditionally.
+
+    Args:
+        fraction: Completed share, 0-1 (left unchanged if None)
+        message: Short description of the current stage
+    """
+    callback = _current_job_progress.get()
+    if callback is not None:
+        callback(fraction, message)
+
+class JobQueue:
+    """
+    Background job queue for agent runs
+
+    Jobs are picked up by a pool of worker threads and run on the shared
+    event loop runner, the same loop every sync caller uses, so long
+    generations run outside the Streamlit script thread and survive reruns
+    and disconnects while loop-bound state (rate limiter waits, coalesced
+    calls, client sessions) stays on one loop. The worker count bounds how
+    many jobs run at once. Job state is kept in memory
+    for polling and written through to a store (DatabaseManager) so it can be
+    looked up from any session; jobs that were still queued when the process
+    stopped are picked up again on start.
+    """
+
+    def __init__(self, execute: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 store=None, workers: int = 4, max_jobs: int = 500, progress_flush_interval: float = 1.0,
+                 loop_runner=None):
+        self.logger = logging.getLogger(__name__)
+        self.execute = execute
+        self.store = store
+        self.loop_runner = loop_runner or get_loop_runner()
+        self.workers = max(1, workers)
+        self.max_jobs = max(1, max_jobs)
+        self.progress_flush_interval = progress_flush_interval
+
+        self._jobs = OrderedDict()  # job id -> job dict
+        self._queue = queue.Queue()
+        self._running = {}  # job id -> concurrent.futures.Future of the run on the loop runner
+        self._cancel_requested = set()  # running jobs cancelled before their task existed
+        self._executors = {}  # job id -> executor overriding self.execute (e.g. the submitting session's)
+        self._progress_flushed = {}  # job id -> monotonic time of the last persisted progress
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stats = {'submitted': 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+
+    def start(self):
+        """Start the worker threads and resume jobs left queued by a previous process"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._recover()
+
+    def _recover(self):
+        if self.store is None:
+            return
+        interrupted = self.store.list_jobs(statuses=list(ACTIVE_STATES), limit=self.max_jobs)
+
+        for job in reversed(interrupted):  # oldest first
+            if job['status'] == RUNNING:
+                self._persist(job['id'], {
+                    'status': FAILED,
+                    'error': 'Interrupted by an application restart',
+                    'finished_at': datetime.utcnow()
+                })
+                continue
+            with self._lock:
+                self._jobs[job['id']] = {'result': None, **job}
+            self._queue.put(job['id'])
+        if interrupted:
+            self.logger.info(f"Recovered {len(interrupted)} unfinished jobs")
+
+    def submit(self, agent_name: str, input_data: Dict[str, Any],
+               execute: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]] = None) -> str:
+        """
+        Queue an agent run
+
+        Args:
+            agent_name: Agent to run
+            input_data: Input for the agent's process()
+            execute: Executor for this job instead of the queue's (not
+                persisted; a job resumed after a restart uses the queue's)
+
+        Returns:
+            Job id
+        """
+        job = {
+            'id': str(uuid.uuid4()),
+            'agent_name': agent_name,
+            'status': QUEUED,
+            'progress': 0.0,
+            'progress_message': 'Waiting for a worker',
+            'input_data': input_data,
+            'result': None,
+            'error': None,
+            'created_at': datetime.utcnow(),
+            'started_at': None,
+            'finished_at': None
+        }
+
+        with self._lock:
+            self._jobs[job['id']] = job
+            if execute is not None:
+                self._executors[job['id']] = execute
+            self._stats['submitted'] += 1
+            self._evict()
+
+        if self.store is not None and not self.store.save_job(job):
+            self.logger.warning(f"Could not persist job {job['id']}, it will not survive a restart")
+
+        self._queue.put(job['id'])
+        self.logger.info(f"Queued job {job['id']} for {agent_name}")
+        return job['id']
+
+    def _evict(self):
+        """Forget the oldest finished jobs beyond max_jobs; caller holds the lock"""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
+
+    def _persist(self, job_id: str, updates: Dict[str, Any]):
+        if self.store is not None and not self.store.update_job(job_id, updates):
+            self.logger.warning(f"Could not update job {job_id}")
+
+    def _update(self, job_id: str, **updates) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(updates)
+        self._persist(job_id, updates)
+        return job
+
+    def _set_progress(self, job_id: str, fraction: float = None, message: str = None):
+        updates = {}
+        if fraction is not None:
+            updates['progress'] = round(min(1.0, max(0.0, float(fraction))), 3)
+        if message is not None:
+            updates['progress_message'] = message
+        if not updates:
+            return
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != RUNNING:
+                return
+            job.update(updates)
+            now = time.monotonic()
+            if now - self._progress_flushed.get(job_id, 0.0) < self.progress_flush_interval:
+                return
+            self._progress_flushed[job_id] = now
+            updates = {'progress': job['progress'], 'progress_message': job['progress_message']}
+        self._persist(job_id, updates)
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                self.logger.error(f"Job worker error on {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id: str):
+        with self._lock:
+            execute = self._executors.pop(job_id, self.execute)
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != QUEUED:
+                return  # cancelled while queued
+            job.update(status=RUNNING, started_at=datetime.utcnow(), progress=0.1, progress_message=f"Running {job['agent_name']}")
+            agent_name, input_data = job['agent_name'], job['input_data']
+            started = {key: job[key] for key in ('status', 'started_at', 'progress', 'progress_message')}
+        self._persist(job_id, started)
+
+        async def run():
+            # Set inside the task so it is scoped to this job's context on the shared loop
+            _current_job_progress.set(lambda fraction, message: self._set_progress(job_id, fraction, message))
+            return await execute(agent_name, dict(input_data))
+
+        future = self.loop_runner.submit(run())
+        with self._lock:
+            self._running[job_id] = future
+            if job_id in self._cancel_requested:
+                future.cancel()
+
+        try:
+            result = future.result()
+        except concurrent.futures.CancelledError:
+            self._finish(job_id, CANCELLED, error='Cancelled while running')
+            return
+        except Exception as e:
+            self.logger.error(f"Job {job_id} ({agent_name}) failed: {str(e)}")
+            self._finish(job_id, FAILED, error=str(e))
+            return
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+                self._progress_flushed.pop(job_id, None)
+                self._cancel_requested.discard(job_id)
+
+        if isinstance(result, dict) and result.get('success') is False:
+            self._finish(job_id, FAILED, result=result, error=result.get('error') or 'Agent run failed')
+        else:
+            self._finish(job_id, SUCCEEDED, result=result)
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: str = None):
+        updates = {'status': status, 'error': error, 'finished_at': datetime.utcnow()}
+        if status == SUCCEEDED:
+            updates.update(progress=1.0, progress_message='Done')
+        else:
+            updates['progress_message'] = status.title()
+        if result is not None:
+            updates['result'] = result
+        with self._lock:
+            self._stats[status] += 1
+        self._update(job_id, **updates)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+
+        A running agent is cancelled at its next await; AI calls already
+        handed to a thread finish in the background and are discarded.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            True if the job was still active
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ACTIVE_STATES:
+                return False
+            running = self._running.get(job_id)
+            if running is None and job['status'] == RUNNING:
+                # Picked up but not started yet; the worker cancels it on start
+                self._cancel_requested.add(job_id)
+                return True
+            if running is None:
+                job['status'] = CANCELLED  # the worker skips it when dequeued
+                self._stats[CANCELLED] += 1
+
+        if running is not None:
+            running.cancel()  # cancels the task on the runner loop
+        else:
+            self._update(job_id, status=CANCELLED, progress_message='Cancelled', finished_at=datetime.utcnow())
+        return True
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status, progress and (when finished) result
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Copy of the job, from memory or the store, or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        if self.store is not None:
+            return self.store.get_job(job_id)
+        return None
+
+    def list_jobs(self, statuses: List[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        List recent jobs, newest first
+
+        Args:
+            statuses: Only jobs in these states
+            limit: Maximum number of jobs
+
+        Returns:
+            List of jobs without their input and result payloads
+        """
+        jobs = self.store.list_jobs(statuses=statuses, limit=limit) if self.store is not None else []
+        if jobs:
+            # The store lags behind in-memory progress of running jobs
+            with self._lock:
+                return [{**job, **{key: value for key, value in self._jobs[job['id']].items() if key not in ('input_data', 'result')}}
+                        if job['id'] in self._jobs else job for job in jobs]
+
+        with self._lock:
+            jobs = [job for job in reversed(self._jobs.values()) if not statuses or job['status'] in statuses]
+            return [{key: value for key, value in job.items() if key not in ('input_data', 'result')} for job in jobs[:limit]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with worker count, queued/running jobs and finished counts
+        """
+        with self._lock:
+            return {
+                'workers': len(self._threads),
+                'queued': sum(1 for job in self._jobs.values() if job['status'] == QUEUED),
+                'running': len(self._running),
+                **self._stats
+            }
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue(execute: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]] = None,
+                  store=None, workers: int = 4) -> Optional[JobQueue]:
+    """
+    Get the process-wide job queue, starting it on first use
+
+    The first caller's executor and store are used by every session.
+
+    Args:
+        execute: Coroutine function running one agent task
+        store: Job persistence (DatabaseManager) or None for memory only
+        workers: Worker thread count
+
+    Returns:
+        JobQueue, or None if it hasn't been created and no executor was given
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None and execute is not None:
+            _job_queue = JobQueue(execute, store=store, workers=workers)
+            _job_queue.start()
+        return _job_queue
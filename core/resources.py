@@ -0,0 +1,46 @@
+import threading
+
+from utils.config import config
+
+# Process-wide resources shared by every Streamlit session. Each is created
+# on first use under its own lock; sessions keep only a SessionContext.
+
+_ai_client = None
+_ai_client_lock = threading.Lock()
+
+_database_manager = None
+_database_manager_lock = threading.Lock()
+
+_agent_registry = None
+_agent_registry_lock = threading.Lock()
+
+def get_ai_client():
+    """Get the process-wide AI client (one backend, cache and limiter set for all sessions)"""
+    global _ai_client
+    with _ai_client_lock:
+        if _ai_client is None:
+            from utils.ai_client import AIClient
+            _ai_client = AIClient(config.get_ai_config())
+        return _ai_client
+
+def get_database_manager():
+    """Get the process-wide database manager (one engine and pool; tables created once)"""
+    global _database_manager
+    with _database_manager_lock:
+        if _database_manager is None:
+            from core.database import DatabaseManager
+            _database_manager = DatabaseManager()
+        return _database_manager
+
+def get_agent_registry():
+    """Get the process-wide agent registry; agents hold logic only, state lives in sessions"""
+    global _agent_registry
+    ai_client = get_ai_client()
+    with _agent_registry_lock:
+        if _agent_registry is None:
+            from core.agent_registry import AgentRegistry
+            _agent_registry = AgentRegistry(ai_client)
+            warmup = config.get_app_config()['agent_warmup']
+            if warmup:
+                _agent_registry.warm_up(warmup)
+        return _agent_registry
@@ -0,0 +1,215 @@
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, Iterable, Optional, Tuple
+from utils.single_flight import SingleFlight
+
+# Request metadata that differs between otherwise identical calls
+VOLATILE_FIELDS = ('timestamp', 'request_id', 'job_id')
+
+def normalize_input(value: Any, ignore: Iterable[str] = VOLATILE_FIELDS) -> Any:
+    """
+    Strip volatile fields from agent input, at any depth
+
+    Args:
+        value: Agent input data
+        ignore: Keys to drop from every dictionary
+
+    Returns:
+        Copy of the input without the ignored keys
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize_input(item, ignore) for key, item in value.items() if key not in ignore}
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(item, ignore) for item in value]
+    if isinstance(value, (bytes, bytearray)):
+        return {'sha256': hashlib.sha256(value).hexdigest()}
+    return value
+
+def is_memoizable(result: Any) -> bool:
+    """Whether an agent result may be reused: it succeeded and isn't a fallback produced without the AI"""
+    if not isinstance(result, dict) or not result.get('success', True):
+        return False
+    payload = result.get('result')
+    if isinstance(payload, dict):
+        return not any(key.startswith('fallback') and value is True for key, value in payload.items())
+    return True
+
+class AgentResultStore:
+    """
+    Memoized agent results, keyed by agent name, agent version and a
+    canonical hash of the input with volatile fields stripped
+
+    Only agents that declare 'cacheable' in get_capabilities are memoized,
+    for their 'result_cache_ttl' seconds (default_ttl otherwise). A hit
+    skips the whole agent run - prompt building, the AI call and the
+    agent's post-processing. Identical requests arriving while the first
+    is still running wait for its result instead of running again. Failed
+    runs and fallback results (flagged 'fallback_...') are never stored.
+    """
+
+    def __init__(self, max_entries: int = 256, default_ttl: int = 600):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.single_flight = SingleFlight()
+
+        self._entries = OrderedDict()  # key -> (agent name, expires at, stored at, result)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @staticmethod
+    def make_key(agent_name: str, version: str, input_data: Dict[str, Any], ignore: Iterable[str] = ()) -> str:
+        """
+        Build the memoization key for one agent call
+
+        Args:
+            agent_name: Agent name
+            version: Agent version from its capabilities
+            input_data: Agent input
+            ignore: Extra input fields to leave out of the key
+
+        Returns:
+            SHA-256 hex digest identifying the request
+        """
+        payload = json.dumps(
+            [agent_name, version, normalize_input(input_data, set(VOLATILE_FIELDS) | set(ignore))],
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(',', ':'),
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def policy(self, capabilities: Dict[str, Any]) -> Optional[int]:
+        """TTL in seconds for an agent's results, or None if it isn't cacheable"""
+        if not capabilities.get('cacheable'):
+            return None
+        ttl = capabilities.get('result_cache_ttl', self.default_ttl)
+        return ttl if ttl and ttl > 0 else None
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Get a stored result
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            (copy of the result, unix time it was stored) or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            result, stored_at = entry[3], entry[2]
+        return copy.deepcopy(result), stored_at
+
+    def set(self, key: str, agent_name: str, result: Dict[str, Any], ttl: int):
+        """Store a result for ttl seconds, evicting the least recently used entries"""
+        now = time.time()
+        value = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = (agent_name, now + ttl, now, value)
+            self._entries.move_to_end(key)
+            self._stats['writes'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    async def get_or_run(self, key: str, agent_name: str, ttl: int,
+                         run: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Serve a stored result or run the agent and store a successful result
+
+        Args:
+            key: Key from make_key
+            agent_name: Agent name
+            ttl: Seconds to keep the result
+            run: Zero-argument callable returning the agent.process awaitable
+
+        Returns:
+            (result, True if it was served without running the agent)
+        """
+        hit = self.get(key)
+        if hit is not None:
+            return hit[0], True
+
+        ran = False
+
+        async def run_and_store():
+            nonlocal ran
+            ran = True
+            result = await run()
+            if is_memoizable(result):
+                self.set(key, agent_name, result, ttl)
+            return result
+
+        result = await self.single_flight.ado(key, run_and_store)
+        return (result, False) if ran else (copy.deepcopy(result), True)
+
+    def invalidate(self, agent_name: str = None, key: str = None) -> int:
+        """
+        Drop stored results
+
+        Args:
+            agent_name: Only this agent's results
+            key: Only this entry
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if key is not None:
+                keys = [key] if key in self._entries else []
+            else:
+                keys = [k for k, entry in self._entries.items() if agent_name is None or entry[0] == agent_name]
+            for k in keys:
+                del self._entries[k]
+            self._stats['invalidations'] += len(keys)
+        if keys:
+            self.logger.debug(f"Invalidated {len(keys)} memoized results" + (f" of {agent_name}" if agent_name else ""))
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get memoization statistics
+
+        Returns:
+            Dictionary with hit/miss/write/eviction counters, hit rate,
+            coalesced requests and entries per agent
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            by_agent = {}
+            for entry in self._entries.values():
+                by_agent[entry[0]] = by_agent.get(entry[0], 0) + 1
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['coalesced'] = self.single_flight.get_stats()['coalesced']
+        stats['entries'] = sum(by_agent.values())
+        stats['entries_by_agent'] = by_agent
+        return stats
+
+_shared_result_store = None
+_shared_result_store_lock = threading.Lock()
+
+def get_result_store(max_entries: int = 256, default_ttl: int = 600) -> AgentResultStore:
+    """Get the process-wide agent result store (the first caller's settings win)"""
+    global _shared_result_store
+    with _shared_result_store_lock:
+        if _shared_result_store is None:
+            _shared_result_store = AgentResultStore(max_entries, default_ttl)
+        return _shared_result_store
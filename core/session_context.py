@@ -0,0 +1,76 @@
+import copy
+import uuid
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+@dataclass
+class AgentState:
+    """Mutable per-session state of one agent"""
+    status: str = "idle"
+    last_activity: Optional[datetime] = None
+    memory: Dict[str, Any] = field(default_factory=dict)  # learned preferences
+
+class SessionContext:
+    """
+    Per-session state for the process-wide agents
+
+    Agent instances hold only logic and configuration and are shared by every
+    session; a session's agent memory, status and last activity live here.
+    get_agent() hands out a lightweight view of a shared agent bound to this
+    session's state, created for the agents the session actually uses.
+    """
+
+    def __init__(self, session_id: str = None):
+        self.session_id = session_id or str(uuid.uuid4())
+        self.created_at = datetime.now()
+        self.agent_states = {}  # agent name -> AgentState
+        self._views = {}  # agent name -> (shared agent, session view)
+        self._lock = threading.Lock()
+
+    def agent_state(self, agent_name: str) -> AgentState:
+        """Get (creating on first use) this session's state for an agent"""
+        with self._lock:
+            state = self.agent_states.get(agent_name)
+            if state is None:
+                state = self.agent_states[agent_name] = AgentState()
+            return state
+
+    def bind(self, agent):
+        """
+        Get a view of a shared agent that reads and writes this session's state
+
+        Args:
+            agent: Shared agent instance (or None)
+
+        Returns:
+            Session-bound view, cached per agent; None if agent is None
+        """
+        if agent is None:
+            return None
+        with self._lock:
+            cached = self._views.get(agent.agent_name)
+            if cached is not None and cached[0] is agent:
+                return cached[1]
+        # Shallow copy: the view shares the agent's client, config and handlers
+        view = copy.copy(agent)
+        view._state = self.agent_state(agent.agent_name)
+        with self._lock:
+            self._views[agent.agent_name] = (agent, view)
+        return view
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the session's footprint
+
+        Returns:
+            Dictionary with session id, bound agents and memory entry counts
+        """
+        with self._lock:
+            return {
+                'session_id': self.session_id,
+                'created_at': self.created_at.isoformat(),
+                'bound_agents': sorted(self._views),
+                'memory_entries': {name: len(state.memory) for name, state in self.agent_states.items()}
+            }
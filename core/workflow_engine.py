@@ -0,0 +1,341 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Awaitable
+from utils.metrics import usage_scope
+
+@dataclass
+class WorkflowStep:
+    """One agent invocation in a workflow graph"""
+    id: str
+    agent: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    inputs: Dict[str, str] = field(default_factory=dict)  # task field -> "step_id" or "step_id.path"
+    depends_on: List[str] = field(default_factory=list)   # every upstream step (inputs included)
+    after: List[str] = field(default_factory=list)        # steps that only have to finish first (legacy order)
+    pass_previous_results: bool = False                   # legacy use_previous_results
+
+def _step_succeeded(step_result: Dict[str, Any], strict: bool = True) -> bool:
+    """
+    Whether a step succeeded: the orchestrator call did and, when strict, the
+    agent's own execution did too (its result carries success=False otherwise)
+    """
+    if not step_result or not step_result.get('success'):
+        return False
+    agent_result = step_result.get('result')
+    return not strict or not isinstance(agent_result, dict) or agent_result.get('success', True)
+
+def is_graph_workflow(workflow_definition: Dict[str, Any]) -> bool:
+    """Whether any step declares an 'id', 'inputs' or 'depends_on' (otherwise it is a legacy sequential workflow)"""
+    return any(key in raw for raw in workflow_definition.get('steps', []) for key in ('id', 'inputs', 'depends_on'))
+
+def step_output(step_result: Dict[str, Any]) -> Any:
+    """The agent's payload inside an orchestrator step result"""
+    agent_result = step_result.get('result')
+    if isinstance(agent_result, dict) and 'result' in agent_result:
+        return agent_result['result']
+    return agent_result
+
+def step_input_hash(agent_name: str, task_data: Dict[str, Any]) -> str:
+    """Stable hash of what a step is asked to do: its agent and task data"""
+    payload = json.dumps({'agent': agent_name, 'data': task_data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _resolve_path(value: Any, path: List[str]) -> Any:
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+def parse_workflow(workflow_definition: Dict[str, Any]) -> List[WorkflowStep]:
+    """
+    Build workflow steps from a definition
+
+    Steps may declare an 'id', 'inputs' (task field -> "step_id" or
+    "step_id.field.path") and 'depends_on'. A definition in which no step
+    declares any of those is a legacy sequential workflow: step ids are the
+    agent names and every step waits for the one before it to finish,
+    whether or not it succeeded.
+
+    Args:
+        workflow_definition: Dictionary with 'steps'
+
+    Returns:
+        List of steps in declaration order
+
+    Raises:
+        ValueError: On duplicate ids, unknown dependencies or cycles
+    """
+    raw_steps = workflow_definition.get('steps', [])
+    is_graph = is_graph_workflow(workflow_definition)
+
+    steps = []
+    for index, raw in enumerate(raw_steps):
+        step_id = raw.get('id') or raw.get('agent') or f"step_{index}"
+        if not is_graph and any(step.id == step_id for step in steps):
+            step_id = f"{step_id}_{index}"  # legacy workflows may repeat an agent
+        inputs = dict(raw.get('inputs', {}))
+        depends_on = list(raw.get('depends_on', []))
+        for reference in inputs.values():
+            upstream = reference.split('.', 1)[0]
+            if upstream not in depends_on:
+                depends_on.append(upstream)
+        steps.append(WorkflowStep(
+            id=step_id,
+            agent=raw.get('agent'),
+            data=dict(raw.get('data', {})),
+            inputs=inputs,
+            depends_on=depends_on,
+            after=[steps[-1].id] if not is_graph and steps else [],
+            pass_previous_results=bool(raw.get('use_previous_results'))
+        ))
+
+    ids = [step.id for step in steps]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate workflow step ids: {sorted({i for i in ids if ids.count(i) > 1})}")
+    for step in steps:
+        unknown = [dep for dep in step.depends_on + step.after if dep not in ids]
+        if unknown:
+            raise ValueError(f"Step '{step.id}' depends on unknown steps: {unknown}")
+
+    # Kahn's algorithm; anything left over sits on a cycle
+    remaining = {step.id: set(step.depends_on + step.after) for step in steps}
+    while True:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            break
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    if remaining:
+        raise ValueError(f"Workflow has a dependency cycle through: {sorted(remaining)}")
+
+    return steps
+
+class WorkflowEngine:
+    """
+    Runs a workflow graph, starting each step as soon as its dependencies
+    have succeeded, with at most max_concurrency steps running at once
+
+    Each step receives its own data plus only the outputs it declared as
+    inputs. Steps whose dependencies failed are skipped; with stop_on_error
+    no new steps start after the first failure. In graph workflows a step
+    also fails when its agent reports success=False; legacy sequential
+    workflows keep counting only failed orchestrator calls, as they always
+    did, unless the definition sets 'fail_on_agent_error'.
+
+    With a checkpoint store, every finished step is saved with a hash of its
+    input, its result, duration and token usage. A resumed run reuses the
+    stored result of each step that succeeded before with the same input
+    hash instead of calling the agent again.
+    """
+
+    def __init__(self, execute_step: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 max_concurrency: int = 4, checkpoint_store=None):
+        self.logger = logging.getLogger(__name__)
+        self.execute_step = execute_step
+        self.max_concurrency = max(1, max_concurrency)
+        self.checkpoint_store = checkpoint_store
+
+    def _task_data(self, step: WorkflowStep, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        task_data = dict(step.data)
+        for target, reference in step.inputs.items():
+            upstream, _, path = reference.partition('.')
+            output = step_output(results[upstream])
+            task_data[target] = _resolve_path(output, path.split('.')) if path else output
+        if step.pass_previous_results:
+            task_data['previous_results'] = {step_id: results[step_id] for step_id in results}
+        return task_data
+
+    def _load_checkpoints(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        return self.checkpoint_store.get_workflow_steps(workflow_id) or {}
+
+    async def _save_checkpoint(self, workflow_id: str, step_id: str, checkpoint: Dict[str, Any]):
+        if not await asyncio.to_thread(self.checkpoint_store.save_workflow_step, workflow_id, step_id, checkpoint):
+            self.logger.warning(f"Could not checkpoint workflow {workflow_id} step '{step_id}', it will re-run on resume")
+
+    async def run(self, workflow_definition: Dict[str, Any], workflow_id: str = None,
+                  resume: bool = False) -> Dict[str, Any]:
+        """
+        Execute a workflow definition
+
+        Args:
+            workflow_definition: Dictionary with 'steps' and optional
+                'stop_on_error' (default True), 'max_concurrency' and
+                'fail_on_agent_error' (default True for graph workflows)
+            workflow_id: Run id under which steps are checkpointed
+            resume: Reuse this run's stored results for steps whose input
+                is unchanged
+
+        Returns:
+            Dictionary with per-step 'results', per-step 'timings'
+            (milliseconds from workflow start, plus tokens used), 'skipped'
+            steps, the 'critical_path', overall 'wall_time_ms', the
+            'reused_steps' and what reusing them 'saved' (step time and tokens)
+        """
+        steps = parse_workflow(workflow_definition)
+        stop_on_error = workflow_definition.get('stop_on_error', True)
+        strict = workflow_definition.get('fail_on_agent_error', is_graph_workflow(workflow_definition))
+        semaphore = asyncio.Semaphore(max(1, workflow_definition.get('max_concurrency', self.max_concurrency)))
+        by_id = {step.id: step for step in steps}
+
+        started_at = time.monotonic()
+        elapsed_ms = lambda: round((time.monotonic() - started_at) * 1000, 1)
+
+        checkpointing = self.checkpoint_store is not None and workflow_id is not None
+        checkpoints = self._load_checkpoints(workflow_id) if checkpointing and resume else {}
+
+        results = {}
+        timings = {}
+        skipped = {}
+        failed = []
+        reused = []
+        saved = {'time_ms': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        running = {}  # asyncio task -> step id
+
+        async def run_step(step: WorkflowStep):
+            ready_ms = elapsed_ms()
+            task_data = self._task_data(step, results)
+            input_hash = step_input_hash(step.agent, task_data)
+
+            checkpoint = checkpoints.get(step.id)
+            if checkpoint and checkpoint['status'] == 'succeeded' and checkpoint['input_hash'] == input_hash:
+                reused.append(step.id)
+                saved['time_ms'] += checkpoint['duration_ms']
+                saved['prompt_tokens'] += checkpoint['prompt_tokens']
+                saved['completion_tokens'] += checkpoint['completion_tokens']
+                timings[step.id] = {
+                    'agent': step.agent,
+                    'ready_ms': ready_ms,
+                    'queued_ms': 0.0,
+                    'started_ms': ready_ms,
+                    'finished_ms': ready_ms,
+                    'duration_ms': 0.0,
+                    'prompt_tokens': 0,
+                    'completion_tokens': 0,
+                    'status': 'reused'
+                }
+                return checkpoint['output']
+
+            async with semaphore:
+                start_ms = elapsed_ms()
+                with usage_scope() as usage:
+                    try:
+                        result = await self.execute_step(step.agent, task_data)
+                    except Exception as e:
+                        result = {'success': False, 'agent': step.agent, 'error': str(e)}
+            end_ms = elapsed_ms()
+            status = 'succeeded' if _step_succeeded(result, strict) else 'failed'
+            timings[step.id] = {
+                'agent': step.agent,
+                'ready_ms': ready_ms,
+                'queued_ms': round(start_ms - ready_ms, 1),
+                'started_ms': start_ms,
+                'finished_ms': end_ms,
+                'duration_ms': round(end_ms - start_ms, 1),
+                'prompt_tokens': usage['prompt_tokens'],
+                'completion_tokens': usage['completion_tokens'],
+                'status': status
+            }
+
+            if checkpointing:
+                await self._save_checkpoint(workflow_id, step.id, {
+                    'agent_name': step.agent,
+                    'input_hash': input_hash,
+                    # Only results the agent itself produced successfully are reused on resume
+                    'status': 'succeeded' if _step_succeeded(result) else 'failed',
+                    'output': result,
+                    'duration_ms': timings[step.id]['duration_ms'],
+                    'prompt_tokens': usage['prompt_tokens'],
+                    'completion_tokens': usage['completion_tokens']
+                })
+            return result
+
+        pending = list(steps)
+        while pending or running:
+            halted = stop_on_error and failed
+            for step in list(pending):
+                blocked_by = [dep for dep in step.depends_on if dep in skipped or dep in failed]
+                if blocked_by or halted:
+                    skipped[step.id] = f"dependency failed: {', '.join(blocked_by)}" if blocked_by else "workflow stopped after a failed step"
+                    pending.remove(step)
+                elif all(dep in results for dep in step.depends_on) and all(dep in results or dep in skipped for dep in step.after):
+                    running[asyncio.ensure_future(run_step(step))] = step.id
+                    pending.remove(step)
+
+            if not running:
+                break
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step_id = running.pop(task)
+                results[step_id] = task.result()
+                if not _step_succeeded(results[step_id], strict):
+                    failed.append(step_id)
+                    self.logger.warning(f"Workflow step '{step_id}' ({by_id[step_id].agent}) failed")
+
+        return {
+            'success': not failed and not skipped,
+            'results': results,
+            'timings': timings,
+            'failed_steps': failed,
+            'skipped': skipped,
+            'critical_path': self._critical_path(by_id, timings),
+            'wall_time_ms': elapsed_ms(),
+            'total_step_time_ms': round(sum(timing['duration_ms'] for timing in timings.values()), 1),
+            'reused_steps': reused,
+            'saved': {**saved, 'time_ms': round(saved['time_ms'], 1)}
+        }
+
+    @staticmethod
+    def _critical_path(by_id: Dict[str, WorkflowStep], timings: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Chain of executed steps that determined the finish time, first to last"""
+        if not timings:
+            return []
+        path = [max(timings, key=lambda step_id: timings[step_id]['finished_ms'])]
+        while True:
+            upstream = [dep for dep in by_id[path[-1]].depends_on + by_id[path[-1]].after if dep in timings]
+            if not upstream:
+                break
+            path.append(max(upstream, key=lambda step_id: timings[step_id]['finished_ms']))
+        return list(reversed(path))
+
+def build_onboarding_workflow(client_input: str, client_name: str = None,
+                              input_type: str = 'text', team_members: List[str] = None) -> Dict[str, Any]:
+    """
+    Standard client onboarding: parse the brief, then produce the taskboard,
+    branding, content plan, proposal and estimate from it in parallel
+
+    Args:
+        client_input: Raw client communication
+        client_name: Client name
+        input_type: email, chat, call_transcript or text
+        team_members: Team for the taskboard
+
+    Returns:
+        Workflow definition for AgentOrchestrator.execute_workflow
+    """
+    brief_input = {'brief': 'brief'}
+    return {
+        'name': 'client_onboarding',
+        'stop_on_error': True,
+        'steps': [
+            {
+                'id': 'brief',
+                'agent': 'creative_brief_parser',
+                'data': {'client_input': client_input, 'client_name': client_name or 'Unknown Client', 'input_type': input_type}
+            },
+            {'id': 'taskboard', 'agent': 'taskboard_generator', 'inputs': brief_input, 'data': {'team_members': team_members or []}},
+            {'id': 'branding', 'agent': 'branding_generator', 'inputs': brief_input},
+            {'id': 'content_plan', 'agent': 'content_plan_generator', 'inputs': brief_input},
+            {'id': 'proposal', 'agent': 'proposal_generator', 'inputs': brief_input},
+            {'id': 'estimate', 'agent': 'analytics_estimator', 'inputs': brief_input}
+        ]
+    }
@@ -16,8 +16,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("📦 Deliverables Packager")
@@ -19,8 +19,8 @@ st.set_page_config(
 
 # Initialize session state
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def initialize_integration_system():
     """Initialize the OAuth integration system"""
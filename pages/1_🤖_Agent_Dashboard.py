@@ -18,8 +18,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("🤖 Agent Dashboard")
@@ -135,6 +135,75 @@ def main():
     
     st.divider()
     
+    # AI Usage
+    st.subheader("💡 AI Usage")
+    
+    try:
+        usage_stats = st.session_state.orchestrator.ai_client.get_usage_stats()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("AI Requests", usage_stats['requests_made'])
+        with col2:
+            st.metric("Errors", usage_stats['errors'])
+        with col3:
+            tokens = usage_stats['tokens_used']
+            st.metric("Tokens", f"{tokens['prompt_tokens'] + tokens['completion_tokens']:,}")
+        with col4:
+            st.metric("Cache Hits", sum(stats['cache_hits'] for stats in usage_stats['by_model'].values()))
+        
+        def usage_table(by_name: dict, label: str) -> pd.DataFrame:
+            rows = []
+            for name, stats in by_name.items():
+                rows.append({
+                    label: name.replace('_', ' ').title() if label == 'Agent' else name,
+                    'Requests': stats['requests'],
+                    'Errors': stats['errors'],
+                    'p50 (ms)': stats['latency']['p50_ms'],
+                    'p95 (ms)': stats['latency']['p95_ms'],
+                    'p99 (ms)': stats['latency']['p99_ms'],
+                    'Prompt Tokens': stats['prompt_tokens'],
+                    'Completion Tokens': stats['completion_tokens'],
+                    'Cache Hits': stats['cache_hits'],
+                    'Fallbacks': stats['fallbacks']
+                })
+            return pd.DataFrame(rows)
+        
+        tab_agents, tab_models, tab_history = st.tabs(["By Agent", "By Model", "Last 24 Hours"])
+        
+        with tab_agents:
+            if usage_stats['by_agent']:
+                st.dataframe(usage_table(usage_stats['by_agent'], 'Agent'), use_container_width=True, hide_index=True)
+            else:
+                st.info("No AI calls made since startup")
+        
+        with tab_models:
+            if usage_stats['by_model']:
+                st.dataframe(usage_table(usage_stats['by_model'], 'Model'), use_container_width=True, hide_index=True)
+            else:
+                st.info("No AI calls made since startup")
+        
+        with tab_history:
+            history = st.session_state.db_manager.get_ai_usage_summary(scope='agent', hours=24)
+            if history:
+                history_df = pd.DataFrame(history)
+                history_df['tokens'] = history_df['prompt_tokens'] + history_df['completion_tokens']
+                fig_tokens = px.bar(
+                    history_df,
+                    x='name',
+                    y='tokens',
+                    labels={'name': 'Agent', 'tokens': 'Tokens'},
+                    title="Token Usage by Agent (24h)"
+                )
+                st.plotly_chart(fig_tokens, use_container_width=True)
+                st.dataframe(history_df, use_container_width=True, hide_index=True)
+            else:
+                st.info("No AI usage has been recorded yet")
+    except Exception as e:
+        st.error(f"Error loading AI usage: {str(e)}")
+    
+    st.divider()
+    
     # Agent Management
     st.subheader("🛠️ Agent Management")
     
@@ -175,7 +244,7 @@ def main():
             st.rerun()
         
         if st.button("Check AI Service", use_container_width=True):
-            ai_healthy = st.session_state.orchestrator.check_ai_service()
+            ai_healthy = st.session_state.orchestrator.check_ai_service(force=True)
             if ai_healthy:
                 st.success("AI service is responding")
             else:
@@ -188,6 +257,35 @@ def main():
             else:
                 st.error("Database connection failed")
     
+    # Background Jobs (shared by every session)
+    st.divider()
+    st.subheader("⏳ Background Jobs")
+    
+    try:
+        jobs = st.session_state.orchestrator.list_jobs(limit=10)
+        if jobs:
+            status_icons = {'queued': '🕒', 'running': '🔄', 'succeeded': '✅', 'failed': '❌', 'cancelled': '⛔'}
+            for job in jobs:
+                col1, col2, col3 = st.columns([3, 3, 1])
+                with col1:
+                    st.write(f"{status_icons.get(job['status'], '•')} **{job['agent_name'].replace('_', ' ').title()}** ({job['created_at']})")
+                with col2:
+                    if job['status'] in ('queued', 'running'):
+                        st.progress(job['progress'], text=job['progress_message'] or job['status'])
+                    elif job.get('error'):
+                        st.caption(job['error'])
+                    else:
+                        st.caption(job['status'].title())
+                with col3:
+                    if job['status'] in ('queued', 'running'):
+                        if st.button("Cancel", key=f"cancel_job_{job['id']}"):
+                            st.session_state.orchestrator.cancel_job(job['id'])
+                            st.rerun()
+        else:
+            st.info("No background jobs yet")
+    except Exception as e:
+        st.error(f"Error loading background jobs: {str(e)}")
+    
     # Recent Activity Log
     st.divider()
     st.subheader("📋 Recent Activity Log")
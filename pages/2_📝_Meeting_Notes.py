@@ -1,7 +1,7 @@
 import streamlit as st
-import asyncio
 from datetime import datetime
 import json
+from utils.job_tracking import start_job, job_result, tracked_job, clear_job
 
 # Page configuration
 st.set_page_config(
@@ -16,8 +16,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("📝 Meeting Notes Processor")
@@ -149,91 +149,102 @@ The AI will extract structured information from your notes."""
             'project_context': project_context
         }
         
-        with st.spinner("Processing meeting notes with AI..."):
-            try:
-                # Execute agent processing
-                result = asyncio.run(agent.process(input_data))
+        # Run in the background worker pool; the page picks the job up again on every rerun
+        start_job('meeting_notes_job', 'meeting_notes_processor', input_data,
+                  extract_jira_tasks=extract_jira_tasks, integration_project=integration_project)
+    
+    result, is_new = job_result('meeting_notes_job')
+    if result is not None:
+        tracked = tracked_job('meeting_notes_job')
+        input_data = tracked['input_data']
+        attendees = input_data['attendees']
+        meeting_date = input_data['meeting_date']
+        meeting_type = input_data['meeting_type']
+        project_context = input_data['project_context']
+        extract_jira_tasks = tracked['context']['extract_jira_tasks']
+        integration_project = tracked['context']['integration_project']
+        try:
+            if result.get('success'):
+                processed_data = result.get('result', {})
                 
-                if result.get('success'):
-                    processed_data = result.get('result', {})
-                    
-                    # Display Results
-                    st.success("✅ Meeting notes processed successfully!")
-                    
-                    # Summary Section
-                    st.subheader("📊 Meeting Summary")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("**Meeting Overview**")
-                        st.write(processed_data.get('summary', 'No summary available'))
-                        
-                        if processed_data.get('key_decisions'):
-                            st.markdown("**Key Decisions**")
-                            for decision in processed_data['key_decisions']:
-                                st.write(f"• {decision}")
-                    
-                    with col2:
-                        st.markdown("**Meeting Details**")
-                        st.write(f"**Date:** {meeting_date}")
-                        st.write(f"**Type:** {meeting_type}")
-                        st.write(f"**Attendees:** {len(attendees)} people")
-                        if project_context:
-                            st.write(f"**Context:** {project_context}")
-                    
-                    # Action Items Section
-                    st.subheader("✅ Action Items")
-                    
-                    action_items = processed_data.get('action_items', [])
+                # Display Results
+                st.success("✅ Meeting notes processed successfully!")
+                
+                # Summary Section
+                st.subheader("📊 Meeting Summary")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Meeting Overview**")
+                    st.write(processed_data.get('summary', 'No summary available'))
                     
-                    if action_items:
-                        for i, item in enumerate(action_items):
-                            with st.expander(f"Action Item {i+1}: {item.get('task', 'Unknown Task')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**Task:** {item.get('task', 'N/A')}")
-                                    st.write(f"**Assignee:** {item.get('assignee', 'TBD')}")
-                                    st.write(f"**Category:** {item.get('category', 'General')}")
+                    if processed_data.get('key_decisions'):
+                        st.markdown("**Key Decisions**")
+                        for decision in processed_data['key_decisions']:
+                            st.write(f"• {decision}")
+                
+                with col2:
+                    st.markdown("**Meeting Details**")
+                    st.write(f"**Date:** {meeting_date}")
+                    st.write(f"**Type:** {meeting_type}")
+                    st.write(f"**Attendees:** {len(attendees)} people")
+                    if project_context:
+                        st.write(f"**Context:** {project_context}")
+                
+                # Action Items Section
+                st.subheader("✅ Action Items")
+                
+                action_items = processed_data.get('action_items', [])
+                
+                if action_items:
+                    for i, item in enumerate(action_items):
+                        with st.expander(f"Action Item {i+1}: {item.get('task', 'Unknown Task')}"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.write(f"**Task:** {item.get('task', 'N/A')}")
+                                st.write(f"**Assignee:** {item.get('assignee', 'TBD')}")
+                                st.write(f"**Category:** {item.get('category', 'General')}")
+                            
+                            with col2:
+                                priority = item.get('priority', 'medium')
+                                priority_color = {
+                                    'high': '🔴',
+                                    'medium': '🟡',
+                                    'low': '🟢'
+                                }.get(priority.lower(), '⚪')
                                 
-                                with col2:
-                                    priority = item.get('priority', 'medium')
-                                    priority_color = {
-                                        'high': '🔴',
-                                        'medium': '🟡',
-                                        'low': '🟢'
-                                    }.get(priority.lower(), '⚪')
-                                    
-                                    st.write(f"**Priority:** {priority_color} {priority.title()}")
-                                    st.write(f"**Due Date:** {item.get('due_date', 'TBD')}")
-                    else:
-                        st.info("No action items found in the meeting notes")
-                    
-                    # Follow-ups Section
-                    if processed_data.get('follow_ups'):
-                        st.subheader("🔄 Follow-ups")
-                        for follow_up in processed_data['follow_ups']:
-                            st.write(f"• {follow_up}")
-                    
-                    # Blockers Section
-                    if processed_data.get('blockers'):
-                        st.subheader("🚫 Blockers & Issues")
-                        for blocker in processed_data['blockers']:
-                            st.warning(f"⚠️ {blocker}")
-                    
-                    # Next Meeting
-                    if processed_data.get('next_meeting'):
-                        st.subheader("📅 Next Steps")
-                        st.info(f"📋 {processed_data['next_meeting']}")
-                    
+                                st.write(f"**Priority:** {priority_color} {priority.title()}")
+                                st.write(f"**Due Date:** {item.get('due_date', 'TBD')}")
+                else:
+                    st.info("No action items found in the meeting notes")
+                
+                # Follow-ups Section
+                if processed_data.get('follow_ups'):
+                    st.subheader("🔄 Follow-ups")
+                    for follow_up in processed_data['follow_ups']:
+                        st.write(f"• {follow_up}")
+                
+                # Blockers Section
+                if processed_data.get('blockers'):
+                    st.subheader("🚫 Blockers & Issues")
+                    for blocker in processed_data['blockers']:
+                        st.warning(f"⚠️ {blocker}")
+                
+                # Next Meeting
+                if processed_data.get('next_meeting'):
+                    st.subheader("📅 Next Steps")
+                    st.info(f"📋 {processed_data['next_meeting']}")
+                
+                if is_new:
                     # Integration Actions
                     if extract_jira_tasks and action_items:
                         st.subheader("🔗 JIRA Integration")
                         
                         with st.spinner("Creating JIRA tasks..."):
                             try:
-                                jira_result = asyncio.run(
+                                jira_result = st.session_state.orchestrator.run_sync(
                                     agent.create_jira_tasks(action_items, integration_project)
                                 )
                                 
@@ -258,46 +269,47 @@ The AI will extract structured information from your notes."""
                     except Exception as e:
                         st.warning(f"Could not save to database: {str(e)}")
                     
-                    # Export Options
-                    st.subheader("📤 Export Options")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        if st.button("📋 Copy Action Items"):
-                            action_text = "\n".join([
-                                f"• {item.get('task', 'Task')} (Assignee: {item.get('assignee', 'TBD')}, Priority: {item.get('priority', 'medium')})"
-                                for item in action_items
-                            ])
-                            st.code(action_text, language="text")
-                    
-                    with col2:
-                        if st.button("📄 Download Summary"):
-                            summary_data = {
-                                'meeting_summary': processed_data,
-                                'meeting_info': {
-                                    'date': meeting_date.isoformat(),
-                                    'type': meeting_type,
-                                    'attendees': attendees,
-                                    'context': project_context
-                                }
+                # Export Options
+                st.subheader("📤 Export Options")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    if st.button("📋 Copy Action Items"):
+                        action_text = "\n".join([
+                            f"• {item.get('task', 'Task')} (Assignee: {item.get('assignee', 'TBD')}, Priority: {item.get('priority', 'medium')})"
+                            for item in action_items
+                        ])
+                        st.code(action_text, language="text")
+                
+                with col2:
+                    if st.button("📄 Download Summary"):
+                        summary_data = {
+                            'meeting_summary': processed_data,
+                            'meeting_info': {
+                                'date': meeting_date,
+                                'type': meeting_type,
+                                'attendees': attendees,
+                                'context': project_context
                             }
-                            st.download_button(
-                                label="Download JSON",
-                                data=json.dumps(summary_data, indent=2),
-                                file_name=f"meeting_summary_{meeting_date}.json",
-                                mime="application/json"
-                            )
-                    
-                    with col3:
-                        if st.button("🔄 Process Another"):
-                            st.rerun()
+                        }
+                        st.download_button(
+                            label="Download JSON",
+                            data=json.dumps(summary_data, indent=2),
+                            file_name=f"meeting_summary_{meeting_date}.json",
+                            mime="application/json"
+                        )
                 
-                else:
-                    st.error(f"❌ Processing failed: {result.get('error', 'Unknown error')}")
+                with col3:
+                    if st.button("🔄 Process Another"):
+                        clear_job('meeting_notes_job')
+                        st.rerun()
             
-            except Exception as e:
-                st.error(f"❌ Error processing meeting notes: {str(e)}")
+            else:
+                st.error(f"❌ Processing failed: {result.get('error', 'Unknown error')}")
+        
+        except Exception as e:
+            st.error(f"❌ Error processing meeting notes: {str(e)}")
     
     # Help Section
     with st.expander("💡 Tips for Better Results"):
@@ -1,7 +1,7 @@
 import streamlit as st
-import asyncio
 from datetime import datetime
 import json
+from utils.job_tracking import start_job, job_result, tracked_job
 
 # Page configuration
 st.set_page_config(
@@ -16,8 +16,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("📋 Creative Brief Parser")
@@ -155,225 +155,230 @@ Let me know what you think and if you need any other information."
             'budget_mentioned': project_budget
         }
         
-        with st.spinner("Parsing client input with AI..."):
-            try:
-                # Execute agent processing
-                result = asyncio.run(agent.process(input_data))
+        # Run in the background worker pool; the page picks the job up again on every rerun
+        start_job('creative_brief_job', 'creative_brief_parser', input_data)
+    
+    result, is_new = job_result('creative_brief_job')
+    if result is not None:
+        tracked = tracked_job('creative_brief_job')
+        input_data = tracked['input_data']
+        client_name = input_data['client_name']
+        try:
+            if result.get('success'):
+                brief_data = result.get('result', {})
                 
-                if result.get('success'):
-                    brief_data = result.get('result', {})
-                    
-                    # Display Results
-                    st.success("✅ Creative brief parsed successfully!")
-                    
-                    # Project Overview
-                    st.subheader("📋 Project Overview")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("**Project Information**")
-                        st.write(f"**Title:** {brief_data.get('project_title', 'Untitled Project')}")
-                        st.write(f"**Client:** {brief_data.get('client_name', 'Unknown')}")
-                        st.write(f"**Type:** {brief_data.get('project_type', 'General').title()}")
-                        
-                        clarity_score = brief_data.get('clarity_score', 5)
-                        st.write(f"**Clarity Score:** {clarity_score}/10")
-                        
-                        if clarity_score < 6:
-                            st.warning("⚠️ Brief clarity is low. Consider asking clarification questions.")
-                    
-                    with col2:
-                        st.markdown("**Quick Stats**")
-                        deliverables_count = len(brief_data.get('deliverables', []))
-                        st.write(f"**Deliverables:** {deliverables_count} identified")
-                        
-                        missing_info = brief_data.get('missing_information', [])
-                        st.write(f"**Missing Info:** {len(missing_info)} items")
-                        
-                        if brief_data.get('contact_information'):
-                            st.write(f"**Contacts Found:** {len(brief_data['contact_information'])}")
-                    
-                    # Goals & Objectives
-                    st.subheader("🎯 Goals & Objectives")
-                    
-                    goals = brief_data.get('goals', {})
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        if goals.get('primary'):
-                            st.markdown("**Primary Goal**")
-                            st.write(goals['primary'])
-                        
-                        if goals.get('secondary'):
-                            st.markdown("**Secondary Goals**")
-                            for goal in goals['secondary']:
-                                st.write(f"• {goal}")
+                # Display Results
+                st.success("✅ Creative brief parsed successfully!")
+                
+                # Project Overview
+                st.subheader("📋 Project Overview")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Project Information**")
+                    st.write(f"**Title:** {brief_data.get('project_title', 'Untitled Project')}")
+                    st.write(f"**Client:** {brief_data.get('client_name', 'Unknown')}")
+                    st.write(f"**Type:** {brief_data.get('project_type', 'General').title()}")
                     
-                    with col2:
-                        if goals.get('success_metrics'):
-                            st.markdown("**Success Metrics**")
-                            for metric in goals['success_metrics']:
-                                st.write(f"• {metric}")
+                    clarity_score = brief_data.get('clarity_score', 5)
+                    st.write(f"**Clarity Score:** {clarity_score}/10")
                     
-                    # Deliverables
-                    st.subheader("📦 Deliverables")
+                    if clarity_score < 6:
+                        st.warning("⚠️ Brief clarity is low. Consider asking clarification questions.")
+                
+                with col2:
+                    st.markdown("**Quick Stats**")
+                    deliverables_count = len(brief_data.get('deliverables', []))
+                    st.write(f"**Deliverables:** {deliverables_count} identified")
                     
-                    deliverables = brief_data.get('deliverables', [])
+                    missing_info = brief_data.get('missing_information', [])
+                    st.write(f"**Missing Info:** {len(missing_info)} items")
                     
-                    if deliverables:
-                        for i, deliverable in enumerate(deliverables):
-                            with st.expander(f"Deliverable {i+1}: {deliverable.get('item', 'Unknown Item')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**Description:** {deliverable.get('description', 'No description')}")
-                                    st.write(f"**Format:** {deliverable.get('format', 'Not specified')}")
+                    if brief_data.get('contact_information'):
+                        st.write(f"**Contacts Found:** {len(brief_data['contact_information'])}")
+                
+                # Goals & Objectives
+                st.subheader("🎯 Goals & Objectives")
+                
+                goals = brief_data.get('goals', {})
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if goals.get('primary'):
+                        st.markdown("**Primary Goal**")
+                        st.write(goals['primary'])
+                    
+                    if goals.get('secondary'):
+                        st.markdown("**Secondary Goals**")
+                        for goal in goals['secondary']:
+                            st.write(f"• {goal}")
+                
+                with col2:
+                    if goals.get('success_metrics'):
+                        st.markdown("**Success Metrics**")
+                        for metric in goals['success_metrics']:
+                            st.write(f"• {metric}")
+                
+                # Deliverables
+                st.subheader("📦 Deliverables")
+                
+                deliverables = brief_data.get('deliverables', [])
+                
+                if deliverables:
+                    for i, deliverable in enumerate(deliverables):
+                        with st.expander(f"Deliverable {i+1}: {deliverable.get('item', 'Unknown Item')}"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.write(f"**Description:** {deliverable.get('description', 'No description')}")
+                                st.write(f"**Format:** {deliverable.get('format', 'Not specified')}")
+                            
+                            with col2:
+                                priority = deliverable.get('priority', 'medium')
+                                priority_color = {
+                                    'high': '🔴',
+                                    'medium': '🟡', 
+                                    'low': '🟢'
+                                }.get(priority.lower(), '⚪')
                                 
-                                with col2:
-                                    priority = deliverable.get('priority', 'medium')
-                                    priority_color = {
-                                        'high': '🔴',
-                                        'medium': '🟡', 
-                                        'low': '🟢'
-                                    }.get(priority.lower(), '⚪')
-                                    
-                                    st.write(f"**Priority:** {priority_color} {priority.title()}")
-                    else:
-                        st.info("No specific deliverables identified. Consider adding clarification questions.")
+                                st.write(f"**Priority:** {priority_color} {priority.title()}")
+                else:
+                    st.info("No specific deliverables identified. Consider adding clarification questions.")
+                
+                # Timeline & Constraints
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.subheader("📅 Timeline")
+                    timeline = brief_data.get('timeline', {})
+                    
+                    if timeline.get('deadline'):
+                        st.write(f"**Deadline:** {timeline['deadline']}")
+                    
+                    if timeline.get('urgency'):
+                        urgency = timeline['urgency']
+                        urgency_color = {
+                            'high': '🔴',
+                            'medium': '🟡',
+                            'low': '🟢'
+                        }.get(urgency.lower(), '⚪')
+                        st.write(f"**Urgency:** {urgency_color} {urgency.title()}")
+                    
+                    if timeline.get('milestones'):
+                        st.markdown("**Milestones**")
+                        for milestone in timeline['milestones']:
+                            st.write(f"• {milestone.get('name', 'Milestone')} - {milestone.get('date', 'TBD')}")
+                
+                with col2:
+                    st.subheader("⚖️ Constraints")
+                    constraints = brief_data.get('constraints', {})
+                    
+                    if constraints.get('budget'):
+                        st.write(f"**Budget:** {constraints['budget']}")
+                    
+                    if constraints.get('technical'):
+                        st.markdown("**Technical Constraints**")
+                        for constraint in constraints['technical']:
+                            st.write(f"• {constraint}")
+                    
+                    if constraints.get('design'):
+                        st.markdown("**Design Constraints**")
+                        for constraint in constraints['design']:
+                            st.write(f"• {constraint}")
+                
+                # Target Audience
+                if brief_data.get('target_audience'):
+                    st.subheader("👥 Target Audience")
+                    audience = brief_data['target_audience']
                     
-                    # Timeline & Constraints
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        st.subheader("📅 Timeline")
-                        timeline = brief_data.get('timeline', {})
-                        
-                        if timeline.get('deadline'):
-                            st.write(f"**Deadline:** {timeline['deadline']}")
-                        
-                        if timeline.get('urgency'):
-                            urgency = timeline['urgency']
-                            urgency_color = {
-                                'high': '🔴',
-                                'medium': '🟡',
-                                'low': '🟢'
-                            }.get(urgency.lower(), '⚪')
-                            st.write(f"**Urgency:** {urgency_color} {urgency.title()}")
-                        
-                        if timeline.get('milestones'):
-                            st.markdown("**Milestones**")
-                            for milestone in timeline['milestones']:
-                                st.write(f"• {milestone.get('name', 'Milestone')} - {milestone.get('date', 'TBD')}")
+                        if audience.get('primary'):
+                            st.write(f"**Primary:** {audience['primary']}")
+                        if audience.get('demographics'):
+                            st.write(f"**Demographics:** {audience['demographics']}")
                     
                     with col2:
-                        st.subheader("⚖️ Constraints")
-                        constraints = brief_data.get('constraints', {})
-                        
-                        if constraints.get('budget'):
-                            st.write(f"**Budget:** {constraints['budget']}")
-                        
-                        if constraints.get('technical'):
-                            st.markdown("**Technical Constraints**")
-                            for constraint in constraints['technical']:
-                                st.write(f"• {constraint}")
-                        
-                        if constraints.get('design'):
-                            st.markdown("**Design Constraints**")
-                            for constraint in constraints['design']:
-                                st.write(f"• {constraint}")
+                        if audience.get('personas'):
+                            st.markdown("**Personas**")
+                            for persona in audience['personas']:
+                                st.write(f"• {persona}")
+                
+                # Brand Context
+                if brief_data.get('brand_context'):
+                    st.subheader("🎨 Brand Context")
+                    brand = brief_data['brand_context']
+                    
+                    if brand.get('existing_brand'):
+                        st.write(f"**Existing Brand:** {brand['existing_brand']}")
+                    
+                    if brand.get('competitors'):
+                        st.markdown("**Competitors**")
+                        for competitor in brand['competitors']:
+                            st.write(f"• {competitor}")
+                    
+                    if brand.get('style_preferences'):
+                        st.markdown("**Style Preferences**")
+                        for style in brand['style_preferences']:
+                            st.write(f"• {style}")
+                
+                # Missing Information & Questions
+                if missing_info:
+                    st.subheader("❓ Missing Information")
                     
-                    # Target Audience
-                    if brief_data.get('target_audience'):
-                        st.subheader("👥 Target Audience")
-                        audience = brief_data['target_audience']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if audience.get('primary'):
-                                st.write(f"**Primary:** {audience['primary']}")
-                            if audience.get('demographics'):
-                                st.write(f"**Demographics:** {audience['demographics']}")
-                        
-                        with col2:
-                            if audience.get('personas'):
-                                st.markdown("**Personas**")
-                                for persona in audience['personas']:
-                                    st.write(f"• {persona}")
+                    st.warning("The following information should be clarified with the client:")
                     
-                    # Brand Context
-                    if brief_data.get('brand_context'):
-                        st.subheader("🎨 Brand Context")
-                        brand = brief_data['brand_context']
-                        
-                        if brand.get('existing_brand'):
-                            st.write(f"**Existing Brand:** {brand['existing_brand']}")
-                        
-                        if brand.get('competitors'):
-                            st.markdown("**Competitors**")
-                            for competitor in brand['competitors']:
-                                st.write(f"• {competitor}")
-                        
-                        if brand.get('style_preferences'):
-                            st.markdown("**Style Preferences**")
-                            for style in brand['style_preferences']:
-                                st.write(f"• {style}")
+                    for info in missing_info:
+                        st.write(f"• {info}")
+                
+                # Project Structure
+                if brief_data.get('suggested_folder_structure'):
+                    st.subheader("📁 Suggested Project Structure")
                     
-                    # Missing Information & Questions
-                    if missing_info:
-                        st.subheader("❓ Missing Information")
-                        
-                        st.warning("The following information should be clarified with the client:")
-                        
-                        for info in missing_info:
-                            st.write(f"• {info}")
+                    structure = brief_data['suggested_folder_structure']
                     
-                    # Project Structure
-                    if brief_data.get('suggested_folder_structure'):
-                        st.subheader("📁 Suggested Project Structure")
+                    with st.expander("View Folder Structure"):
+                        st.write(f"**Root Folder:** {structure.get('root_folder', 'project_folder')}")
                         
-                        structure = brief_data['suggested_folder_structure']
-                        
-                        with st.expander("View Folder Structure"):
-                            st.write(f"**Root Folder:** {structure.get('root_folder', 'project_folder')}")
-                            
-                            if structure.get('structure'):
-                                st.markdown("**Folder Structure:**")
-                                for folder, contents in structure['structure'].items():
-                                    st.write(f"📁 {folder}")
-                                    if isinstance(contents, list):
-                                        for item in contents:
-                                            st.write(f"   • {item}")
+                        if structure.get('structure'):
+                            st.markdown("**Folder Structure:**")
+                            for folder, contents in structure['structure'].items():
+                                st.write(f"📁 {folder}")
+                                if isinstance(contents, list):
+                                    for item in contents:
+                                        st.write(f"   • {item}")
+                
+                # Initial Checklist
+                if brief_data.get('initial_checklist'):
+                    st.subheader("✅ Initial Project Checklist")
                     
-                    # Initial Checklist
-                    if brief_data.get('initial_checklist'):
-                        st.subheader("✅ Initial Project Checklist")
-                        
-                        checklist = brief_data['initial_checklist']
-                        
-                        for category in checklist:
-                            with st.expander(f"{category.get('category', 'Tasks')} ({len(category.get('tasks', []))} items)"):
-                                for task in category.get('tasks', []):
-                                    st.checkbox(task, key=f"task_{hash(task)}")
+                    checklist = brief_data['initial_checklist']
                     
-                    # Contact Information
-                    if brief_data.get('contact_information'):
-                        st.subheader("📞 Extracted Contact Information")
-                        
-                        with st.expander("Contact Details"):
-                            for contact in brief_data['contact_information']:
-                                st.code(contact)
+                    for category in checklist:
+                        with st.expander(f"{category.get('category', 'Tasks')} ({len(category.get('tasks', []))} items)"):
+                            for task in category.get('tasks', []):
+                                st.checkbox(task, key=f"task_{hash(task)}")
+                
+                # Contact Information
+                if brief_data.get('contact_information'):
+                    st.subheader("📞 Extracted Contact Information")
                     
-                    # Reference Materials
-                    if brief_data.get('reference_materials'):
-                        st.subheader("🔗 Reference Materials")
-                        
-                        with st.expander("Links and References"):
-                            for ref in brief_data['reference_materials']:
-                                st.write(f"• {ref}")
+                    with st.expander("Contact Details"):
+                        for contact in brief_data['contact_information']:
+                            st.code(contact)
+                
+                # Reference Materials
+                if brief_data.get('reference_materials'):
+                    st.subheader("🔗 Reference Materials")
                     
+                    with st.expander("Links and References"):
+                        for ref in brief_data['reference_materials']:
+                            st.write(f"• {ref}")
+                
+                if is_new:
                     # Save to database
                     try:
                         # Save project
@@ -400,41 +405,41 @@ Let me know what you think and if you need any other information."
                     except Exception as e:
                         st.warning(f"Could not save to database: {str(e)}")
                     
-                    # Actions Section
-                    st.subheader("🚀 Next Actions")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        if st.button("📝 Create Proposal", use_container_width=True):
-                            st.info("Redirect to Proposal Generator with this brief")
-                    
-                    with col2:
-                        if st.button("📊 Generate Taskboard", use_container_width=True):
-                            st.info("Redirect to Taskboard Generator with this brief")
-                    
-                    with col3:
-                        if st.button("💰 Estimate Costs", use_container_width=True):
-                            st.info("Redirect to Analytics Estimator with this brief")
-                    
-                    # Export Options
-                    st.subheader("📤 Export Brief")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Download as JSON
-                        st.download_button(
-                            label="📄 Download JSON",
-                            data=json.dumps(brief_data, indent=2),
-                            file_name=f"creative_brief_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                            mime="application/json"
-                        )
-                    
-                    with col2:
-                        # Copy structured brief
-                        if st.button("📋 Copy Brief Summary"):
-                            summary = f"""
+                # Actions Section
+                st.subheader("🚀 Next Actions")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    if st.button("📝 Create Proposal", use_container_width=True):
+                        st.info("Redirect to Proposal Generator with this brief")
+                
+                with col2:
+                    if st.button("📊 Generate Taskboard", use_container_width=True):
+                        st.info("Redirect to Taskboard Generator with this brief")
+                
+                with col3:
+                    if st.button("💰 Estimate Costs", use_container_width=True):
+                        st.info("Redirect to Analytics Estimator with this brief")
+                
+                # Export Options
+                st.subheader("📤 Export Brief")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Download as JSON
+                    st.download_button(
+                        label="📄 Download JSON",
+                        data=json.dumps(brief_data, indent=2),
+                        file_name=f"creative_brief_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        mime="application/json"
+                    )
+                
+                with col2:
+                    # Copy structured brief
+                    if st.button("📋 Copy Brief Summary"):
+                        summary = f"""
 # Creative Brief: {brief_data.get('project_title', 'Project')}
 
 **Client:** {brief_data.get('client_name', 'Unknown')}
@@ -450,13 +455,13 @@ Let me know what you think and if you need any other information."
 ## Missing Information
 {len(brief_data.get('missing_information', []))} items need clarification
 """
-                            st.code(summary, language="markdown")
-                
-                else:
-                    st.error(f"❌ Parsing failed: {result.get('error', 'Unknown error')}")
+                        st.code(summary, language="markdown")
             
-            except Exception as e:
-                st.error(f"❌ Error parsing creative brief: {str(e)}")
+            else:
+                st.error(f"❌ Parsing failed: {result.get('error', 'Unknown error')}")
+        
+        except Exception as e:
+            st.error(f"❌ Error parsing creative brief: {str(e)}")
     
     # Help Section
     with st.expander("💡 Tips for Better Brief Parsing"):
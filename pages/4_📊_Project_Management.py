@@ -1,10 +1,10 @@
 import streamlit as st
-import asyncio
 from datetime import datetime, timedelta
 import json
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from utils.job_tracking import start_job, job_result, tracked_job
 
 # Page configuration
 st.set_page_config(
@@ -19,8 +19,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("📊 Project Management & Taskboards")
@@ -229,196 +229,200 @@ def generate_taskboard_tab():
             }
         }
         
-        with st.spinner("Generating taskboard with AI..."):
-            try:
-                # Execute agent processing
-                agent = st.session_state.orchestrator.get_agent('taskboard_generator')
-                result = asyncio.run(agent.process(input_data))
+        # Run in the background worker pool; the page picks the job up again on every rerun
+        start_job('taskboard_job', 'taskboard_generator', input_data)
+    
+    result, is_new = job_result('taskboard_job')
+    if result is not None:
+        tracked = tracked_job('taskboard_job')
+        input_data = tracked['input_data']
+        brief_data = input_data['brief']
+        try:
+            if result.get('success'):
+                taskboard_data = result.get('result', {})
                 
-                if result.get('success'):
-                    taskboard_data = result.get('result', {})
-                    
-                    # Display Results
-                    st.success("✅ Taskboard generated successfully!")
-                    
-                    # Project Information
-                    st.subheader("📋 Project Overview")
-                    
-                    project_info = taskboard_data.get('project_info', {})
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.metric("Project Name", project_info.get('name', 'Unknown'))
-                    
-                    with col2:
-                        st.metric("Duration", project_info.get('end_date', 'TBD'))
-                    
-                    with col3:
-                        total_tasks = len(taskboard_data.get('tasks', []))
-                        st.metric("Total Tasks", total_tasks)
-                    
-                    with col4:
-                        st.metric("Status", project_info.get('status', 'Planning').title())
-                    
-                    # Kanban Board View
-                    st.subheader("📋 Kanban Board")
+                # Display Results
+                st.success("✅ Taskboard generated successfully!")
+                
+                # Project Information
+                st.subheader("📋 Project Overview")
+                
+                project_info = taskboard_data.get('project_info', {})
+                
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    st.metric("Project Name", project_info.get('name', 'Unknown'))
+                
+                with col2:
+                    st.metric("Duration", project_info.get('end_date', 'TBD'))
+                
+                with col3:
+                    total_tasks = len(taskboard_data.get('tasks', []))
+                    st.metric("Total Tasks", total_tasks)
+                
+                with col4:
+                    st.metric("Status", project_info.get('status', 'Planning').title())
+                
+                # Kanban Board View
+                st.subheader("📋 Kanban Board")
+                
+                columns = taskboard_data.get('columns', [])
+                tasks = taskboard_data.get('tasks', [])
+                
+                if columns and tasks:
+                    # Create columns
+                    kanban_cols = st.columns(len(columns))
                     
-                    columns = taskboard_data.get('columns', [])
-                    tasks = taskboard_data.get('tasks', [])
+                    # Organize tasks by column
+                    tasks_by_column = {}
+                    for task in tasks:
+                        column_id = task.get('column_id', 'todo')
+                        if column_id not in tasks_by_column:
+                            tasks_by_column[column_id] = []
+                        tasks_by_column[column_id].append(task)
                     
-                    if columns and tasks:
-                        # Create columns
-                        kanban_cols = st.columns(len(columns))
-                        
-                        # Organize tasks by column
-                        tasks_by_column = {}
-                        for task in tasks:
-                            column_id = task.get('column_id', 'todo')
-                            if column_id not in tasks_by_column:
-                                tasks_by_column[column_id] = []
-                            tasks_by_column[column_id].append(task)
-                        
-                        # Display columns
-                        for i, column in enumerate(columns):
-                            with kanban_cols[i]:
-                                column_name = column.get('name', f'Column {i+1}')
-                                column_id = column.get('id', f'col_{i}')
-                                
-                                st.markdown(f"### {column_name}")
-                                st.markdown(f"**{len(tasks_by_column.get(column_id, []))} tasks**")
+                    # Display columns
+                    for i, column in enumerate(columns):
+                        with kanban_cols[i]:
+                            column_name = column.get('name', f'Column {i+1}')
+                            column_id = column.get('id', f'col_{i}')
+                            
+                            st.markdown(f"### {column_name}")
+                            st.markdown(f"**{len(tasks_by_column.get(column_id, []))} tasks**")
+                            
+                            # Display tasks in column
+                            for task in tasks_by_column.get(column_id, []):
+                                priority_color = {
+                                    'high': '🔴',
+                                    'medium': '🟡',
+                                    'low': '🟢'
+                                }.get(task.get('priority', 'medium'), '⚪')
                                 
-                                # Display tasks in column
-                                for task in tasks_by_column.get(column_id, []):
-                                    priority_color = {
-                                        'high': '🔴',
-                                        'medium': '🟡',
-                                        'low': '🟢'
-                                    }.get(task.get('priority', 'medium'), '⚪')
-                                    
-                                    with st.container():
-                                        st.markdown(f"""
-                                        <div style="border: 1px solid #ddd; border-radius: 8px; padding: 12px; margin: 8px 0; background: white;">
-                                            <div style="font-weight: bold; margin-bottom: 8px;">
-                                                {priority_color} {task.get('title', 'Untitled Task')}
-                                            </div>
-                                            <div style="font-size: 0.9em; color: #666; margin-bottom: 8px;">
-                                                {task.get('description', 'No description')[:100]}{'...' if len(task.get('description', '')) > 100 else ''}
-                                            </div>
-                                            <div style="display: flex; justify-content: space-between; font-size: 0.8em; color: #888;">
-                                                <span>👤 {task.get('assignee', 'Unassigned')}</span>
-                                                <span>⏱️ {task.get('estimated_hours', 0)}h</span>
-                                            </div>
+                                with st.container():
+                                    st.markdown(f"""
+                                    <div style="border: 1px solid #ddd; border-radius: 8px; padding: 12px; margin: 8px 0; background: white;">
+                                        <div style="font-weight: bold; margin-bottom: 8px;">
+                                            {priority_color} {task.get('title', 'Untitled Task')}
                                         </div>
-                                        """, unsafe_allow_html=True)
-                    
-                    # Task Details
-                    st.subheader("📝 Task Details")
-                    
-                    task_df = pd.DataFrame(tasks)
-                    
-                    if not task_df.empty:
-                        # Task summary
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            # Priority distribution
-                            priority_counts = task_df['priority'].value_counts()
-                            fig_priority = px.pie(
-                                values=priority_counts.values,
-                                names=priority_counts.index,
-                                title="Task Priority Distribution"
-                            )
-                            st.plotly_chart(fig_priority, use_container_width=True)
-                        
-                        with col2:
-                            # Assignee distribution
-                            assignee_counts = task_df['assignee'].value_counts()
-                            fig_assignee = px.bar(
-                                x=assignee_counts.values,
-                                y=assignee_counts.index,
-                                orientation='h',
-                                title="Tasks per Team Member"
-                            )
-                            st.plotly_chart(fig_assignee, use_container_width=True)
-                        
-                        # Task table
-                        st.markdown("**All Tasks**")
-                        
-                        # Format task data for display
-                        display_tasks = []
-                        for task in tasks:
-                            display_tasks.append({
-                                'Task': task.get('title', 'Untitled'),
-                                'Priority': task.get('priority', 'medium').title(),
-                                'Assignee': task.get('assignee', 'Unassigned'),
-                                'Hours': task.get('estimated_hours', 0),
-                                'Due Date': task.get('due_date', 'TBD'),
-                                'Status': task.get('column_id', 'todo').replace('_', ' ').title()
-                            })
-                        
-                        display_df = pd.DataFrame(display_tasks)
-                        st.dataframe(display_df, use_container_width=True)
-                    
-                    # Timeline & Milestones
-                    milestones = taskboard_data.get('milestones', [])
-                    
-                    if milestones:
-                        st.subheader("🎯 Project Milestones")
-                        
-                        for milestone in milestones:
-                            with st.container():
-                                col1, col2 = st.columns([3, 1])
-                                
-                                with col1:
-                                    st.markdown(f"**{milestone.get('name', 'Milestone')}**")
-                                    st.write(milestone.get('description', 'No description'))
-                                
-                                with col2:
-                                    st.write(f"📅 {milestone.get('date', 'TBD')}")
-                    
-                    # Integration Options
-                    st.subheader("🔗 Export & Integration")
-                    
-                    col1, col2, col3 = st.columns(3)
+                                        <div style="font-size: 0.9em; color: #666; margin-bottom: 8px;">
+                                            {task.get('description', 'No description')[:100]}{'...' if len(task.get('description', '')) > 100 else ''}
+                                        </div>
+                                        <div style="display: flex; justify-content: space-between; font-size: 0.8em; color: #888;">
+                                            <span>👤 {task.get('assignee', 'Unassigned')}</span>
+                                            <span>⏱️ {task.get('estimated_hours', 0)}h</span>
+                                        </div>
+                                    </div>
+                                    """, unsafe_allow_html=True)
+                
+                # Task Details
+                st.subheader("📝 Task Details")
+                
+                task_df = pd.DataFrame(tasks)
+                
+                if not task_df.empty:
+                    # Task summary
+                    col1, col2 = st.columns(2)
                     
                     with col1:
-                        if st.button("📤 Export to JIRA", use_container_width=True):
-                            st.info("JIRA integration would be implemented here")
+                        # Priority distribution
+                        priority_counts = task_df['priority'].value_counts()
+                        fig_priority = px.pie(
+                            values=priority_counts.values,
+                            names=priority_counts.index,
+                            title="Task Priority Distribution"
+                        )
+                        st.plotly_chart(fig_priority, use_container_width=True)
                     
                     with col2:
-                        if st.button("📋 Export to Trello", use_container_width=True):
-                            st.info("Trello integration would be implemented here")
+                        # Assignee distribution
+                        assignee_counts = task_df['assignee'].value_counts()
+                        fig_assignee = px.bar(
+                            x=assignee_counts.values,
+                            y=assignee_counts.index,
+                            orientation='h',
+                            title="Tasks per Team Member"
+                        )
+                        st.plotly_chart(fig_assignee, use_container_width=True)
                     
-                    with col3:
-                        if st.button("📝 Export to Notion", use_container_width=True):
-                            st.info("Notion integration would be implemented here")
+                    # Task table
+                    st.markdown("**All Tasks**")
                     
-                    # Download options
-                    st.markdown("**Download Taskboard**")
+                    # Format task data for display
+                    display_tasks = []
+                    for task in tasks:
+                        display_tasks.append({
+                            'Task': task.get('title', 'Untitled'),
+                            'Priority': task.get('priority', 'medium').title(),
+                            'Assignee': task.get('assignee', 'Unassigned'),
+                            'Hours': task.get('estimated_hours', 0),
+                            'Due Date': task.get('due_date', 'TBD'),
+                            'Status': task.get('column_id', 'todo').replace('_', ' ').title()
+                        })
                     
-                    col1, col2 = st.columns(2)
+                    display_df = pd.DataFrame(display_tasks)
+                    st.dataframe(display_df, use_container_width=True)
+                
+                # Timeline & Milestones
+                milestones = taskboard_data.get('milestones', [])
+                
+                if milestones:
+                    st.subheader("🎯 Project Milestones")
                     
-                    with col1:
-                        # Download as JSON
+                    for milestone in milestones:
+                        with st.container():
+                            col1, col2 = st.columns([3, 1])
+                            
+                            with col1:
+                                st.markdown(f"**{milestone.get('name', 'Milestone')}**")
+                                st.write(milestone.get('description', 'No description'))
+                            
+                            with col2:
+                                st.write(f"📅 {milestone.get('date', 'TBD')}")
+                
+                # Integration Options
+                st.subheader("🔗 Export & Integration")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    if st.button("📤 Export to JIRA", use_container_width=True):
+                        st.info("JIRA integration would be implemented here")
+                
+                with col2:
+                    if st.button("📋 Export to Trello", use_container_width=True):
+                        st.info("Trello integration would be implemented here")
+                
+                with col3:
+                    if st.button("📝 Export to Notion", use_container_width=True):
+                        st.info("Notion integration would be implemented here")
+                
+                # Download options
+                st.markdown("**Download Taskboard**")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Download as JSON
+                    st.download_button(
+                        label="📄 Download JSON",
+                        data=json.dumps(taskboard_data, indent=2),
+                        file_name=f"taskboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        mime="application/json"
+                    )
+                
+                with col2:
+                    # Download as CSV
+                    if tasks:
+                        csv_data = pd.DataFrame(tasks).to_csv(index=False)
                         st.download_button(
-                            label="📄 Download JSON",
-                            data=json.dumps(taskboard_data, indent=2),
-                            file_name=f"taskboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                            mime="application/json"
+                            label="📊 Download CSV",
+                            data=csv_data,
+                            file_name=f"tasks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                            mime="text/csv"
                         )
-                    
-                    with col2:
-                        # Download as CSV
-                        if tasks:
-                            csv_data = pd.DataFrame(tasks).to_csv(index=False)
-                            st.download_button(
-                                label="📊 Download CSV",
-                                data=csv_data,
-                                file_name=f"tasks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                mime="text/csv"
-                            )
-                    
+                
+                if is_new:
                     # Save to database
                     try:
                         # Save project if not exists
@@ -463,11 +467,11 @@ def generate_taskboard_tab():
                     except Exception as e:
                         st.warning(f"Could not save to database: {str(e)}")
                 
-                else:
-                    st.error(f"❌ Taskboard generation failed: {result.get('error', 'Unknown error')}")
-            
-            except Exception as e:
-                st.error(f"❌ Error generating taskboard: {str(e)}")
+            else:
+                st.error(f"❌ Taskboard generation failed: {result.get('error', 'Unknown error')}")
+        
+        except Exception as e:
+            st.error(f"❌ Error generating taskboard: {str(e)}")
 
 
 def active_projects_tab():
@@ -1,9 +1,9 @@
 import streamlit as st
-import asyncio
 from datetime import datetime
 import json
 import pandas as pd
 import plotly.express as px
+from utils.job_tracking import start_job, job_result, tracked_job
 
 # Page configuration
 st.set_page_config(
@@ -18,8 +18,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("🎨 Branding Generator")
@@ -262,283 +262,287 @@ def main():
             'target_audience': brief_data.get('target_audience', {})
         }
         
-        with st.spinner("Generating comprehensive brand kit with AI..."):
-            try:
-                # Execute agent processing
-                result = asyncio.run(agent.process(input_data))
+        # Run in the background worker pool; the page picks the job up again on every rerun
+        start_job('branding_job', 'branding_generator', input_data)
+    
+    result, is_new = job_result('branding_job')
+    if result is not None:
+        tracked = tracked_job('branding_job')
+        input_data = tracked['input_data']
+        try:
+            if result.get('success'):
+                brand_kit = result.get('result', {})
+                
+                # Display Results
+                st.success("✅ Brand kit generated successfully!")
+                
+                # Brand Identity Overview
+                st.subheader("🎯 Brand Identity")
                 
-                if result.get('success'):
-                    brand_kit = result.get('result', {})
+                brand_identity = brand_kit.get('brand_identity', {})
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Core Identity**")
+                    st.write(f"**Brand Name:** {brand_identity.get('brand_name', 'N/A')}")
+                    st.write(f"**Tagline:** {brand_identity.get('tagline', 'N/A')}")
+                    st.write(f"**Archetype:** {brand_identity.get('brand_archetype', 'N/A')}")
                     
-                    # Display Results
-                    st.success("✅ Brand kit generated successfully!")
+                    if brand_identity.get('brand_personality'):
+                        st.markdown("**Personality Traits**")
+                        for trait in brand_identity['brand_personality']:
+                            st.write(f"• {trait}")
+                
+                with col2:
+                    st.markdown("**Mission & Vision**")
+                    if brand_identity.get('mission_statement'):
+                        st.markdown("**Mission:**")
+                        st.write(brand_identity['mission_statement'])
                     
-                    # Brand Identity Overview
-                    st.subheader("🎯 Brand Identity")
+                    if brand_identity.get('vision_statement'):
+                        st.markdown("**Vision:**")
+                        st.write(brand_identity['vision_statement'])
                     
-                    brand_identity = brand_kit.get('brand_identity', {})
+                    if brand_identity.get('core_values'):
+                        st.markdown("**Core Values:**")
+                        for value in brand_identity['core_values']:
+                            st.write(f"• {value}")
+                
+                # Visual Identity
+                st.subheader("🎨 Visual Identity")
+                
+                visual_identity = brand_kit.get('visual_identity', {})
+                
+                # Color Palette
+                if visual_identity.get('color_palette'):
+                    st.markdown("**Color Palette**")
                     
-                    col1, col2 = st.columns(2)
+                    color_palette = visual_identity['color_palette']
+                    
+                    col1, col2, col3 = st.columns(3)
                     
                     with col1:
-                        st.markdown("**Core Identity**")
-                        st.write(f"**Brand Name:** {brand_identity.get('brand_name', 'N/A')}")
-                        st.write(f"**Tagline:** {brand_identity.get('tagline', 'N/A')}")
-                        st.write(f"**Archetype:** {brand_identity.get('brand_archetype', 'N/A')}")
-                        
-                        if brand_identity.get('brand_personality'):
-                            st.markdown("**Personality Traits**")
-                            for trait in brand_identity['brand_personality']:
-                                st.write(f"• {trait}")
+                        if color_palette.get('primary'):
+                            primary = color_palette['primary']
+                            st.markdown("**Primary Color**")
+                            st.markdown(f"""
+                            <div style="background-color: {primary.get('hex', '#000000')}; 
+                                        padding: 20px; border-radius: 8px; color: white; text-align: center;">
+                                {primary.get('color', 'Primary')}
+                                <br>{primary.get('hex', '#000000')}
+                            </div>
+                            """, unsafe_allow_html=True)
+                            st.write(f"**Usage:** {primary.get('usage', 'Primary brand applications')}")
                     
                     with col2:
-                        st.markdown("**Mission & Vision**")
-                        if brand_identity.get('mission_statement'):
-                            st.markdown("**Mission:**")
-                            st.write(brand_identity['mission_statement'])
-                        
-                        if brand_identity.get('vision_statement'):
-                            st.markdown("**Vision:**")
-                            st.write(brand_identity['vision_statement'])
-                        
-                        if brand_identity.get('core_values'):
-                            st.markdown("**Core Values:**")
-                            for value in brand_identity['core_values']:
-                                st.write(f"• {value}")
-                    
-                    # Visual Identity
-                    st.subheader("🎨 Visual Identity")
-                    
-                    visual_identity = brand_kit.get('visual_identity', {})
-                    
-                    # Color Palette
-                    if visual_identity.get('color_palette'):
-                        st.markdown("**Color Palette**")
-                        
-                        color_palette = visual_identity['color_palette']
-                        
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            if color_palette.get('primary'):
-                                primary = color_palette['primary']
-                                st.markdown("**Primary Color**")
+                        if color_palette.get('secondary'):
+                            st.markdown("**Secondary Colors**")
+                            for secondary in color_palette['secondary'][:2]:
                                 st.markdown(f"""
-                                <div style="background-color: {primary.get('hex', '#000000')}; 
-                                            padding: 20px; border-radius: 8px; color: white; text-align: center;">
-                                    {primary.get('color', 'Primary')}
-                                    <br>{primary.get('hex', '#000000')}
+                                <div style="background-color: {secondary.get('hex', '#666666')}; 
+                                            padding: 15px; border-radius: 8px; color: white; text-align: center; margin: 5px 0;">
+                                    {secondary.get('color', 'Secondary')}
+                                    <br>{secondary.get('hex', '#666666')}
                                 </div>
                                 """, unsafe_allow_html=True)
-                                st.write(f"**Usage:** {primary.get('usage', 'Primary brand applications')}")
-                        
-                        with col2:
-                            if color_palette.get('secondary'):
-                                st.markdown("**Secondary Colors**")
-                                for secondary in color_palette['secondary'][:2]:
-                                    st.markdown(f"""
-                                    <div style="background-color: {secondary.get('hex', '#666666')}; 
-                                                padding: 15px; border-radius: 8px; color: white; text-align: center; margin: 5px 0;">
-                                        {secondary.get('color', 'Secondary')}
-                                        <br>{secondary.get('hex', '#666666')}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                        
-                        with col3:
-                            if color_palette.get('accent'):
-                                st.markdown("**Accent Colors**")
-                                for accent in color_palette['accent'][:2]:
-                                    st.markdown(f"""
-                                    <div style="background-color: {accent.get('hex', '#999999')}; 
-                                                padding: 15px; border-radius: 8px; color: white; text-align: center; margin: 5px 0;">
-                                        {accent.get('color', 'Accent')}
-                                        <br>{accent.get('hex', '#999999')}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                    
-                    # Typography
-                    if visual_identity.get('typography'):
-                        st.markdown("**Typography**")
-                        
-                        typography = visual_identity['typography']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if typography.get('primary_font'):
-                                primary_font = typography['primary_font']
-                                st.markdown("**Primary Font (Headlines)**")
-                                st.write(f"**Font:** {primary_font.get('name', 'N/A')}")
-                                st.write(f"**Category:** {primary_font.get('category', 'N/A')}")
-                                st.write(f"**Usage:** {primary_font.get('usage', 'N/A')}")
-                                
-                                if primary_font.get('alternatives'):
-                                    st.write("**Web-safe alternatives:**")
-                                    for alt in primary_font['alternatives']:
-                                        st.write(f"• {alt}")
-                        
-                        with col2:
-                            if typography.get('secondary_font'):
-                                secondary_font = typography['secondary_font']
-                                st.markdown("**Secondary Font (Body Text)**")
-                                st.write(f"**Font:** {secondary_font.get('name', 'N/A')}")
-                                st.write(f"**Category:** {secondary_font.get('category', 'N/A')}")
-                                st.write(f"**Usage:** {secondary_font.get('usage', 'N/A')}")
-                                
-                                if secondary_font.get('alternatives'):
-                                    st.write("**Web-safe alternatives:**")
-                                    for alt in secondary_font['alternatives']:
-                                        st.write(f"• {alt}")
                     
-                    # Logo Concepts
-                    if visual_identity.get('logo_concepts'):
-                        st.markdown("**Logo Concepts**")
-                        
-                        for i, concept in enumerate(visual_identity['logo_concepts']):
-                            with st.expander(f"Concept {i+1}: {concept.get('concept', 'Logo Concept')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**Style:** {concept.get('style', 'N/A')}")
-                                    st.write(f"**Description:** {concept.get('description', 'N/A')}")
-                                
-                                with col2:
-                                    if concept.get('elements'):
-                                        st.markdown("**Design Elements:**")
-                                        for element in concept['elements']:
-                                            st.write(f"• {element}")
-                    
-                    # Brand Voice & Messaging
-                    st.subheader("💬 Brand Voice & Messaging")
+                    with col3:
+                        if color_palette.get('accent'):
+                            st.markdown("**Accent Colors**")
+                            for accent in color_palette['accent'][:2]:
+                                st.markdown(f"""
+                                <div style="background-color: {accent.get('hex', '#999999')}; 
+                                            padding: 15px; border-radius: 8px; color: white; text-align: center; margin: 5px 0;">
+                                    {accent.get('color', 'Accent')}
+                                    <br>{accent.get('hex', '#999999')}
+                                </div>
+                                """, unsafe_allow_html=True)
+                
+                # Typography
+                if visual_identity.get('typography'):
+                    st.markdown("**Typography**")
                     
-                    brand_voice = brand_kit.get('brand_voice', {})
+                    typography = visual_identity['typography']
                     
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        st.markdown("**Tone of Voice**")
-                        st.write(f"**Overall Tone:** {brand_voice.get('tone_of_voice', 'N/A')}")
-                        st.write(f"**Communication Style:** {brand_voice.get('communication_style', 'N/A')}")
-                        
-                        if brand_voice.get('vocabulary'):
-                            vocabulary = brand_voice['vocabulary']
-                            if vocabulary.get('use'):
-                                st.markdown("**Words to Use:**")
-                                st.write(", ".join(vocabulary['use']))
+                        if typography.get('primary_font'):
+                            primary_font = typography['primary_font']
+                            st.markdown("**Primary Font (Headlines)**")
+                            st.write(f"**Font:** {primary_font.get('name', 'N/A')}")
+                            st.write(f"**Category:** {primary_font.get('category', 'N/A')}")
+                            st.write(f"**Usage:** {primary_font.get('usage', 'N/A')}")
                             
-                            if vocabulary.get('avoid'):
-                                st.markdown("**Words to Avoid:**")
-                                st.write(", ".join(vocabulary['avoid']))
+                            if primary_font.get('alternatives'):
+                                st.write("**Web-safe alternatives:**")
+                                for alt in primary_font['alternatives']:
+                                    st.write(f"• {alt}")
                     
                     with col2:
-                        if brand_voice.get('brand_story'):
-                            st.markdown("**Brand Story**")
-                            st.write(brand_voice['brand_story'])
+                        if typography.get('secondary_font'):
+                            secondary_font = typography['secondary_font']
+                            st.markdown("**Secondary Font (Body Text)**")
+                            st.write(f"**Font:** {secondary_font.get('name', 'N/A')}")
+                            st.write(f"**Category:** {secondary_font.get('category', 'N/A')}")
+                            st.write(f"**Usage:** {secondary_font.get('usage', 'N/A')}")
+                            
+                            if secondary_font.get('alternatives'):
+                                st.write("**Web-safe alternatives:**")
+                                for alt in secondary_font['alternatives']:
+                                    st.write(f"• {alt}")
+                
+                # Logo Concepts
+                if visual_identity.get('logo_concepts'):
+                    st.markdown("**Logo Concepts**")
                     
-                    # Messaging Pillars
-                    if brand_voice.get('messaging_pillars'):
-                        st.markdown("**Messaging Pillars**")
+                    for i, concept in enumerate(visual_identity['logo_concepts']):
+                        with st.expander(f"Concept {i+1}: {concept.get('concept', 'Logo Concept')}"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.write(f"**Style:** {concept.get('style', 'N/A')}")
+                                st.write(f"**Description:** {concept.get('description', 'N/A')}")
+                            
+                            with col2:
+                                if concept.get('elements'):
+                                    st.markdown("**Design Elements:**")
+                                    for element in concept['elements']:
+                                        st.write(f"• {element}")
+                
+                # Brand Voice & Messaging
+                st.subheader("💬 Brand Voice & Messaging")
+                
+                brand_voice = brand_kit.get('brand_voice', {})
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Tone of Voice**")
+                    st.write(f"**Overall Tone:** {brand_voice.get('tone_of_voice', 'N/A')}")
+                    st.write(f"**Communication Style:** {brand_voice.get('communication_style', 'N/A')}")
+                    
+                    if brand_voice.get('vocabulary'):
+                        vocabulary = brand_voice['vocabulary']
+                        if vocabulary.get('use'):
+                            st.markdown("**Words to Use:**")
+                            st.write(", ".join(vocabulary['use']))
                         
-                        for pillar in brand_voice['messaging_pillars']:
-                            with st.expander(f"Pillar: {pillar.get('pillar', 'Message Theme')}"):
-                                st.write(f"**Description:** {pillar.get('description', 'N/A')}")
-                                
-                                if pillar.get('example_messages'):
-                                    st.markdown("**Example Messages:**")
-                                    for msg in pillar['example_messages']:
-                                        st.write(f"• {msg}")
+                        if vocabulary.get('avoid'):
+                            st.markdown("**Words to Avoid:**")
+                            st.write(", ".join(vocabulary['avoid']))
+                
+                with col2:
+                    if brand_voice.get('brand_story'):
+                        st.markdown("**Brand Story**")
+                        st.write(brand_voice['brand_story'])
+                
+                # Messaging Pillars
+                if brand_voice.get('messaging_pillars'):
+                    st.markdown("**Messaging Pillars**")
+                    
+                    for pillar in brand_voice['messaging_pillars']:
+                        with st.expander(f"Pillar: {pillar.get('pillar', 'Message Theme')}"):
+                            st.write(f"**Description:** {pillar.get('description', 'N/A')}")
+                            
+                            if pillar.get('example_messages'):
+                                st.markdown("**Example Messages:**")
+                                for msg in pillar['example_messages']:
+                                    st.write(f"• {msg}")
+                
+                # Brand Applications
+                st.subheader("📱 Brand Applications")
+                
+                applications = brand_kit.get('applications', {})
+                
+                # Business Materials
+                if applications.get('business_materials'):
+                    st.markdown("**Business Materials**")
                     
-                    # Brand Applications
-                    st.subheader("📱 Brand Applications")
+                    for material in applications['business_materials']:
+                        with st.expander(f"{material.get('item', 'Business Material')}"):
+                            st.write(f"**Specifications:** {material.get('specifications', 'N/A')}")
+                            st.write(f"**Design Notes:** {material.get('design_notes', 'N/A')}")
+                
+                # Digital Applications
+                if applications.get('digital_applications'):
+                    st.markdown("**Digital Applications**")
                     
-                    applications = brand_kit.get('applications', {})
+                    for app in applications['digital_applications']:
+                        with st.expander(f"{app.get('platform', 'Digital Platform')}"):
+                            st.write(f"**Specifications:** {app.get('specifications', 'N/A')}")
+                            st.write(f"**Design Notes:** {app.get('design_notes', 'N/A')}")
+                
+                # Social Media Kit
+                if brand_kit.get('social_media_kit'):
+                    st.subheader("📱 Social Media Kit")
                     
-                    # Business Materials
-                    if applications.get('business_materials'):
-                        st.markdown("**Business Materials**")
-                        
-                        for material in applications['business_materials']:
-                            with st.expander(f"{material.get('item', 'Business Material')}"):
-                                st.write(f"**Specifications:** {material.get('specifications', 'N/A')}")
-                                st.write(f"**Design Notes:** {material.get('design_notes', 'N/A')}")
+                    social_kit = brand_kit['social_media_kit']
                     
-                    # Digital Applications
-                    if applications.get('digital_applications'):
-                        st.markdown("**Digital Applications**")
-                        
-                        for app in applications['digital_applications']:
-                            with st.expander(f"{app.get('platform', 'Digital Platform')}"):
-                                st.write(f"**Specifications:** {app.get('specifications', 'N/A')}")
-                                st.write(f"**Design Notes:** {app.get('design_notes', 'N/A')}")
+                    col1, col2 = st.columns(2)
                     
-                    # Social Media Kit
-                    if brand_kit.get('social_media_kit'):
-                        st.subheader("📱 Social Media Kit")
-                        
-                        social_kit = brand_kit['social_media_kit']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if social_kit.get('profile_setup'):
-                                profile = social_kit['profile_setup']
-                                st.markdown("**Profile Setup**")
-                                st.write(f"**Bio Template:** {profile.get('bio_template', 'N/A')}")
-                                st.write(f"**Posting Tone:** {profile.get('posting_tone', 'N/A')}")
-                                
-                                if profile.get('hashtag_strategy'):
-                                    st.write(f"**Hashtags:** {', '.join(profile['hashtag_strategy'])}")
-                        
-                        with col2:
-                            if social_kit.get('content_pillars'):
-                                st.markdown("**Content Strategy**")
-                                for pillar in social_kit['content_pillars']:
-                                    st.write(f"**{pillar.get('pillar', 'Content Type')}:** {pillar.get('percentage', '0')}%")
+                    with col1:
+                        if social_kit.get('profile_setup'):
+                            profile = social_kit['profile_setup']
+                            st.markdown("**Profile Setup**")
+                            st.write(f"**Bio Template:** {profile.get('bio_template', 'N/A')}")
+                            st.write(f"**Posting Tone:** {profile.get('posting_tone', 'N/A')}")
+                            
+                            if profile.get('hashtag_strategy'):
+                                st.write(f"**Hashtags:** {', '.join(profile['hashtag_strategy'])}")
                     
-                    # Usage Guidelines
-                    if brand_kit.get('usage_guidelines'):
-                        st.subheader("📏 Usage Guidelines")
-                        
-                        guidelines = brand_kit['usage_guidelines']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if guidelines.get('logo_usage'):
-                                logo_usage = guidelines['logo_usage']
-                                st.markdown("**Logo Usage**")
-                                st.write(f"**Minimum Size:** {logo_usage.get('minimum_size', 'N/A')}")
-                                st.write(f"**Clear Space:** {logo_usage.get('clear_space', 'N/A')}")
-                                
-                                if logo_usage.get('acceptable_variations'):
-                                    st.write("**Acceptable Variations:**")
-                                    for var in logo_usage['acceptable_variations']:
-                                        st.write(f"• {var}")
-                                
-                                if logo_usage.get('prohibited_uses'):
-                                    st.write("**Prohibited Uses:**")
-                                    for use in logo_usage['prohibited_uses']:
-                                        st.write(f"• {use}")
-                        
-                        with col2:
-                            if guidelines.get('color_usage'):
-                                color_usage = guidelines['color_usage']
-                                st.markdown("**Color Usage**")
-                                st.write(f"**Primary Applications:** {color_usage.get('primary_applications', 'N/A')}")
-                                st.write(f"**Accessibility:** {color_usage.get('accessibility', 'N/A')}")
-                                st.write(f"**Print Considerations:** {color_usage.get('print_considerations', 'N/A')}")
+                    with col2:
+                        if social_kit.get('content_pillars'):
+                            st.markdown("**Content Strategy**")
+                            for pillar in social_kit['content_pillars']:
+                                st.write(f"**{pillar.get('pillar', 'Content Type')}:** {pillar.get('percentage', '0')}%")
+                
+                # Usage Guidelines
+                if brand_kit.get('usage_guidelines'):
+                    st.subheader("📏 Usage Guidelines")
                     
-                    # Brand Audit Checklist
-                    if brand_kit.get('brand_audit_checklist'):
-                        st.subheader("✅ Brand Audit Checklist")
-                        
-                        checklist = brand_kit['brand_audit_checklist']
-                        
-                        for category in checklist:
-                            with st.expander(f"{category.get('category', 'Audit Category')}"):
-                                for item in category.get('items', []):
-                                    st.checkbox(item, key=f"audit_{hash(item)}")
+                    guidelines = brand_kit['usage_guidelines']
+                    
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        if guidelines.get('logo_usage'):
+                            logo_usage = guidelines['logo_usage']
+                            st.markdown("**Logo Usage**")
+                            st.write(f"**Minimum Size:** {logo_usage.get('minimum_size', 'N/A')}")
+                            st.write(f"**Clear Space:** {logo_usage.get('clear_space', 'N/A')}")
+                            
+                            if logo_usage.get('acceptable_variations'):
+                                st.write("**Acceptable Variations:**")
+                                for var in logo_usage['acceptable_variations']:
+                                    st.write(f"• {var}")
+                            
+                            if logo_usage.get('prohibited_uses'):
+                                st.write("**Prohibited Uses:**")
+                                for use in logo_usage['prohibited_uses']:
+                                    st.write(f"• {use}")
                     
+                    with col2:
+                        if guidelines.get('color_usage'):
+                            color_usage = guidelines['color_usage']
+                            st.markdown("**Color Usage**")
+                            st.write(f"**Primary Applications:** {color_usage.get('primary_applications', 'N/A')}")
+                            st.write(f"**Accessibility:** {color_usage.get('accessibility', 'N/A')}")
+                            st.write(f"**Print Considerations:** {color_usage.get('print_considerations', 'N/A')}")
+                
+                # Brand Audit Checklist
+                if brand_kit.get('brand_audit_checklist'):
+                    st.subheader("✅ Brand Audit Checklist")
+                    
+                    checklist = brand_kit['brand_audit_checklist']
+                    
+                    for category in checklist:
+                        with st.expander(f"{category.get('category', 'Audit Category')}"):
+                            for item in category.get('items', []):
+                                st.checkbox(item, key=f"audit_{hash(item)}")
+                
+                if is_new:
                     # Save to database
                     try:
                         # Log the processing
@@ -553,47 +557,47 @@ def main():
                     except Exception as e:
                         st.warning(f"Could not save to database: {str(e)}")
                     
-                    # Export Options
-                    st.subheader("📤 Export Brand Kit")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        # Download complete brand kit
+                # Export Options
+                st.subheader("📤 Export Brand Kit")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    # Download complete brand kit
+                    st.download_button(
+                        label="📄 Download Complete Kit",
+                        data=json.dumps(brand_kit, indent=2),
+                        file_name=f"brand_kit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        mime="application/json"
+                    )
+                
+                with col2:
+                    # Download color palette
+                    if visual_identity.get('color_palette'):
+                        color_data = visual_identity['color_palette']
                         st.download_button(
-                            label="📄 Download Complete Kit",
-                            data=json.dumps(brand_kit, indent=2),
-                            file_name=f"brand_kit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                            label="🎨 Download Colors",
+                            data=json.dumps(color_data, indent=2),
+                            file_name=f"color_palette_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                             mime="application/json"
                         )
-                    
-                    with col2:
-                        # Download color palette
-                        if visual_identity.get('color_palette'):
-                            color_data = visual_identity['color_palette']
-                            st.download_button(
-                                label="🎨 Download Colors",
-                                data=json.dumps(color_data, indent=2),
-                                file_name=f"color_palette_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                                mime="application/json"
-                            )
-                    
-                    with col3:
-                        # Download brand guidelines
-                        if brand_kit.get('usage_guidelines'):
-                            guidelines_data = brand_kit['usage_guidelines']
-                            st.download_button(
-                                label="📏 Download Guidelines",
-                                data=json.dumps(guidelines_data, indent=2),
-                                file_name=f"brand_guidelines_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                                mime="application/json"
-                            )
                 
-                else:
-                    st.error(f"❌ Brand kit generation failed: {result.get('error', 'Unknown error')}")
+                with col3:
+                    # Download brand guidelines
+                    if brand_kit.get('usage_guidelines'):
+                        guidelines_data = brand_kit['usage_guidelines']
+                        st.download_button(
+                            label="📏 Download Guidelines",
+                            data=json.dumps(guidelines_data, indent=2),
+                            file_name=f"brand_guidelines_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                            mime="application/json"
+                        )
             
-            except Exception as e:
-                st.error(f"❌ Error generating brand kit: {str(e)}")
+            else:
+                st.error(f"❌ Brand kit generation failed: {result.get('error', 'Unknown error')}")
+        
+        except Exception as e:
+            st.error(f"❌ Error generating brand kit: {str(e)}")
     
     # Help Section
     with st.expander("💡 Branding Best Practices"):
@@ -1,10 +1,10 @@
 import streamlit as st
-import asyncio
 from datetime import datetime, timedelta
 import json
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from utils.job_tracking import start_job, job_result, tracked_job
 
 # Page configuration
 st.set_page_config(
@@ -19,8 +19,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("📄 Proposal Generator")
@@ -273,288 +273,291 @@ def generate_proposal_tab():
             'company_info': company_info
         }
         
-        with st.spinner("Generating professional proposal with AI..."):
-            try:
-                # Execute agent processing
-                agent = st.session_state.orchestrator.get_agent('proposal_generator')
-                result = asyncio.run(agent.process(input_data))
+        # Run in the background worker pool; the page picks the job up again on every rerun
+        start_job('proposal_job', 'proposal_generator', input_data)
+    
+    result, is_new = job_result('proposal_job')
+    if result is not None:
+        tracked = tracked_job('proposal_job')
+        input_data = tracked['input_data']
+        try:
+            if result.get('success'):
+                proposal_data = result.get('result', {})
                 
-                if result.get('success'):
-                    proposal_data = result.get('result', {})
-                    
-                    # Display Results
-                    st.success("✅ Proposal generated successfully!")
-                    
-                    # Proposal Header
-                    st.subheader("📋 Proposal Overview")
-                    
-                    proposal_header = proposal_data.get('proposal_header', {})
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.metric("Proposal #", proposal_header.get('proposal_number', 'PROP-001'))
-                    
-                    with col2:
-                        st.metric("Date", proposal_header.get('date', datetime.now().strftime('%Y-%m-%d')))
-                    
-                    with col3:
-                        st.metric("Valid Until", proposal_header.get('valid_until', 'TBD'))
-                    
-                    with col4:
-                        st.metric("Client", proposal_header.get('client_name', 'Unknown'))
-                    
-                    # Executive Summary
-                    st.subheader("📊 Executive Summary")
-                    
-                    exec_summary = proposal_data.get('executive_summary', {})
-                    
-                    if exec_summary.get('overview'):
-                        st.markdown("**Project Overview**")
-                        st.write(exec_summary['overview'])
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        if exec_summary.get('key_benefits'):
-                            st.markdown("**Key Benefits**")
-                            for benefit in exec_summary['key_benefits']:
-                                st.write(f"• {benefit}")
-                    
-                    with col2:
-                        if exec_summary.get('success_metrics'):
-                            st.markdown("**Success Metrics**")
-                            for metric in exec_summary['success_metrics']:
-                                st.write(f"• {metric}")
-                    
-                    if exec_summary.get('timeline_summary'):
-                        st.info(f"**Timeline:** {exec_summary['timeline_summary']}")
-                    
-                    # Project Scope
-                    st.subheader("🎯 Project Scope")
-                    
-                    project_scope = proposal_data.get('project_scope', {})
-                    
-                    if project_scope.get('objectives'):
-                        st.markdown("**Objectives**")
-                        for objective in project_scope['objectives']:
-                            st.write(f"• {objective}")
-                    
-                    # Deliverables
-                    if project_scope.get('deliverables'):
-                        st.markdown("**Deliverables**")
-                        
-                        for i, deliverable in enumerate(project_scope['deliverables']):
-                            with st.expander(f"Deliverable {i+1}: {deliverable.get('item', 'Item')}"):
-                                st.write(f"**Description:** {deliverable.get('description', 'N/A')}")
-                                st.write(f"**Specifications:** {deliverable.get('specifications', 'N/A')}")
-                                st.write(f"**Acceptance Criteria:** {deliverable.get('acceptance_criteria', 'N/A')}")
-                    
-                    # Out of Scope
-                    if project_scope.get('out_of_scope'):
-                        st.markdown("**Out of Scope**")
-                        st.warning("The following items are NOT included in this proposal:")
-                        for item in project_scope['out_of_scope']:
-                            st.write(f"• {item}")
-                    
-                    # Methodology
-                    st.subheader("🔄 Methodology & Approach")
-                    
-                    methodology = proposal_data.get('methodology', {})
-                    
-                    if methodology.get('approach'):
-                        st.write(methodology['approach'])
-                    
-                    if methodology.get('phases'):
-                        st.markdown("**Project Phases**")
-                        
-                        for phase in methodology['phases']:
-                            with st.expander(f"{phase.get('name', 'Phase')} - {phase.get('duration', 'TBD')}"):
-                                st.write(f"**Description:** {phase.get('description', 'N/A')}")
-                                
-                                if phase.get('deliverables'):
-                                    st.markdown("**Phase Deliverables:**")
-                                    for deliverable in phase['deliverables']:
-                                        st.write(f"• {deliverable}")
-                                
-                                if phase.get('milestones'):
-                                    st.markdown("**Milestones:**")
-                                    for milestone in phase['milestones']:
-                                        st.write(f"• {milestone}")
-                    
-                    # Timeline
-                    st.subheader("📅 Project Timeline")
-                    
-                    timeline_data = proposal_data.get('timeline', {})
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write(f"**Project Duration:** {timeline_data.get('project_duration', 'TBD')}")
-                        st.write(f"**Start Date:** {timeline_data.get('start_date', 'TBD')}")
-                        st.write(f"**End Date:** {timeline_data.get('end_date', 'TBD')}")
-                    
-                    with col2:
-                        if timeline_data.get('buffer_time'):
-                            st.info(f"**Buffer Time:** {timeline_data['buffer_time']}")
-                    
-                    if timeline_data.get('key_milestones'):
-                        st.markdown("**Key Milestones**")
-                        
-                        milestone_df = pd.DataFrame(timeline_data['key_milestones'])
-                        if not milestone_df.empty:
-                            st.dataframe(milestone_df, use_container_width=True)
-                    
-                    # Investment & Pricing
-                    st.subheader("💰 Investment & Pricing")
-                    
-                    investment = proposal_data.get('investment', {})
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("**Pricing Information**")
-                        st.write(f"**Pricing Model:** {investment.get('pricing_model', 'TBD')}")
-                        st.write(f"**Total Investment:** {investment.get('total_investment', 'TBD')}")
-                        st.write(f"**Payment Terms:** {investment.get('payment_terms', 'TBD')}")
-                    
-                    with col2:
-                        if investment.get('payment_schedule'):
-                            st.markdown("**Payment Schedule**")
-                            for payment in investment['payment_schedule']:
-                                st.write(f"• {payment.get('milestone', 'Payment')}: {payment.get('amount', 'TBD')} - Due: {payment.get('due_date', 'TBD')}")
-                    
-                    if investment.get('included_services'):
-                        st.markdown("**Included Services**")
-                        for service in investment['included_services']:
-                            st.write(f"✅ {service}")
-                    
-                    if investment.get('additional_costs'):
-                        st.markdown("**Potential Additional Costs**")
-                        for cost in investment['additional_costs']:
-                            st.write(f"⚠️ {cost}")
+                # Display Results
+                st.success("✅ Proposal generated successfully!")
+                
+                # Proposal Header
+                st.subheader("📋 Proposal Overview")
+                
+                proposal_header = proposal_data.get('proposal_header', {})
+                
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    st.metric("Proposal #", proposal_header.get('proposal_number', 'PROP-001'))
+                
+                with col2:
+                    st.metric("Date", proposal_header.get('date', datetime.now().strftime('%Y-%m-%d')))
+                
+                with col3:
+                    st.metric("Valid Until", proposal_header.get('valid_until', 'TBD'))
+                
+                with col4:
+                    st.metric("Client", proposal_header.get('client_name', 'Unknown'))
+                
+                # Executive Summary
+                st.subheader("📊 Executive Summary")
+                
+                exec_summary = proposal_data.get('executive_summary', {})
+                
+                if exec_summary.get('overview'):
+                    st.markdown("**Project Overview**")
+                    st.write(exec_summary['overview'])
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if exec_summary.get('key_benefits'):
+                        st.markdown("**Key Benefits**")
+                        for benefit in exec_summary['key_benefits']:
+                            st.write(f"• {benefit}")
+                
+                with col2:
+                    if exec_summary.get('success_metrics'):
+                        st.markdown("**Success Metrics**")
+                        for metric in exec_summary['success_metrics']:
+                            st.write(f"• {metric}")
+                
+                if exec_summary.get('timeline_summary'):
+                    st.info(f"**Timeline:** {exec_summary['timeline_summary']}")
+                
+                # Project Scope
+                st.subheader("🎯 Project Scope")
+                
+                project_scope = proposal_data.get('project_scope', {})
+                
+                if project_scope.get('objectives'):
+                    st.markdown("**Objectives**")
+                    for objective in project_scope['objectives']:
+                        st.write(f"• {objective}")
+                
+                # Deliverables
+                if project_scope.get('deliverables'):
+                    st.markdown("**Deliverables**")
+                    
+                    for i, deliverable in enumerate(project_scope['deliverables']):
+                        with st.expander(f"Deliverable {i+1}: {deliverable.get('item', 'Item')}"):
+                            st.write(f"**Description:** {deliverable.get('description', 'N/A')}")
+                            st.write(f"**Specifications:** {deliverable.get('specifications', 'N/A')}")
+                            st.write(f"**Acceptance Criteria:** {deliverable.get('acceptance_criteria', 'N/A')}")
+                
+                # Out of Scope
+                if project_scope.get('out_of_scope'):
+                    st.markdown("**Out of Scope**")
+                    st.warning("The following items are NOT included in this proposal:")
+                    for item in project_scope['out_of_scope']:
+                        st.write(f"• {item}")
+                
+                # Methodology
+                st.subheader("🔄 Methodology & Approach")
+                
+                methodology = proposal_data.get('methodology', {})
+                
+                if methodology.get('approach'):
+                    st.write(methodology['approach'])
+                
+                if methodology.get('phases'):
+                    st.markdown("**Project Phases**")
                     
-                    # Team & Expertise
-                    if proposal_data.get('team_and_expertise'):
-                        st.subheader("👥 Team & Expertise")
-                        
-                        team_info = proposal_data['team_and_expertise']
-                        
-                        if team_info.get('team_overview'):
-                            st.write(team_info['team_overview'])
-                        
-                        if team_info.get('key_team_members'):
-                            st.markdown("**Key Team Members**")
+                    for phase in methodology['phases']:
+                        with st.expander(f"{phase.get('name', 'Phase')} - {phase.get('duration', 'TBD')}"):
+                            st.write(f"**Description:** {phase.get('description', 'N/A')}")
                             
-                            for member in team_info['key_team_members']:
-                                with st.expander(f"{member.get('name', 'Team Member')} - {member.get('role', 'Role')}"):
-                                    st.write(f"**Experience:** {member.get('experience', 'N/A')}")
-                    
-                    # Terms & Conditions
-                    st.subheader("📜 Terms & Conditions")
-                    
-                    terms = proposal_data.get('terms_and_conditions', {})
-                    
-                    if terms.get('project_terms'):
-                        st.markdown("**Project Terms**")
-                        for term in terms['project_terms']:
-                            st.write(f"• {term}")
+                            if phase.get('deliverables'):
+                                st.markdown("**Phase Deliverables:**")
+                                for deliverable in phase['deliverables']:
+                                    st.write(f"• {deliverable}")
+                            
+                            if phase.get('milestones'):
+                                st.markdown("**Milestones:**")
+                                for milestone in phase['milestones']:
+                                    st.write(f"• {milestone}")
+                
+                # Timeline
+                st.subheader("📅 Project Timeline")
+                
+                timeline_data = proposal_data.get('timeline', {})
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**Project Duration:** {timeline_data.get('project_duration', 'TBD')}")
+                    st.write(f"**Start Date:** {timeline_data.get('start_date', 'TBD')}")
+                    st.write(f"**End Date:** {timeline_data.get('end_date', 'TBD')}")
+                
+                with col2:
+                    if timeline_data.get('buffer_time'):
+                        st.info(f"**Buffer Time:** {timeline_data['buffer_time']}")
+                
+                if timeline_data.get('key_milestones'):
+                    st.markdown("**Key Milestones**")
                     
-                    col1, col2 = st.columns(2)
+                    milestone_df = pd.DataFrame(timeline_data['key_milestones'])
+                    if not milestone_df.empty:
+                        st.dataframe(milestone_df, use_container_width=True)
+                
+                # Investment & Pricing
+                st.subheader("💰 Investment & Pricing")
+                
+                investment = proposal_data.get('investment', {})
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Pricing Information**")
+                    st.write(f"**Pricing Model:** {investment.get('pricing_model', 'TBD')}")
+                    st.write(f"**Total Investment:** {investment.get('total_investment', 'TBD')}")
+                    st.write(f"**Payment Terms:** {investment.get('payment_terms', 'TBD')}")
+                
+                with col2:
+                    if investment.get('payment_schedule'):
+                        st.markdown("**Payment Schedule**")
+                        for payment in investment['payment_schedule']:
+                            st.write(f"• {payment.get('milestone', 'Payment')}: {payment.get('amount', 'TBD')} - Due: {payment.get('due_date', 'TBD')}")
+                
+                if investment.get('included_services'):
+                    st.markdown("**Included Services**")
+                    for service in investment['included_services']:
+                        st.write(f"✅ {service}")
+                
+                if investment.get('additional_costs'):
+                    st.markdown("**Potential Additional Costs**")
+                    for cost in investment['additional_costs']:
+                        st.write(f"⚠️ {cost}")
+                
+                # Team & Expertise
+                if proposal_data.get('team_and_expertise'):
+                    st.subheader("👥 Team & Expertise")
                     
-                    with col1:
-                        if terms.get('intellectual_property'):
-                            st.markdown("**Intellectual Property**")
-                            st.write(terms['intellectual_property'])
-                        
-                        if terms.get('revision_policy'):
-                            st.markdown("**Revision Policy**")
-                            st.write(terms['revision_policy'])
+                    team_info = proposal_data['team_and_expertise']
                     
-                    with col2:
-                        if terms.get('cancellation_policy'):
-                            st.markdown("**Cancellation Policy**")
-                            st.write(terms['cancellation_policy'])
-                        
-                        if terms.get('liability_limitation'):
-                            st.markdown("**Liability Limitation**")
-                            st.write(terms['liability_limitation'])
+                    if team_info.get('team_overview'):
+                        st.write(team_info['team_overview'])
                     
-                    # Next Steps
-                    if proposal_data.get('next_steps'):
-                        st.subheader("🚀 Next Steps")
-                        
-                        next_steps = proposal_data['next_steps']
-                        
-                        if next_steps.get('proposal_approval'):
-                            st.info(f"**Approval Process:** {next_steps['proposal_approval']}")
-                        
-                        if next_steps.get('project_kickoff'):
-                            st.info(f"**Project Kickoff:** {next_steps['project_kickoff']}")
+                    if team_info.get('key_team_members'):
+                        st.markdown("**Key Team Members**")
                         
-                        if next_steps.get('contact_information'):
-                            st.info(f"**Contact Information:** {next_steps['contact_information']}")
+                        for member in team_info['key_team_members']:
+                            with st.expander(f"{member.get('name', 'Team Member')} - {member.get('role', 'Role')}"):
+                                st.write(f"**Experience:** {member.get('experience', 'N/A')}")
+                
+                # Terms & Conditions
+                st.subheader("📜 Terms & Conditions")
+                
+                terms = proposal_data.get('terms_and_conditions', {})
+                
+                if terms.get('project_terms'):
+                    st.markdown("**Project Terms**")
+                    for term in terms['project_terms']:
+                        st.write(f"• {term}")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if terms.get('intellectual_property'):
+                        st.markdown("**Intellectual Property**")
+                        st.write(terms['intellectual_property'])
+                    
+                    if terms.get('revision_policy'):
+                        st.markdown("**Revision Policy**")
+                        st.write(terms['revision_policy'])
+                
+                with col2:
+                    if terms.get('cancellation_policy'):
+                        st.markdown("**Cancellation Policy**")
+                        st.write(terms['cancellation_policy'])
+                    
+                    if terms.get('liability_limitation'):
+                        st.markdown("**Liability Limitation**")
+                        st.write(terms['liability_limitation'])
+                
+                # Next Steps
+                if proposal_data.get('next_steps'):
+                    st.subheader("🚀 Next Steps")
                     
-                    # Risk Assessment
-                    if proposal_data.get('risk_mitigation'):
-                        st.subheader("⚠️ Risk Assessment")
-                        
-                        with st.expander("View Risk Analysis"):
-                            risks = proposal_data['risk_mitigation']
-                            for risk_category, risk_info in risks.items():
-                                if isinstance(risk_info, dict):
-                                    st.markdown(f"**{risk_category.replace('_', ' ').title()}**")
-                                    st.write(f"Description: {risk_info.get('description', 'N/A')}")
-                                    st.write(f"Mitigation: {risk_info.get('mitigation', 'N/A')}")
-                                    st.divider()
+                    next_steps = proposal_data['next_steps']
                     
-                    # Actions
-                    st.subheader("🎯 Actions")
+                    if next_steps.get('proposal_approval'):
+                        st.info(f"**Approval Process:** {next_steps['proposal_approval']}")
                     
-                    col1, col2, col3 = st.columns(3)
+                    if next_steps.get('project_kickoff'):
+                        st.info(f"**Project Kickoff:** {next_steps['project_kickoff']}")
                     
-                    with col1:
-                        if st.button("📄 Generate Contract", use_container_width=True):
-                            with st.spinner("Generating contract..."):
-                                try:
-                                    contract_result = asyncio.run(agent.generate_contract(proposal_data))
-                                    
-                                    if contract_result.get('success'):
-                                        st.success("✅ Contract generated!")
-                                        st.json(contract_result['contract'])
-                                    else:
-                                        st.error(f"❌ Contract generation failed: {contract_result.get('error')}")
+                    if next_steps.get('contact_information'):
+                        st.info(f"**Contact Information:** {next_steps['contact_information']}")
+                
+                # Risk Assessment
+                if proposal_data.get('risk_mitigation'):
+                    st.subheader("⚠️ Risk Assessment")
+                    
+                    with st.expander("View Risk Analysis"):
+                        risks = proposal_data['risk_mitigation']
+                        for risk_category, risk_info in risks.items():
+                            if isinstance(risk_info, dict):
+                                st.markdown(f"**{risk_category.replace('_', ' ').title()}**")
+                                st.write(f"Description: {risk_info.get('description', 'N/A')}")
+                                st.write(f"Mitigation: {risk_info.get('mitigation', 'N/A')}")
+                                st.divider()
+                
+                # Actions
+                st.subheader("🎯 Actions")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    if st.button("📄 Generate Contract", use_container_width=True):
+                        with st.spinner("Generating contract..."):
+                            try:
+                                contract_result = st.session_state.orchestrator.run_sync(agent.generate_contract(proposal_data))
                                 
-                                except Exception as e:
-                                    st.error(f"❌ Error generating contract: {str(e)}")
-                    
-                    with col2:
-                        if st.button("📧 Email Proposal", use_container_width=True):
-                            st.info("Email integration would be implemented here")
-                    
-                    with col3:
-                        if st.button("🔄 Create Revision", use_container_width=True):
-                            st.info("Would create a new version for editing")
-                    
-                    # Export Options
-                    st.subheader("📤 Export Proposal")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Download as JSON
-                        st.download_button(
-                            label="📄 Download JSON",
-                            data=json.dumps(proposal_data, indent=2),
-                            file_name=f"proposal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                            mime="application/json"
-                        )
-                    
-                    with col2:
-                        # Generate PDF would be implemented with a PDF library
-                        if st.button("📑 Generate PDF", use_container_width=True):
-                            st.info("PDF generation would be implemented with reportlab or similar")
-                    
+                                if contract_result.get('success'):
+                                    st.success("✅ Contract generated!")
+                                    st.json(contract_result['contract'])
+                                else:
+                                    st.error(f"❌ Contract generation failed: {contract_result.get('error')}")
+                            
+                            except Exception as e:
+                                st.error(f"❌ Error generating contract: {str(e)}")
+                
+                with col2:
+                    if st.button("📧 Email Proposal", use_container_width=True):
+                        st.info("Email integration would be implemented here")
+                
+                with col3:
+                    if st.button("🔄 Create Revision", use_container_width=True):
+                        st.info("Would create a new version for editing")
+                
+                # Export Options
+                st.subheader("📤 Export Proposal")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Download as JSON
+                    st.download_button(
+                        label="📄 Download JSON",
+                        data=json.dumps(proposal_data, indent=2),
+                        file_name=f"proposal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        mime="application/json"
+                    )
+                
+                with col2:
+                    # Generate PDF would be implemented with a PDF library
+                    if st.button("📑 Generate PDF", use_container_width=True):
+                        st.info("PDF generation would be implemented with reportlab or similar")
+                
+                if is_new:
                     # Save to database
                     try:
                         # Log the processing
@@ -569,11 +572,11 @@ def generate_proposal_tab():
                     except Exception as e:
                         st.warning(f"Could not save to database: {str(e)}")
                 
-                else:
-                    st.error(f"❌ Proposal generation failed: {result.get('error', 'Unknown error')}")
-            
-            except Exception as e:
-                st.error(f"❌ Error generating proposal: {str(e)}")
+            else:
+                st.error(f"❌ Proposal generation failed: {result.get('error', 'Unknown error')}")
+        
+        except Exception as e:
+            st.error(f"❌ Error generating proposal: {str(e)}")
 
 
 def proposal_templates_tab():
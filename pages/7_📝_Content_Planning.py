@@ -1,11 +1,11 @@
 import streamlit as st
-import asyncio
 from datetime import datetime, timedelta
 import json
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from utils.job_tracking import start_job, job_result, tracked_job
 
 # Page configuration
 st.set_page_config(
@@ -20,8 +20,8 @@ if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = AgentOrchestrator()
 
 if 'db_manager' not in st.session_state:
-    from core.database import DatabaseManager
-    st.session_state.db_manager = DatabaseManager()
+    from core.resources import get_database_manager
+    st.session_state.db_manager = get_database_manager()
 
 def main():
     st.title("📝 Content Planning")
@@ -313,276 +313,280 @@ def generate_content_plan_tab():
             'timeline': timeline
         }
         
-        with st.spinner("Generating comprehensive content plan with AI..."):
-            try:
-                # Execute agent processing
-                result = asyncio.run(agent.process(input_data))
+        # Run in the background worker pool; the page picks the job up again on every rerun
+        start_job('content_plan_job', 'content_plan_generator', input_data)
+    
+    result, is_new = job_result('content_plan_job')
+    if result is not None:
+        tracked = tracked_job('content_plan_job')
+        input_data = tracked['input_data']
+        try:
+            if result.get('success'):
+                content_plan = result.get('result', {})
+                
+                # Display Results
+                st.success("✅ Content plan generated successfully!")
+                
+                # Content Strategy Overview
+                st.subheader("🎯 Content Strategy")
+                
+                content_strategy = content_plan.get('content_strategy', {})
                 
-                if result.get('success'):
-                    content_plan = result.get('result', {})
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if content_strategy.get('objectives'):
+                        st.markdown("**Content Objectives**")
+                        for obj in content_strategy['objectives']:
+                            st.write(f"• {obj}")
                     
-                    # Display Results
-                    st.success("✅ Content plan generated successfully!")
+                    if content_strategy.get('target_audience'):
+                        audience = content_strategy['target_audience']
+                        st.markdown("**Target Audience**")
+                        st.write(f"**Primary:** {audience.get('primary_persona', 'Not specified')}")
+                        
+                        if audience.get('preferred_channels'):
+                            st.write("**Preferred Channels:** " + ", ".join(audience['preferred_channels']))
+                
+                with col2:
+                    if content_strategy.get('brand_voice'):
+                        voice = content_strategy['brand_voice']
+                        st.markdown("**Brand Voice**")
+                        st.write(f"**Tone:** {voice.get('tone', 'Not specified')}")
+                        st.write(f"**Style:** {voice.get('style', 'Not specified')}")
+                        
+                        if voice.get('do_use'):
+                            st.write("**Use:** " + ", ".join(voice['do_use'][:3]))
+                        if voice.get('dont_use'):
+                            st.write("**Avoid:** " + ", ".join(voice['dont_use'][:3]))
+                
+                # Content Pillars
+                if content_strategy.get('content_pillars'):
+                    st.subheader("🏛️ Content Pillars")
+                    
+                    pillars_data = []
+                    for pillar in content_strategy['content_pillars']:
+                        pillars_data.append({
+                            'Pillar': pillar.get('pillar', 'Unknown'),
+                            'Description': pillar.get('description', 'No description'),
+                            'Percentage': pillar.get('percentage', '0%'),
+                            'Content Types': ', '.join(pillar.get('content_types', []))
+                        })
+                    
+                    if pillars_data:
+                        df_pillars = pd.DataFrame(pillars_data)
+                        st.dataframe(df_pillars, use_container_width=True)
+                        
+                        # Pillar distribution chart
+                        percentages = [int(p.get('percentage', '0%').replace('%', '')) for p in content_strategy['content_pillars']]
+                        names = [p.get('pillar', 'Unknown') for p in content_strategy['content_pillars']]
+                        
+                        if percentages:
+                            fig_pillars = px.pie(
+                                values=percentages,
+                                names=names,
+                                title="Content Pillar Distribution"
+                            )
+                            st.plotly_chart(fig_pillars, use_container_width=True)
+                
+                # Content Calendar Overview
+                st.subheader("📅 Content Calendar")
+                
+                calendar_data = content_plan.get('content_calendar', {})
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    st.metric("Plan Duration", calendar_data.get('duration', 'Not specified'))
+                
+                with col2:
+                    st.metric("Start Date", calendar_data.get('start_date', 'Not specified'))
+                
+                with col3:
+                    st.metric("End Date", calendar_data.get('end_date', 'Not specified'))
+                
+                # Monthly Themes
+                if calendar_data.get('monthly_themes'):
+                    st.markdown("**Monthly Themes**")
+                    
+                    for theme in calendar_data['monthly_themes']:
+                        with st.expander(f"{theme.get('month', 'Month')}: {theme.get('theme', 'Theme')}"):
+                            if theme.get('focus_areas'):
+                                st.markdown("**Focus Areas:**")
+                                for area in theme['focus_areas']:
+                                    st.write(f"• {area}")
+                            
+                            if theme.get('content_count'):
+                                counts = theme['content_count']
+                                col1, col2, col3 = st.columns(3)
+                                
+                                with col1:
+                                    st.metric("Blog Posts", counts.get('blog_posts', 0))
+                                with col2:
+                                    st.metric("Social Posts", counts.get('social_posts', 0))
+                                with col3:
+                                    st.metric("Other Content", counts.get('other_content', 0))
+                
+                # Content Types & Topics
+                st.subheader("📝 Content Types & Topics")
+                
+                content_types_data = content_plan.get('content_types', [])
+                
+                for content_type in content_types_data:
+                    type_name = content_type.get('type', 'Unknown Type')
+                    frequency = content_type.get('frequency', 'Not specified')
+                    topics = content_type.get('topics', [])
                     
-                    # Content Strategy Overview
-                    st.subheader("🎯 Content Strategy")
+                    with st.expander(f"{type_name.title()} - {frequency}"):
+                        if topics:
+                            st.markdown("**Content Topics:**")
+                            
+                            topics_df = pd.DataFrame(topics)
+                            if not topics_df.empty:
+                                for _, topic in topics_df.iterrows():
+                                    st.markdown(f"**{topic.get('title', 'Untitled')}**")
+                                    st.write(f"Description: {topic.get('description', 'No description')}")
+                                    
+                                    if topic.get('keywords'):
+                                        st.write(f"Keywords: {', '.join(topic['keywords'])}")
+                                    
+                                    if topic.get('call_to_action'):
+                                        st.write(f"CTA: {topic['call_to_action']}")
+                                    
+                                    st.divider()
+                        else:
+                            st.info("No specific topics generated for this content type")
+                
+                # Social Media Strategy
+                if content_plan.get('social_media_calendar'):
+                    st.subheader("📱 Social Media Strategy")
                     
-                    content_strategy = content_plan.get('content_strategy', {})
+                    social_calendar = content_plan['social_media_calendar']
                     
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        if content_strategy.get('objectives'):
-                            st.markdown("**Content Objectives**")
-                            for obj in content_strategy['objectives']:
-                                st.write(f"• {obj}")
-                        
-                        if content_strategy.get('target_audience'):
-                            audience = content_strategy['target_audience']
-                            st.markdown("**Target Audience**")
-                            st.write(f"**Primary:** {audience.get('primary_persona', 'Not specified')}")
-                            
-                            if audience.get('preferred_channels'):
-                                st.write("**Preferred Channels:** " + ", ".join(audience['preferred_channels']))
+                        if social_calendar.get('platforms'):
+                            st.markdown("**Platforms**")
+                            for platform in social_calendar['platforms']:
+                                st.write(f"• {platform}")
                     
                     with col2:
-                        if content_strategy.get('brand_voice'):
-                            voice = content_strategy['brand_voice']
-                            st.markdown("**Brand Voice**")
-                            st.write(f"**Tone:** {voice.get('tone', 'Not specified')}")
-                            st.write(f"**Style:** {voice.get('style', 'Not specified')}")
-                            
-                            if voice.get('do_use'):
-                                st.write("**Use:** " + ", ".join(voice['do_use'][:3]))
-                            if voice.get('dont_use'):
-                                st.write("**Avoid:** " + ", ".join(voice['dont_use'][:3]))
+                        if social_calendar.get('content_mix'):
+                            st.markdown("**Content Mix**")
+                            mix = social_calendar['content_mix']
+                            for content_type, percentage in mix.items():
+                                st.write(f"• {content_type.title()}: {percentage}")
                     
-                    # Content Pillars
-                    if content_strategy.get('content_pillars'):
-                        st.subheader("🏛️ Content Pillars")
+                    # Weekly Posting Schedule
+                    if social_calendar.get('posting_schedule'):
+                        st.markdown("**Weekly Posting Schedule**")
                         
-                        pillars_data = []
-                        for pillar in content_strategy['content_pillars']:
-                            pillars_data.append({
-                                'Pillar': pillar.get('pillar', 'Unknown'),
-                                'Description': pillar.get('description', 'No description'),
-                                'Percentage': pillar.get('percentage', '0%'),
-                                'Content Types': ', '.join(pillar.get('content_types', []))
-                            })
+                        schedule = social_calendar['posting_schedule']
+                        schedule_df = pd.DataFrame.from_dict(schedule, orient='index')
+                        schedule_df.index.name = 'Day'
+                        schedule_df.columns = ['Content Type']
                         
-                        if pillars_data:
-                            df_pillars = pd.DataFrame(pillars_data)
-                            st.dataframe(df_pillars, use_container_width=True)
-                            
-                            # Pillar distribution chart
-                            percentages = [int(p.get('percentage', '0%').replace('%', '')) for p in content_strategy['content_pillars']]
-                            names = [p.get('pillar', 'Unknown') for p in content_strategy['content_pillars']]
-                            
-                            if percentages:
-                                fig_pillars = px.pie(
-                                    values=percentages,
-                                    names=names,
-                                    title="Content Pillar Distribution"
-                                )
-                                st.plotly_chart(fig_pillars, use_container_width=True)
-                    
-                    # Content Calendar Overview
-                    st.subheader("📅 Content Calendar")
+                        st.dataframe(schedule_df, use_container_width=True)
+                
+                # SEO Strategy
+                if content_plan.get('seo_strategy'):
+                    st.subheader("🔍 SEO Strategy")
                     
-                    calendar_data = content_plan.get('content_calendar', {})
+                    seo = content_plan['seo_strategy']
                     
-                    col1, col2, col3 = st.columns(3)
+                    col1, col2 = st.columns(2)
                     
                     with col1:
-                        st.metric("Plan Duration", calendar_data.get('duration', 'Not specified'))
+                        if seo.get('primary_keywords'):
+                            st.markdown("**Primary Keywords**")
+                            for keyword in seo['primary_keywords']:
+                                st.write(f"• {keyword}")
                     
                     with col2:
-                        st.metric("Start Date", calendar_data.get('start_date', 'Not specified'))
+                        if seo.get('secondary_keywords'):
+                            st.markdown("**Secondary Keywords**")
+                            for keyword in seo['secondary_keywords']:
+                                st.write(f"• {keyword}")
                     
-                    with col3:
-                        st.metric("End Date", calendar_data.get('end_date', 'Not specified'))
-                    
-                    # Monthly Themes
-                    if calendar_data.get('monthly_themes'):
-                        st.markdown("**Monthly Themes**")
+                    # Content Clusters
+                    if seo.get('content_clusters'):
+                        st.markdown("**Content Clusters**")
                         
-                        for theme in calendar_data['monthly_themes']:
-                            with st.expander(f"{theme.get('month', 'Month')}: {theme.get('theme', 'Theme')}"):
-                                if theme.get('focus_areas'):
-                                    st.markdown("**Focus Areas:**")
-                                    for area in theme['focus_areas']:
-                                        st.write(f"• {area}")
+                        for cluster in seo['content_clusters']:
+                            with st.expander(f"Cluster: {cluster.get('topic', 'Topic')}"):
+                                st.write(f"**Pillar Content:** {cluster.get('pillar_content', 'Not specified')}")
                                 
-                                if theme.get('content_count'):
-                                    counts = theme['content_count']
-                                    col1, col2, col3 = st.columns(3)
-                                    
-                                    with col1:
-                                        st.metric("Blog Posts", counts.get('blog_posts', 0))
-                                    with col2:
-                                        st.metric("Social Posts", counts.get('social_posts', 0))
-                                    with col3:
-                                        st.metric("Other Content", counts.get('other_content', 0))
+                                if cluster.get('cluster_content'):
+                                    st.markdown("**Supporting Content:**")
+                                    for content in cluster['cluster_content']:
+                                        st.write(f"• {content}")
+                
+                # Content Templates
+                if content_plan.get('content_templates'):
+                    st.subheader("📄 Content Templates")
                     
-                    # Content Types & Topics
-                    st.subheader("📝 Content Types & Topics")
+                    templates = content_plan['content_templates']
                     
-                    content_types_data = content_plan.get('content_types', [])
+                    for template in templates:
+                        with st.expander(f"{template.get('template_name', 'Template')} - {template.get('content_type', 'Unknown Type')}"):
+                            if template.get('structure'):
+                                st.markdown("**Structure:**")
+                                for section in template['structure']:
+                                    st.write(f"• {section}")
+                            
+                            if template.get('example'):
+                                st.markdown("**Example:**")
+                                st.text_area("", value=template['example'], height=100, key=f"template_{template.get('template_name', 'default')}")
+                
+                # Performance Metrics
+                if content_plan.get('performance_metrics'):
+                    st.subheader("📊 Performance Metrics")
                     
-                    for content_type in content_types_data:
-                        type_name = content_type.get('type', 'Unknown Type')
-                        frequency = content_type.get('frequency', 'Not specified')
-                        topics = content_type.get('topics', [])
-                        
-                        with st.expander(f"{type_name.title()} - {frequency}"):
-                            if topics:
-                                st.markdown("**Content Topics:**")
-                                
-                                topics_df = pd.DataFrame(topics)
-                                if not topics_df.empty:
-                                    for _, topic in topics_df.iterrows():
-                                        st.markdown(f"**{topic.get('title', 'Untitled')}**")
-                                        st.write(f"Description: {topic.get('description', 'No description')}")
-                                        
-                                        if topic.get('keywords'):
-                                            st.write(f"Keywords: {', '.join(topic['keywords'])}")
-                                        
-                                        if topic.get('call_to_action'):
-                                            st.write(f"CTA: {topic['call_to_action']}")
-                                        
-                                        st.divider()
-                            else:
-                                st.info("No specific topics generated for this content type")
+                    metrics = content_plan['performance_metrics']
                     
-                    # Social Media Strategy
-                    if content_plan.get('social_media_calendar'):
-                        st.subheader("📱 Social Media Strategy")
-                        
-                        social_calendar = content_plan['social_media_calendar']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if social_calendar.get('platforms'):
-                                st.markdown("**Platforms**")
-                                for platform in social_calendar['platforms']:
-                                    st.write(f"• {platform}")
-                        
-                        with col2:
-                            if social_calendar.get('content_mix'):
-                                st.markdown("**Content Mix**")
-                                mix = social_calendar['content_mix']
-                                for content_type, percentage in mix.items():
-                                    st.write(f"• {content_type.title()}: {percentage}")
-                        
-                        # Weekly Posting Schedule
-                        if social_calendar.get('posting_schedule'):
-                            st.markdown("**Weekly Posting Schedule**")
-                            
-                            schedule = social_calendar['posting_schedule']
-                            schedule_df = pd.DataFrame.from_dict(schedule, orient='index')
-                            schedule_df.index.name = 'Day'
-                            schedule_df.columns = ['Content Type']
-                            
-                            st.dataframe(schedule_df, use_container_width=True)
+                    col1, col2 = st.columns(2)
                     
-                    # SEO Strategy
-                    if content_plan.get('seo_strategy'):
-                        st.subheader("🔍 SEO Strategy")
-                        
-                        seo = content_plan['seo_strategy']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if seo.get('primary_keywords'):
-                                st.markdown("**Primary Keywords**")
-                                for keyword in seo['primary_keywords']:
-                                    st.write(f"• {keyword}")
-                        
-                        with col2:
-                            if seo.get('secondary_keywords'):
-                                st.markdown("**Secondary Keywords**")
-                                for keyword in seo['secondary_keywords']:
-                                    st.write(f"• {keyword}")
-                        
-                        # Content Clusters
-                        if seo.get('content_clusters'):
-                            st.markdown("**Content Clusters**")
-                            
-                            for cluster in seo['content_clusters']:
-                                with st.expander(f"Cluster: {cluster.get('topic', 'Topic')}"):
-                                    st.write(f"**Pillar Content:** {cluster.get('pillar_content', 'Not specified')}")
-                                    
-                                    if cluster.get('cluster_content'):
-                                        st.markdown("**Supporting Content:**")
-                                        for content in cluster['cluster_content']:
-                                            st.write(f"• {content}")
+                    with col1:
+                        if metrics.get('kpis'):
+                            st.markdown("**Key Performance Indicators**")
+                            for kpi in metrics['kpis']:
+                                st.write(f"• {kpi}")
                     
-                    # Content Templates
-                    if content_plan.get('content_templates'):
-                        st.subheader("📄 Content Templates")
-                        
-                        templates = content_plan['content_templates']
-                        
-                        for template in templates:
-                            with st.expander(f"{template.get('template_name', 'Template')} - {template.get('content_type', 'Unknown Type')}"):
-                                if template.get('structure'):
-                                    st.markdown("**Structure:**")
-                                    for section in template['structure']:
-                                        st.write(f"• {section}")
-                                
-                                if template.get('example'):
-                                    st.markdown("**Example:**")
-                                    st.text_area("", value=template['example'], height=100, key=f"template_{template.get('template_name', 'default')}")
+                    with col2:
+                        if metrics.get('tracking_methods'):
+                            st.markdown("**Tracking Methods**")
+                            for method in metrics['tracking_methods']:
+                                st.write(f"• {method}")
                     
-                    # Performance Metrics
-                    if content_plan.get('performance_metrics'):
-                        st.subheader("📊 Performance Metrics")
-                        
-                        metrics = content_plan['performance_metrics']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if metrics.get('kpis'):
-                                st.markdown("**Key Performance Indicators**")
-                                for kpi in metrics['kpis']:
-                                    st.write(f"• {kpi}")
-                        
-                        with col2:
-                            if metrics.get('tracking_methods'):
-                                st.markdown("**Tracking Methods**")
-                                for method in metrics['tracking_methods']:
-                                    st.write(f"• {method}")
-                        
-                        if metrics.get('success_benchmarks'):
-                            st.markdown("**Success Benchmarks**")
-                            for benchmark in metrics['success_benchmarks']:
-                                st.write(f"✅ {benchmark}")
+                    if metrics.get('success_benchmarks'):
+                        st.markdown("**Success Benchmarks**")
+                        for benchmark in metrics['success_benchmarks']:
+                            st.write(f"✅ {benchmark}")
+                
+                # Production Workflow
+                if content_plan.get('production_workflow'):
+                    st.subheader("🔄 Production Workflow")
                     
-                    # Production Workflow
-                    if content_plan.get('production_workflow'):
-                        st.subheader("🔄 Production Workflow")
-                        
-                        workflow = content_plan['production_workflow']
-                        
-                        if workflow.get('workflow_stages'):
-                            for stage in workflow['workflow_stages']:
-                                with st.expander(f"{stage.get('stage', 'Stage')} - {stage.get('duration', 'Duration')}"):
-                                    if stage.get('activities'):
-                                        st.markdown("**Activities:**")
-                                        for activity in stage['activities']:
-                                            st.write(f"• {activity}")
-                                    
-                                    if stage.get('stakeholders'):
-                                        st.write(f"**Stakeholders:** {', '.join(stage['stakeholders'])}")
-                        
-                        if workflow.get('quality_checkpoints'):
-                            st.markdown("**Quality Checkpoints**")
-                            for checkpoint in workflow['quality_checkpoints']:
-                                st.write(f"✅ {checkpoint}")
+                    workflow = content_plan['production_workflow']
                     
+                    if workflow.get('workflow_stages'):
+                        for stage in workflow['workflow_stages']:
+                            with st.expander(f"{stage.get('stage', 'Stage')} - {stage.get('duration', 'Duration')}"):
+                                if stage.get('activities'):
+                                    st.markdown("**Activities:**")
+                                    for activity in stage['activities']:
+                                        st.write(f"• {activity}")
+                                
+                                if stage.get('stakeholders'):
+                                    st.write(f"**Stakeholders:** {', '.join(stage['stakeholders'])}")
+                    
+                    if workflow.get('quality_checkpoints'):
+                        st.markdown("**Quality Checkpoints**")
+                        for checkpoint in workflow['quality_checkpoints']:
+                            st.write(f"✅ {checkpoint}")
+                
+                if is_new:
                     # Save to database
                     try:
                         # Log the processing
@@ -597,47 +601,47 @@ def generate_content_plan_tab():
                     except Exception as e:
                         st.warning(f"Could not save to database: {str(e)}")
                     
-                    # Export Options
-                    st.subheader("📤 Export Content Plan")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        # Download complete plan
+                # Export Options
+                st.subheader("📤 Export Content Plan")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    # Download complete plan
+                    st.download_button(
+                        label="📄 Download Complete Plan",
+                        data=json.dumps(content_plan, indent=2),
+                        file_name=f"content_plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        mime="application/json"
+                    )
+                
+                with col2:
+                    # Download content calendar
+                    if content_plan.get('detailed_calendar'):
+                        calendar_data = content_plan['detailed_calendar']
                         st.download_button(
-                            label="📄 Download Complete Plan",
-                            data=json.dumps(content_plan, indent=2),
-                            file_name=f"content_plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                            label="📅 Download Calendar",
+                            data=json.dumps(calendar_data, indent=2),
+                            file_name=f"content_calendar_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                             mime="application/json"
                         )
-                    
-                    with col2:
-                        # Download content calendar
-                        if content_plan.get('detailed_calendar'):
-                            calendar_data = content_plan['detailed_calendar']
-                            st.download_button(
-                                label="📅 Download Calendar",
-                                data=json.dumps(calendar_data, indent=2),
-                                file_name=f"content_calendar_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                                mime="application/json"
-                            )
-                    
-                    with col3:
-                        # Download SEO strategy
-                        if content_plan.get('seo_strategy'):
-                            seo_data = content_plan['seo_strategy']
-                            st.download_button(
-                                label="🔍 Download SEO Strategy",
-                                data=json.dumps(seo_data, indent=2),
-                                file_name=f"seo_strategy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                                mime="application/json"
-                            )
                 
-                else:
-                    st.error(f"❌ Content plan generation failed: {result.get('error', 'Unknown error')}")
+                with col3:
+                    # Download SEO strategy
+                    if content_plan.get('seo_strategy'):
+                        seo_data = content_plan['seo_strategy']
+                        st.download_button(
+                            label="🔍 Download SEO Strategy",
+                            data=json.dumps(seo_data, indent=2),
+                            file_name=f"seo_strategy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                            mime="application/json"
+                        )
             
-            except Exception as e:
-                st.error(f"❌ Error generating content plan: {str(e)}")
+            else:
+                st.error(f"❌ Content plan generation failed: {result.get('error', 'Unknown error')}")
+        
+        except Exception as e:
+            st.error(f"❌ Error generating content plan: {str(e)}")
 
 
 def content_calendar_tab():
@@ -0,0 +1,92 @@
+import json
+import logging
+
+import pytest
+
+from core.base_agent import BaseAgent
+from utils.ai_client import AIClient
+from utils.json_extract import extract_json
+
+def test_plain_json_needs_no_repairs():
+    result = extract_json('{"a": 1}')
+    assert result['success']
+    assert result['data'] == {'a': 1}
+    assert result['repairs'] == []
+
+def test_strips_code_fence():
+    result = extract_json('```json\n{"title": "Launch", "tags": ["a", "b"]}\n```')
+    assert result['success']
+    assert result['data'] == {'title': 'Launch', 'tags': ['a', 'b']}
+    assert 'stripped_code_fence' in result['repairs']
+
+def test_strips_surrounding_prose():
+    result = extract_json('Sure! Here is the brief:\n{"client": "Acme"}\nLet me know if you need more.')
+    assert result['success']
+    assert result['data'] == {'client': 'Acme'}
+    assert 'stripped_surrounding_text' in result['repairs']
+
+def test_removes_trailing_commas():
+    result = extract_json('{"a": [1, 2,], "b": {"c": 3,},}')
+    assert result['success']
+    assert result['data'] == {'a': [1, 2], 'b': {'c': 3}}
+    assert 'removed_trailing_commas' in result['repairs']
+
+def test_trailing_comma_inside_string_is_kept():
+    result = extract_json('{"note": "a,]", "n": 1,}')
+    assert result['success']
+    assert result['data'] == {'note': 'a,]', 'n': 1}
+
+def test_braces_inside_strings_do_not_end_the_object():
+    result = extract_json('{"template": "Hello {name}}", "n": 1} trailing')
+    assert result['success']
+    assert result['data'] == {'template': 'Hello {name}}', 'n': 1}
+
+def test_closes_truncated_output_at_the_last_complete_item():
+    result = extract_json('{"items": [{"a": 1}, {"a": 2}, {"a"')
+    assert result['success']
+    assert result['data'] == {'items': [{'a': 1}, {'a': 2}]}
+    assert 'closed_truncated_json' in result['repairs']
+
+def test_truncated_output_inside_an_unclosed_fence():
+    result = extract_json('```json\n{"tasks": [{"id": 1}, {"id": 2')
+    assert result['success']
+    assert result['data']['tasks'][0] == {'id': 1}
+    assert 'stripped_code_fence' in result['repairs']
+    assert 'closed_truncated_json' in result['repairs']
+
+def test_multiple_objects_returns_the_first():
+    result = extract_json('{"a": 1}\n{"b": 2}')
+    assert result['success']
+    assert result['data'] == {'a': 1}
+    assert 'stripped_surrounding_text' in result['repairs']
+
+def test_prefer_picks_the_requested_container():
+    text = 'Results: [{"a": 1}] and summary {"count": 1}'
+    assert extract_json(text, prefer='[')['data'] == [{'a': 1}]
+    assert extract_json(text, prefer='{')['data'] == {'a': 1}
+
+def test_reports_failure_without_json():
+    for text in ('', '   ', 'no json here'):
+        result = extract_json(text)
+        assert not result['success']
+        assert result['data'] is None
+        assert result['error']
+
+def test_mismatched_brackets_fail():
+    result = extract_json('{"a": [1, 2}')
+    assert not result['success']
+
+class _Agent:
+    logger = logging.getLogger(__name__)
+
+def test_agent_parse_rejects_a_bare_array_or_scalar():
+    for response in ('[{"a": 1}]', '42', '"done"'):
+        with pytest.raises(json.JSONDecodeError):
+            BaseAgent._parse_json_response(_Agent(), response)
+
+def test_agent_parse_prefers_the_object():
+    assert BaseAgent._parse_json_response(_Agent(), 'Tags [1, 2] then {"a": 1}') == {'a': 1}
+
+def test_structured_response_falls_back_to_the_error_dict_for_non_objects():
+    result = AIClient._extract_json_from_text(_Agent(), '["a", "b"]')
+    assert result == {"error": "Could not parse JSON", "raw_response": '["a", "b"]'}
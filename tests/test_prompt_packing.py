@@ -0,0 +1,43 @@
+import json
+import asyncio
+
+from utils.prompt_packing import PromptPacker, split_packed_response
+
+SCHEMA = {'label': 'positive'}
+
+def test_split_matches_entries_by_index():
+    text = json.dumps({'results': [{'index': 1, 'label': 'b'}, {'index': 0, 'label': 'a'}]})
+    assert split_packed_response(text, 2, SCHEMA) == {0: {'label': 'a'}, 1: {'label': 'b'}}
+
+def test_split_drops_unindexed_entries_when_others_are_indexed():
+    text = json.dumps([{'index': 1, 'label': 'b'}, {'label': 'guess'}])
+    assert split_packed_response(text, 3, SCHEMA) == {1: {'label': 'b'}}
+
+def test_items_lost_by_an_answered_pack_are_retried_alone():
+    prompts = []
+
+    async def generate(prompt, **kwargs):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return json.dumps({'results': [{'index': 0, 'label': 'a'}]})  # item 1 is missing
+        return json.dumps({'label': 'b'})
+
+    outcomes = asyncio.run(PromptPacker(generate, len).run(['one', 'two'], 'Classify', SCHEMA))
+    assert outcomes == [
+        {'success': True, 'data': {'label': 'a'}, 'packed': True},
+        {'success': True, 'data': {'label': 'b'}, 'packed': False}
+    ]
+    assert len(prompts) == 2
+
+def test_failed_pack_call_fails_its_items_without_single_retries():
+    calls = []
+
+    async def generate(prompt, **kwargs):
+        calls.append(prompt)
+        raise Exception('429 quota exceeded')
+
+    packer = PromptPacker(generate, len, max_items=5)
+    outcomes = asyncio.run(packer.run([f"item {i}" for i in range(10)], 'Classify', SCHEMA))
+    assert len(calls) == 2
+    assert outcomes == [{'success': False, 'error': '429 quota exceeded'}] * 10
+    assert packer.get_stats()['single_calls'] == 0
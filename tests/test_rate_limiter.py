@@ -0,0 +1,112 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from utils.rate_limiter import RateLimiter, RateLimitExceeded
+
+WINDOW = 0.2
+
+def make_limiter(rpm: int = 1) -> RateLimiter:
+    """Limiter with one model whose minute window is shortened to WINDOW seconds"""
+    limiter = RateLimiter()
+    limiter.register_model('model', {'rate_limit_rpm': rpm})
+    limiter._budgets['model'].MINUTE = WINDOW
+    return limiter
+
+def queued(limiter: RateLimiter) -> int:
+    return limiter.get_usage()['model']['queued']
+
+def wait_for_queue(limiter: RateLimiter, depth: int, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while queued(limiter) < depth:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.005)
+
+def test_unregistered_model_is_not_limited():
+    limiter = RateLimiter()
+    assert limiter.acquire('other', timeout=0)
+    assert asyncio.run(limiter.aacquire('other', timeout=0))
+
+def test_blocking_callers_are_served_in_arrival_order():
+    limiter = make_limiter(rpm=1)
+    limiter.acquire('model')  # use up the window so everyone after queues
+
+    granted = []
+    threads = []
+    for name in ('first', 'second', 'third'):
+        thread = threading.Thread(target=lambda name=name: (limiter.acquire('model', timeout=5), granted.append(name)))
+        thread.start()
+        threads.append(thread)
+        wait_for_queue(limiter, len(threads))
+    for thread in threads:
+        thread.join(5)
+
+    assert granted == ['first', 'second', 'third']
+    assert queued(limiter) == 0
+
+def test_async_callers_are_served_in_arrival_order():
+    limiter = make_limiter(rpm=1)
+    limiter.acquire('model')
+
+    async def main():
+        granted = []
+
+        async def caller(name):
+            await limiter.aacquire('model', timeout=5)
+            granted.append(name)
+
+        tasks = []
+        for name in ('first', 'second', 'third'):
+            tasks.append(asyncio.create_task(caller(name)))
+            await asyncio.sleep(0)  # let it take its ticket
+        await asyncio.gather(*tasks)
+        return granted
+
+    assert asyncio.run(main()) == ['first', 'second', 'third']
+
+def test_timeout_abandons_the_ticket():
+    limiter = make_limiter(rpm=1)
+    limiter._budgets['model'].MINUTE = 60.0
+    limiter.acquire('model')
+
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire('model', timeout=0.05)
+    assert queued(limiter) == 0
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(limiter.aacquire('model', timeout=0.05))
+    assert queued(limiter) == 0
+
+def test_interrupted_blocking_acquire_abandons_the_ticket():
+    limiter = make_limiter(rpm=1)
+    limiter.acquire('model')
+
+    def interrupted_wait(timeout=None):
+        raise KeyboardInterrupt
+
+    limiter._condition.wait = interrupted_wait
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire('model')
+    assert queued(limiter) == 0
+
+def test_cancelled_async_acquire_abandons_the_ticket_and_unblocks_the_next_caller():
+    limiter = make_limiter(rpm=1)
+    limiter.acquire('model')
+
+    async def main():
+        first = asyncio.create_task(limiter.aacquire('model'))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(limiter.aacquire('model', timeout=5))
+        await asyncio.sleep(0)
+        assert queued(limiter) == 2
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert queued(limiter) == 1
+        return await second
+
+    assert asyncio.run(main())
+    assert queued(limiter) == 0
@@ -0,0 +1,145 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+def test_concurrent_async_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def main():
+        return await asyncio.gather(*(flight.ado('key', work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ['result'] * 5
+    assert len(calls) == 1
+    assert flight.get_stats() == {'executions': 1, 'coalesced': 4, 'in_flight': 0}
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    async def main():
+        return await asyncio.gather(flight.ado('key', fail), flight.ado('key', fail), return_exceptions=True)
+
+    leader, follower = asyncio.run(main())
+    assert isinstance(leader, ValueError) and isinstance(follower, ValueError)
+    assert flight.get_stats()['executions'] == 1
+
+def test_cancelled_leader_hands_over_to_a_follower():
+    flight = SingleFlight()
+    runs = []
+
+    async def leader_work():
+        runs.append('leader')
+        await asyncio.sleep(10)
+
+    async def follower_work():
+        runs.append('follower')
+        return 'follower result'
+
+    async def main():
+        leader = asyncio.create_task(flight.ado('key', leader_work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.ado('key', follower_work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == 'follower result'
+    assert runs == ['leader', 'follower']
+    assert flight.get_stats() == {'executions': 2, 'coalesced': 1, 'in_flight': 0}
+
+def test_cancelled_follower_leaves_the_leader_running():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def main():
+        leader = asyncio.create_task(flight.ado('key', work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.ado('key', work))
+        await asyncio.sleep(0)
+
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == 'result'
+
+def test_only_one_follower_is_elected_after_the_leader_is_cancelled():
+    flight = SingleFlight()
+    runs = []
+
+    async def leader_work():
+        await asyncio.sleep(10)
+
+    async def follower_work():
+        runs.append('follower')
+        await asyncio.sleep(0.01)
+        return 'shared'
+
+    async def main():
+        leader = asyncio.create_task(flight.ado('key', leader_work))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.ado('key', follower_work)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.gather(leader, return_exceptions=True)
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == ['shared'] * 3
+    assert runs == ['follower']
+
+class Interrupted(BaseException):
+    """Stands in for KeyboardInterrupt/SystemExit in the leader thread"""
+
+def test_abandoned_blocking_leader_hands_over_to_a_follower():
+    flight = SingleFlight()
+    follower_joined = threading.Event()
+    outcome = {}
+
+    def leader_work():
+        follower_joined.wait(5)
+        raise Interrupted
+
+    def run_leader():
+        try:
+            flight.do('key', leader_work)
+        except Interrupted:
+            outcome['leader'] = 'interrupted'
+
+    def run_follower():
+        outcome['follower'] = flight.do('key', lambda: 'follower result')
+
+    leader = threading.Thread(target=run_leader)
+    leader.start()
+    while flight.get_stats()['in_flight'] == 0:
+        time.sleep(0.001)
+    follower = threading.Thread(target=run_follower)
+    follower.start()
+    while flight.get_stats()['coalesced'] == 0:
+        time.sleep(0.001)
+    follower_joined.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert outcome == {'leader': 'interrupted', 'follower': 'follower result'}
+    assert flight.get_stats()['executions'] == 2
@@ -0,0 +1,224 @@
+import asyncio
+
+import pytest
+
+from core.workflow_engine import WorkflowEngine, parse_workflow
+
+def graph(*steps):
+    return {'steps': list(steps)}
+
+def make_executor(fail=(), raise_on=()):
+    """Step executor shaped like AgentOrchestrator.execute_agent_task, recording every call"""
+    calls = []
+
+    async def execute(agent_name, task_data):
+        calls.append((agent_name, task_data))
+        await asyncio.sleep(0.002)  # keep finish times of consecutive steps apart for the critical path
+        if agent_name in raise_on:
+            raise RuntimeError(f"{agent_name} crashed")
+        if agent_name in fail:
+            return {'success': True, 'result': {'success': False, 'error': f"{agent_name} failed"}}
+        return {'success': True, 'result': {'success': True, 'result': {'agent': agent_name, 'input': task_data}}}
+
+    execute.calls = calls
+    return execute
+
+def test_legacy_steps_run_in_sequence():
+    steps = parse_workflow({'steps': [{'agent': 'a'}, {'agent': 'b'}, {'agent': 'a'}]})
+    assert [step.id for step in steps] == ['a', 'b', 'a_2']
+    assert [step.after for step in steps] == [[], ['a'], ['b']]
+    assert [step.depends_on for step in steps] == [[], [], []]
+
+def test_inputs_imply_dependencies():
+    steps = parse_workflow(graph(
+        {'id': 'brief', 'agent': 'parser'},
+        {'id': 'plan', 'agent': 'planner', 'inputs': {'brief': 'brief.summary'}}
+    ))
+    assert steps[1].depends_on == ['brief']
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match='cycle'):
+        parse_workflow(graph(
+            {'id': 'a', 'agent': 'x', 'depends_on': ['c']},
+            {'id': 'b', 'agent': 'x', 'depends_on': ['a']},
+            {'id': 'c', 'agent': 'x', 'inputs': {'data': 'b'}},
+            {'id': 'd', 'agent': 'x'}
+        ))
+
+def test_self_dependency_is_a_cycle():
+    with pytest.raises(ValueError, match='cycle'):
+        parse_workflow(graph({'id': 'a', 'agent': 'x', 'depends_on': ['a']}))
+
+def test_unknown_dependency_and_duplicate_ids_are_rejected():
+    with pytest.raises(ValueError, match='unknown'):
+        parse_workflow(graph({'id': 'a', 'agent': 'x', 'depends_on': ['missing']}))
+    with pytest.raises(ValueError, match='Duplicate'):
+        parse_workflow(graph({'id': 'a', 'agent': 'x'}, {'id': 'a', 'agent': 'y'}))
+
+def test_cycle_is_rejected_before_any_step_runs():
+    execute = make_executor()
+    with pytest.raises(ValueError):
+        asyncio.run(WorkflowEngine(execute).run(graph(
+            {'id': 'a', 'agent': 'x', 'depends_on': ['b']},
+            {'id': 'b', 'agent': 'x', 'depends_on': ['a']}
+        )))
+    assert execute.calls == []
+
+def test_outputs_flow_into_declared_inputs():
+    execute = make_executor()
+    result = asyncio.run(WorkflowEngine(execute).run(graph(
+        {'id': 'brief', 'agent': 'parser', 'data': {'text': 'hi'}},
+        {'id': 'plan', 'agent': 'planner', 'inputs': {'brief_text': 'brief.input.text'}}
+    )))
+    assert result['success']
+    assert execute.calls[1] == ('planner', {'brief_text': 'hi'})
+    assert result['critical_path'] == ['brief', 'plan']
+
+def test_failed_step_skips_only_its_dependents():
+    execute = make_executor(fail={'planner'})
+    result = asyncio.run(WorkflowEngine(execute).run({
+        'stop_on_error': False,
+        'steps': [
+            {'id': 'brief', 'agent': 'parser'},
+            {'id': 'plan', 'agent': 'planner', 'inputs': {'brief': 'brief'}},
+            {'id': 'budget', 'agent': 'estimator', 'inputs': {'plan': 'plan'}},
+            {'id': 'branding', 'agent': 'designer', 'inputs': {'brief': 'brief'}}
+        ]
+    }))
+    assert not result['success']
+    assert result['failed_steps'] == ['plan']
+    assert result['skipped'] == {'budget': 'dependency failed: plan'}
+    assert result['timings']['branding']['status'] == 'succeeded'
+    assert result['timings']['plan']['status'] == 'failed'
+    assert [agent for agent, _ in execute.calls].count('estimator') == 0
+
+def test_exception_in_a_step_is_reported_as_that_step_failing():
+    execute = make_executor(raise_on={'planner'})
+    result = asyncio.run(WorkflowEngine(execute).run({
+        'stop_on_error': False,
+        'steps': [{'id': 'plan', 'agent': 'planner'}, {'id': 'branding', 'agent': 'designer'}]
+    }))
+    assert result['failed_steps'] == ['plan']
+    assert result['results']['plan'] == {'success': False, 'agent': 'planner', 'error': 'planner crashed'}
+    assert result['timings']['branding']['status'] == 'succeeded'
+
+def test_legacy_workflow_keeps_going_after_a_failed_step_without_stop_on_error():
+    calls = []
+
+    async def execute(agent_name, task_data):
+        calls.append(agent_name)
+        await asyncio.sleep(0.002)
+        if agent_name == 'b':
+            return {'success': False, 'error': 'b failed'}
+        return {'success': True, 'result': {'success': True, 'result': {}}}
+
+    result = asyncio.run(WorkflowEngine(execute).run({
+        'stop_on_error': False,
+        'steps': [{'agent': 'a'}, {'agent': 'b'}, {'agent': 'c'}]
+    }))
+    assert calls == ['a', 'b', 'c']
+    assert result['failed_steps'] == ['b']
+    assert result['skipped'] == {}
+    assert result['timings']['c']['status'] == 'succeeded'
+    assert result['critical_path'] == ['a', 'b', 'c']
+
+def test_legacy_workflow_stops_after_a_failed_step_by_default():
+    calls = []
+
+    async def execute(agent_name, task_data):
+        calls.append(agent_name)
+        return {'success': agent_name != 'b', 'error': None}
+
+    result = asyncio.run(WorkflowEngine(execute).run({'steps': [{'agent': 'a'}, {'agent': 'b'}, {'agent': 'c'}]}))
+    assert calls == ['a', 'b']
+    assert result['skipped'] == {'c': 'workflow stopped after a failed step'}
+
+def test_legacy_workflow_counts_only_failed_orchestrator_calls_unless_asked():
+    definition = {'steps': [{'agent': 'parser'}, {'agent': 'planner'}]}
+
+    execute = make_executor(fail={'parser'})
+    result = asyncio.run(WorkflowEngine(execute).run(definition))
+    assert result['failed_steps'] == []
+    assert len(execute.calls) == 2
+
+    execute = make_executor(fail={'parser'})
+    result = asyncio.run(WorkflowEngine(execute).run({**definition, 'fail_on_agent_error': True}))
+    assert result['failed_steps'] == ['parser']
+    assert len(execute.calls) == 1
+
+def test_stop_on_error_starts_no_new_steps():
+    calls = []
+
+    async def execute(agent_name, task_data):
+        calls.append(agent_name)
+        if agent_name == 'parser':
+            return {'success': False, 'error': 'parser failed'}
+        await asyncio.sleep(0.02)
+        return {'success': True, 'result': {'success': True, 'result': {}}}
+
+    result = asyncio.run(WorkflowEngine(execute).run(graph(
+        {'id': 'brief', 'agent': 'parser'},
+        {'id': 'research', 'agent': 'researcher'},
+        {'id': 'plan', 'agent': 'planner', 'depends_on': ['research']}
+    )))
+    assert result['failed_steps'] == ['brief']
+    assert result['timings']['research']['status'] == 'succeeded'  # already running
+    assert result['skipped'] == {'plan': 'workflow stopped after a failed step'}
+    assert calls == ['parser', 'researcher']
+
+class MemoryCheckpointStore:
+    """In-memory stand-in for DatabaseManager's workflow step checkpoints"""
+
+    def __init__(self):
+        self.steps = {}
+
+    def save_workflow_step(self, workflow_id, step_id, checkpoint):
+        self.steps.setdefault(workflow_id, {})[step_id] = dict(checkpoint)
+        return True
+
+    def get_workflow_steps(self, workflow_id):
+        return {step_id: dict(checkpoint) for step_id, checkpoint in self.steps.get(workflow_id, {}).items()}
+
+RESUMABLE = {
+    'stop_on_error': False,
+    'steps': [
+        {'id': 'brief', 'agent': 'parser', 'data': {'text': 'hi'}},
+        {'id': 'plan', 'agent': 'planner', 'inputs': {'brief': 'brief'}},
+        {'id': 'branding', 'agent': 'designer', 'inputs': {'brief': 'brief'}}
+    ]
+}
+
+def test_resume_reruns_only_the_steps_that_did_not_succeed():
+    store = MemoryCheckpointStore()
+    first = make_executor(fail={'planner'})
+    result = asyncio.run(WorkflowEngine(first, checkpoint_store=store).run(RESUMABLE, workflow_id='run-1'))
+    assert result['failed_steps'] == ['plan']
+    assert store.steps['run-1']['plan']['status'] == 'failed'
+
+    second = make_executor()
+    resumed = asyncio.run(WorkflowEngine(second, checkpoint_store=store).run(RESUMABLE, workflow_id='run-1', resume=True))
+    assert resumed['success']
+    assert sorted(resumed['reused_steps']) == ['branding', 'brief']
+    assert [agent for agent, _ in second.calls] == ['planner']
+    assert resumed['results']['brief'] == result['results']['brief']
+    assert resumed['timings']['brief']['status'] == 'reused'
+    assert store.steps['run-1']['plan']['status'] == 'succeeded'
+
+def test_resume_reruns_a_step_whose_input_changed():
+    store = MemoryCheckpointStore()
+    asyncio.run(WorkflowEngine(make_executor(), checkpoint_store=store).run(RESUMABLE, workflow_id='run-1'))
+
+    changed = {**RESUMABLE, 'steps': [{**RESUMABLE['steps'][0], 'data': {'text': 'changed'}}] + RESUMABLE['steps'][1:]}
+    execute = make_executor()
+    resumed = asyncio.run(WorkflowEngine(execute, checkpoint_store=store).run(changed, workflow_id='run-1', resume=True))
+    assert resumed['reused_steps'] == []
+    assert sorted(agent for agent, _ in execute.calls) == ['designer', 'parser', 'planner']
+
+def test_without_resume_checkpoints_are_not_reused():
+    store = MemoryCheckpointStore()
+    asyncio.run(WorkflowEngine(make_executor(), checkpoint_store=store).run(RESUMABLE, workflow_id='run-1'))
+
+    execute = make_executor()
+    result = asyncio.run(WorkflowEngine(execute, checkpoint_store=store).run(RESUMABLE, workflow_id='run-1'))
+    assert result['reused_steps'] == []
+    assert len(execute.calls) == 3
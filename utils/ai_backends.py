@@ -0,0 +1,401 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from types import SimpleNamespace
+from datetime import timedelta
+from typing import Dict, Any, Optional
+
+from utils.json_extract import extract_json
+
+class AIBackend:
+    """
+    Interface between AIClient and whatever produces model output
+
+    create_model returns an object with the google.generativeai
+    GenerativeModel call surface: generate_content(contents, stream=False,
+    request_options=None) returning a response with .text (and optionally
+    .usage_metadata), or an iterable of such chunks when streaming.
+    """
+
+    name = "base"
+
+    def create_model(self, model_name: str, generation_params: Dict[str, Any]):
+        raise NotImplementedError
+
+    def get_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Cheap metadata lookup used by health probes"""
+        raise NotImplementedError
+
+    def create_cached_model(self, model_name: str, prefix: str, generation_params: Dict[str, Any], ttl: int):
+        """
+        Model handle whose prompts implicitly start with prefix, served from
+        the provider's context cache; None where context caching is unsupported
+        """
+        return None
+
+    @property
+    def genai_module(self):
+        """The configured google.generativeai module, if this backend uses one"""
+        return None
+
+class GeminiBackend(AIBackend):
+    """Live Gemini API through google.generativeai"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+
+    @property
+    def genai_module(self):
+        return self._genai
+
+    def create_model(self, model_name: str, generation_params: Dict[str, Any]):
+        generation_config = self._genai.types.GenerationConfig(**generation_params) if generation_params else None
+        return self._genai.GenerativeModel(model_name, generation_config=generation_config)
+
+    def get_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
+        model = self._genai.get_model(f"models/{model_name}")
+        return {'name': getattr(model, 'name', model_name)} if model is not None else None
+
+    def create_cached_model(self, model_name: str, prefix: str, generation_params: Dict[str, Any], ttl: int):
+        from google.generativeai import caching
+        cached_content = caching.CachedContent.create(
+            model=f"models/{model_name}",
+            contents=[prefix],
+            ttl=timedelta(seconds=ttl)
+        )
+        generation_config = self._genai.types.GenerationConfig(**generation_params) if generation_params else None
+        return self._genai.GenerativeModel.from_cached_content(
+            cached_content=cached_content,
+            generation_config=generation_config
+        )
+
+class _OfflineResponse:
+    """Minimal stand-in for a Gemini response or stream chunk"""
+
+    def __init__(self, text: str, prompt_tokens: int = None, completion_tokens: int = None):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=completion_tokens
+        ) if prompt_tokens or completion_tokens else None
+
+def _contents_text(contents) -> str:
+    """Stable text identity for prompt contents (images are hashed)"""
+    if isinstance(contents, str):
+        return contents
+    parts = []
+    for part in contents if isinstance(contents, (list, tuple)) else [contents]:
+        if isinstance(part, str):
+            parts.append(part)
+        elif hasattr(part, 'tobytes'):
+            parts.append(f"<image sha256={hashlib.sha256(part.tobytes()).hexdigest()}>")
+        elif isinstance(part, dict) and isinstance(part.get('data'), bytes):
+            parts.append(f"<{part.get('mime_type', 'blob')} sha256={hashlib.sha256(part['data']).hexdigest()}>")
+        else:
+            parts.append(repr(part))
+    return "\n".join(parts)
+
+def recording_key(model_name: str, contents, generation_params: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        [model_name, _contents_text(contents), sorted(generation_params.items())],
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class RecordingStore:
+    """
+    Append-only JSONL file of prompt/response pairs
+
+    Each line holds the request key, model, prompt, response text, latency
+    and token usage; later lines for the same key win on load.
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    self._records[record['key']] = record
+                except (json.JSONDecodeError, KeyError):
+                    self.logger.warning(f"Skipping malformed recording at {self.path}:{line_number}")
+        self.logger.info(f"Loaded {len(self._records)} AI recordings from {self.path}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records.get(key)
+
+    def add(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._records[record['key']] = record
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+class _SimulatedModel:
+    """Serves canned text with simulated latency, streamed in a few chunks"""
+
+    STREAM_CHUNKS = 8
+    # Share of the latency spent before the first chunk when streaming
+    FIRST_CHUNK_SHARE = 0.3
+
+    def __init__(self, backend, model_name: str, generation_params: Dict[str, Any]):
+        self.backend = backend
+        self.model_name = model_name
+        self.generation_params = generation_params
+
+    def generate_content(self, contents, stream: bool = False, request_options: Dict[str, Any] = None, **kwargs):
+        text, latency, prompt_tokens, completion_tokens = self.backend.respond(
+            self.model_name, contents, self.generation_params
+        )
+        if not stream:
+            time.sleep(latency)
+            return _OfflineResponse(text, prompt_tokens, completion_tokens)
+        return self._stream(text, latency)
+
+    def _stream(self, text: str, latency: float):
+        time.sleep(latency * self.FIRST_CHUNK_SHARE)
+        size = max(1, -(-len(text) // self.STREAM_CHUNKS))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        pause = latency * (1 - self.FIRST_CHUNK_SHARE) / max(len(pieces) - 1, 1)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(pause)
+            yield _OfflineResponse(piece)
+
+class SyntheticBackend(AIBackend):
+    """
+    Offline backend that answers every prompt with JSON shaped like the
+    template the prompt asks for
+
+    Agent prompts end with an example JSON structure; its keys and nesting
+    are echoed back with placeholder strings, and fields whose names look
+    numeric (scores, costs, hours, ...) get deterministic numbers. Output is
+    a pure function of the prompt, so runs are reproducible.
+    """
+
+    name = "synthetic"
+
+    # snake_case key words that mark a numeric field
+    _NUMERIC_WORDS = {
+        'score', 'count', 'number', 'hours', 'days', 'weeks', 'cost', 'budget', 'rate',
+        'percent', 'percentage', 'total', 'amount', 'probability', 'confidence', 'price', 'roi'
+    }
+    _TEMPLATE_MARKER = re.compile(r"json", re.IGNORECASE)
+
+    def __init__(self, latency_ms: float = 500, jitter: float = 0.2):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+
+    def create_model(self, model_name: str, generation_params: Dict[str, Any]):
+        return _SimulatedModel(self, model_name, generation_params)
+
+    def get_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
+        return {'name': model_name, 'backend': self.name}
+
+    def _latency(self, seed: int, base_ms: float) -> float:
+        spread = 1 + random.Random(seed).uniform(-self.jitter, self.jitter)
+        return max(base_ms * spread, 0) / 1000
+
+    def respond(self, model_name: str, contents, generation_params: Dict[str, Any]):
+        prompt = _contents_text(contents)
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12], 16)
+        text = json.dumps(self.synthesize(prompt, seed), ensure_ascii=False, indent=2)
+        return text, self._latency(seed, self.latency_ms), None, None
+
+    def _find_template(self, prompt: str) -> Any:
+        """The last parseable JSON structure following a mention of JSON"""
+        markers = [match.end() for match in self._TEMPLATE_MARKER.finditer(prompt)]
+        for position in reversed(markers or [0]):
+            extraction = extract_json(prompt[position:])
+            if extraction['success'] and isinstance(extraction['data'], (dict, list)):
+                return extraction['data']
+        return None
+
+    def synthesize(self, prompt: str, seed: int = 0) -> Any:
+        template = self._find_template(prompt)
+        if template is None:
+            return {'response': f"Synthetic response ({len(prompt)} prompt characters)"}
+        return self._fill(template, random.Random(seed), key="")
+
+    def _fill(self, template: Any, rng: random.Random, key: str) -> Any:
+        if isinstance(template, dict):
+            return {name: self._fill(value, rng, name) for name, value in template.items()}
+        if isinstance(template, list):
+            if not template:
+                return []
+            return [self._fill(template[0], rng, key) for _ in range(min(len(template) + 1, 3))]
+        if isinstance(template, bool):
+            return rng.random() < 0.5
+        if isinstance(template, (int, float)):
+            return template
+        if isinstance(template, str) and self._NUMERIC_WORDS.intersection(key.lower().split('_')):
+            return round(rng.uniform(0, 100), 1)
+        return template
+
+class ReplayBackend(SyntheticBackend):
+    """
+    Serves recorded responses offline, with the recorded latency scaled by
+    latency_scale; prompts missing from the recording are answered
+    synthetically or rejected, depending on on_miss
+    """
+
+    name = "replay"
+
+    def __init__(self, store: RecordingStore, latency_scale: float = 1.0, on_miss: str = "synthetic",
+                 latency_ms: float = 500, jitter: float = 0.2):
+        super().__init__(latency_ms, jitter)
+        self.logger = logging.getLogger(__name__)
+        self.store = store
+        self.latency_scale = latency_scale
+        self.on_miss = on_miss
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def respond(self, model_name: str, contents, generation_params: Dict[str, Any]):
+        record = self.store.get(recording_key(model_name, contents, generation_params))
+
+        with self._lock:
+            self._stats['hits' if record else 'misses'] += 1
+
+        if record is None:
+            if self.on_miss == "error":
+                raise Exception(f"No recorded response for this {model_name} prompt")
+            self.logger.warning(f"No recorded response for {model_name} prompt, answering synthetically")
+            return super().respond(model_name, contents, generation_params)
+
+        seed = int(record['key'][:12], 16)
+        latency = self._latency(seed, record.get('latency_ms', self.latency_ms) * self.latency_scale)
+        return record['response'], latency, record.get('prompt_tokens'), record.get('completion_tokens')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'recordings': len(self.store), **self._stats}
+
+class _RecordingModel:
+    """Wraps a live model and stores every completed response"""
+
+    def __init__(self, backend, inner, model_name: str, generation_params: Dict[str, Any]):
+        self.backend = backend
+        self.inner = inner
+        self.model_name = model_name
+        self.generation_params = generation_params
+
+    def generate_content(self, contents, stream: bool = False, **kwargs):
+        started = time.monotonic()
+        response = self.inner.generate_content(contents, stream=stream, **kwargs)
+        if not stream:
+            self._record(contents, response.text, response, started)
+            return response
+        return self._stream(contents, response, started)
+
+    def _stream(self, contents, response, started: float):
+        chunks = []
+        for chunk in response:
+            chunks.append(chunk.text or "")
+            yield chunk
+        self._record(contents, "".join(chunks), response, started)
+
+    def _record(self, contents, text: str, response, started: float):
+        if not text:
+            return
+        usage = getattr(response, 'usage_metadata', None)
+        self.backend.store.add({
+            'key': recording_key(self.model_name, contents, self.generation_params),
+            'model': self.model_name,
+            'prompt': _contents_text(contents),
+            'generation_params': self.generation_params,
+            'response': text,
+            'latency_ms': round((time.monotonic() - started) * 1000, 1),
+            'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+            'completion_tokens': getattr(usage, 'candidates_token_count', None),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        })
+
+class RecordingBackend(AIBackend):
+    """Live backend that also writes every prompt/response pair to a RecordingStore"""
+
+    name = "record"
+
+    def __init__(self, inner: AIBackend, store: RecordingStore):
+        self.inner = inner
+        self.store = store
+
+    @property
+    def genai_module(self):
+        return self.inner.genai_module
+
+    def create_model(self, model_name: str, generation_params: Dict[str, Any]):
+        return _RecordingModel(self, self.inner.create_model(model_name, generation_params), model_name, generation_params)
+
+    def get_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
+        return self.inner.get_model_info(model_name)
+
+BACKENDS = ("gemini", "record", "replay", "synthetic")
+
+def create_backend(ai_config, api_key: Optional[str]) -> Optional[AIBackend]:
+    """
+    Build the AI backend selected by ai_config.backend
+
+    Args:
+        ai_config: AIConfig
+        api_key: Gemini API key (required for 'gemini' and 'record')
+
+    Returns:
+        AIBackend, or None if a live backend was requested without an API key
+    """
+    logger = logging.getLogger(__name__)
+    kind = (ai_config.backend or "gemini").lower()
+
+    if kind not in BACKENDS:
+        raise Exception(f"Unknown AI backend '{kind}', expected one of {', '.join(BACKENDS)}")
+
+    if kind == "synthetic":
+        return SyntheticBackend(ai_config.synthetic_latency_ms, ai_config.simulated_latency_jitter)
+
+    if kind == "replay":
+        return ReplayBackend(
+            RecordingStore(ai_config.recordings_path),
+            latency_scale=ai_config.replay_latency_scale,
+            on_miss=ai_config.replay_on_miss,
+            latency_ms=ai_config.synthetic_latency_ms,
+            jitter=ai_config.simulated_latency_jitter
+        )
+
+    if not api_key:
+        logger.warning("GEMINI_API_KEY not found in environment variables")
+        return None
+
+    backend = GeminiBackend(api_key)
+    if kind == "record":
+        logger.info(f"Recording AI responses to {ai_config.recordings_path}")
+        backend = RecordingBackend(backend, RecordingStore(ai_config.recordings_path))
+    return backend
@@ -1,150 +1,934 @@
 import os
+import time
+import random
 import logging
-from typing import Dict, Any, Optional
-import google.generativeai as genai
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterator, Callable
 import json
+from utils.config import AIConfig, config
+from utils.response_cache import ResponseCache
+from utils.rate_limiter import get_rate_limiter, RateLimitExceeded
+from utils.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from utils.token_budget import create_token_estimator, PromptBudget, PromptSection
+from utils.single_flight import get_single_flight
+from utils.metrics import get_ai_metrics, current_agent
+from utils.health_monitor import get_health_monitor
+from utils.json_extract import extract_json
+from utils.ai_backends import create_backend
+from utils.model_router import ModelRouter, RouteDecision, parse_routes
+from utils.image_preprocess import ImagePreprocessor
+from utils.prompt_packing import PromptPacker
+from utils.context_store import get_context_store
+from utils.loop_runner import get_loop_runner
 
 class AIClient:
     """
     Centralized AI client for interacting with Gemini API
     """
     
-    def __init__(self):
+    # Model families that accept response_mime_type="application/json"
+    JSON_MODE_MODEL_PREFIXES = ("gemini-1.5", "gemini-2")
+    
+    # Approximate prompt tokens billed per image part
+    IMAGE_TOKENS = 258
+    
+    def __init__(self, ai_config: Optional[AIConfig] = None):
         self.logger = logging.getLogger(__name__)
         self.api_key = os.getenv("GEMINI_API_KEY")
+        ai_config = ai_config or config.get_ai_config()
         
-        if not self.api_key:
-            self.logger.warning("GEMINI_API_KEY not found in environment variables")
+        # Live Gemini by default; record, replay and synthetic backends allow
+        # offline runs and deterministic benchmarks
+        try:
+            self.client = create_backend(ai_config, self.api_key)
+            if self.client:
+                self.logger.info(f"AI client initialized with {self.client.name} backend")
+        except Exception as e:
+            self.logger.error(f"Failed to initialize AI backend: {str(e)}")
             self.client = None
-        else:
-            try:
-                genai.configure(api_key=self.api_key)
-                self.client = genai
-                self.logger.info("Gemini AI client initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize Gemini client: {str(e)}")
-                self.client = None
         
         # Default model configuration
-        self.default_model = "gemini-2.5-flash"
-        self.fallback_model = "gemini-2.5-pro"
+        self.default_model = ai_config.model
+        self.fallback_model = ai_config.fallback_model
+        
+        # Token accounting
+        self.token_estimator = create_token_estimator(
+            ai_config.token_estimator,
+            self.client.genai_module if self.client else None,
+            self.default_model
+        )
+        self.context_token_budget = ai_config.context_token_budget
         
         # Request settings
-        self.max_retries = 3
-        self.timeout = 30
+        self.max_retries = ai_config.max_retries
+        self.timeout = ai_config.timeout
+        self.max_concurrent_requests = max(1, ai_config.max_concurrent_requests)
+        
+        # One model handle per (model, generation config); the handles are
+        # thread-safe, so every caller shares them
+        self._models = {}
+        self._models_lock = threading.Lock()
+        
+        # Caps in-flight model calls across all threads and event loops
+        self._inflight = threading.BoundedSemaphore(self.max_concurrent_requests)
+        
+        # Response cache; calls hotter than cache_max_temperature bypass it
+        self.cache_max_temperature = ai_config.cache_max_temperature
+        self.response_cache = ResponseCache(
+            max_entries=ai_config.cache_max_entries,
+            ttl=ai_config.cache_ttl,
+            db_path=ai_config.cache_db_path or None
+        ) if ai_config.cache_enabled else None
+        
+        # Process-wide limiter enforcing get_model_limits budgets
+        self.rate_limiter = get_rate_limiter() if ai_config.rate_limit_enabled else None
+        self.rate_limit_max_wait = ai_config.rate_limit_max_wait
+        
+        # Process-wide coalescing of identical in-flight requests
+        self.single_flight = get_single_flight()
+        
+        # Persistent event loop that sync wrappers run coroutines on
+        self.loop_runner = get_loop_runner()
+        
+        # Retry, circuit breaker and hedging policy
+        self.retry_backoff_base = ai_config.retry_backoff_base
+        self.retry_backoff_max = ai_config.retry_backoff_max
+        self.circuit_failure_threshold = ai_config.circuit_failure_threshold
+        self.circuit_recovery_timeout = ai_config.circuit_recovery_timeout
+        self.hedging_enabled = ai_config.hedging_enabled
+        self.hedge_default_delay = ai_config.hedge_default_delay
+        self.hedge_min_delay = ai_config.hedge_min_delay
+        self._latencies = {}  # model -> recent successful call latencies (seconds)
+        self._latencies_lock = threading.Lock()
+        self._resilience_stats = {
+            'retries': 0,
+            'circuit_rejections': 0,
+            'fallbacks': 0,
+            'hedges_fired': 0,
+            'hedges_won': 0
+        }
+        
+        # Per-call model selection by tier, prompt size and live model state
+        self.router = ModelRouter(
+            routes={
+                'fast': parse_routes(ai_config.route_fast),
+                'standard': parse_routes(ai_config.route_standard),
+                'quality': parse_routes(ai_config.route_quality),
+                'vision': parse_routes(ai_config.route_vision)
+            },
+            latency_budgets={
+                'fast': ai_config.route_fast_max_latency,
+                'standard': ai_config.route_standard_max_latency
+            },
+            small_prompt_tokens=ai_config.route_small_prompt_tokens,
+            limits_fn=self.get_model_limits,
+            available_fn=lambda model_name: self._get_breaker(model_name).is_available(),
+            headroom_fn=self._has_budget,
+            p95_fn=lambda model_name: self._latency_percentile(model_name, 0.95)
+        ) if ai_config.routing_enabled else None
+        
+        # Downsizing / re-encoding of images before upload
+        self.image_preprocessor = ImagePreprocessor(
+            max_edge=ai_config.image_max_edge,
+            quality=ai_config.image_quality,
+            cache_entries=ai_config.image_cache_entries
+        )
+        self.image_batch_concurrency = max(1, ai_config.image_batch_concurrency)
+        
+        # Optional near-duplicate tier behind the exact-match response cache
+        # (imported only when enabled: it pulls in numpy, which is slow to import)
+        self.similarity_max_temperature = ai_config.similarity_max_temperature
+        self.similarity_cache = None
+        if ai_config.similarity_cache_enabled:
+            from utils.similarity_cache import SimilarityCache
+            self.similarity_cache = SimilarityCache(
+                max_entries=ai_config.similarity_cache_entries,
+                ttl=ai_config.cache_ttl,
+                num_perm=ai_config.similarity_num_perm,
+                bands=ai_config.similarity_bands
+            )
+        
+        # Per-project shared prompt prefixes, served from the provider's
+        # context cache when they are large enough
+        self.context_store = get_context_store(self.estimate_tokens)
+        self.context_caching_enabled = ai_config.context_caching_enabled
+        self.context_cache_min_tokens = ai_config.context_cache_min_tokens
+        self.context_cache_ttl = ai_config.context_cache_ttl
+        self._context_models = {}  # (model, prefix digest, config) -> (handle or None, refresh_at)
+        self._context_models_lock = threading.Lock()
+        
+        # Packing of many small homogeneous requests into few calls
+        self.prompt_packer = PromptPacker(
+            self.agenerate_response,
+            self.estimate_tokens,
+            max_items=ai_config.packing_max_items,
+            max_tokens=ai_config.packing_max_tokens
+        )
+        
+        # Process-wide per-model / per-agent usage telemetry
+        self.metrics = get_ai_metrics()
+        
+        # Cached per-model health status fed by real traffic plus an occasional
+        # cheap probe; health_check reports the default model's
+        self._health_check_ttl = ai_config.health_check_ttl
+        self._health_probe_interval = ai_config.health_probe_interval
+        self.health_monitor = self._get_health_monitor(self.default_model) if self.client else None
     
-    def generate_response(self, prompt: str, model: str = None, **kwargs) -> str:
+    def _get_model(self, model_name: str, **generation_params):
         """
-        Generate AI response for given prompt
+        Get a cached model handle for the given model and generation config
+        
+        Args:
+            model_name: Model to use
+            **generation_params: GenerationConfig fields (temperature, max_output_tokens, top_p, ...)
+            
+        Returns:
+            Shared GenerativeModel instance
+        """
+        generation_params = self._supported_params(model_name, generation_params)
+        key = (model_name, tuple(sorted(generation_params.items())))
+        
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self.client.create_model(model_name, generation_params)
+                self._models[key] = model
+            return model
+    
+    def _supported_params(self, model_name: str, generation_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop generation fields the model family rejects"""
+        if generation_params.get('response_mime_type') and not model_name.startswith(self.JSON_MODE_MODEL_PREFIXES):
+            # Older models reject the field; the JSON extractor copes with their output
+            return {k: v for k, v in generation_params.items() if k != 'response_mime_type'}
+        return generation_params
+    
+    def _model_for_prompt(self, model_name: str, prompt: str, generation_params: Dict[str, Any]):
+        """
+        Model handle and contents for one call
+        
+        A prompt that starts with a registered shared context is sent as just
+        its suffix to a handle backed by the provider's context cache, when
+        the prefix is large enough and the backend supports it; otherwise the
+        full prompt goes to the regular handle.
+        """
+        shared = self.context_store.match(prompt)
+        if shared is None:
+            return self._get_model(model_name, **generation_params), prompt
+        
+        cached_model = None
+        if self.context_caching_enabled and shared.tokens >= self.context_cache_min_tokens:
+            cached_model = self._get_context_cached_model(model_name, shared, generation_params)
+        self.context_store.record_use(shared, model_name, provider_cached=cached_model is not None)
+        
+        if cached_model is not None:
+            return cached_model, prompt[len(shared.prefix):]
+        return self._get_model(model_name, **generation_params), prompt
+    
+    def _get_context_cached_model(self, model_name: str, shared, generation_params: Dict[str, Any]):
+        """Shared handle over a provider context cache, recreated as it nears expiry"""
+        generation_params = self._supported_params(model_name, generation_params)
+        key = (model_name, shared.digest, tuple(sorted(generation_params.items())))
+        now = time.monotonic()
+        
+        with self._context_models_lock:
+            entry = self._context_models.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            try:
+                model = self.client.create_cached_model(model_name, shared.prefix, generation_params, self.context_cache_ttl)
+            except Exception as e:
+                # Unsupported model or prefix below the provider minimum; don't retry until expiry
+                self.logger.info(f"Context caching unavailable for {model_name}: {str(e)}")
+                model = None
+            # Refresh a minute early so calls never hit an expired cache
+            self._context_models[key] = (model, now + max(60, self.context_cache_ttl - 60))
+            return model
+    
+    def _call_model(self, model, contents, **kwargs):
+        """
+        Blocking model call bounded by the in-flight semaphore
+        
+        Runs on a worker thread when reached from the async API, so waiting
+        for a free slot never blocks an event loop.
+        """
+        with self._inflight:
+            return model.generate_content(
+                contents,
+                request_options={'timeout': self.timeout},
+                **kwargs
+            )
+    
+    def _ensure_rate_limits(self, model_name: str):
+        """Register a model's limits with the shared rate limiter on first use"""
+        if not self.rate_limiter.is_registered(model_name):
+            self.rate_limiter.register_model(model_name, self.get_model_limits(model_name))
+    
+    def _acquire_budget(self, model_name: str, tokens: int):
+        """Block until the model has rate-limit budget for one request"""
+        if self.rate_limiter:
+            self._ensure_rate_limits(model_name)
+            self.rate_limiter.acquire(model_name, tokens, timeout=self.rate_limit_max_wait)
+    
+    async def _aacquire_budget(self, model_name: str, tokens: int):
+        """Wait without blocking the event loop until the model has budget"""
+        if self.rate_limiter:
+            self._ensure_rate_limits(model_name)
+            await self.rate_limiter.aacquire(model_name, tokens, timeout=self.rate_limit_max_wait)
+    
+    def _record_token_usage(self, model_name: str, prompt: str, completion: str, response=None, started: float = None,
+                            prompt_estimate: Optional[int] = None, completion_estimate: Optional[int] = None):
+        """
+        Log and record prompt/completion token counts for one successful call
+        and charge the completion against the model's TPM budget
+        
+        Uses the model's reported usage_metadata when present, otherwise the
+        configured estimator (or the estimates passed in by async callers).
+        """
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', None) or prompt_estimate or self.estimate_tokens(prompt)
+        completion_tokens = getattr(usage, 'candidates_token_count', None) or completion_estimate or self.estimate_tokens(completion)
+        
+        if self.rate_limiter and completion_tokens:
+            self.rate_limiter.add_tokens(model_name, completion_tokens)
+        
+        latency_ms = (time.monotonic() - started) * 1000 if started else 0.0
+        self.metrics.record_request(model_name, latency_ms, prompt_tokens, completion_tokens)
+        if self.health_monitor:
+            self._get_health_monitor(model_name).report(True)
+        
+        latency = f", latency_ms={latency_ms:.0f}" if started else ""
+        self.logger.info(
+            f"AI call model={model_name} prompt_tokens={prompt_tokens} completion_tokens={completion_tokens}{latency}"
+        )
+        return prompt_tokens, completion_tokens
+    
+    def _record_failure(self, model_name: str, started: float, error: BaseException):
+        """Record a failed model call in the usage metrics and health status"""
+        self.metrics.record_request(model_name, (time.monotonic() - started) * 1000, error=error)
+        if self.health_monitor:
+            self._get_health_monitor(model_name).report(False, error)
+    
+    def _has_budget(self, model_name: str, tokens: int) -> bool:
+        """Check whether a model could take a request right now"""
+        if not self.rate_limiter:
+            return True
+        self._ensure_rate_limits(model_name)
+        return self.rate_limiter.has_capacity(model_name, tokens)
+    
+    def _run_sync(self, coro):
+        """
+        Run a coroutine to completion from synchronous code on the shared
+        event loop runner, so loop-bound state persists across calls
+        
+        Args:
+            coro: Coroutine to run
+            
+        Returns:
+            Coroutine result
+            
+        Raises:
+            RuntimeError: If called from the runner's own loop thread, where
+                blocking would stall every coroutine on the loop (await the
+                async method instead)
+        """
+        return self.loop_runner.run_sync(coro)
+    
+    def _is_repeatable(self, temperature: float, use_cache: Optional[bool]) -> bool:
+        """
+        Decide whether identical calls may share a response, either through the
+        cache or by coalescing while in flight
+        """
+        if use_cache is False:
+            return False
+        if use_cache is True:
+            return True
+        return temperature <= self.cache_max_temperature
+    
+    async def agenerate_response(self, prompt: str, model: str = None, use_cache: Optional[bool] = None, **kwargs) -> str:
+        """
+        Generate AI response for given prompt without blocking the event loop
         
         Args:
             prompt: The input prompt
             model: Model to use (defaults to default_model)
-            **kwargs: Additional parameters
+            use_cache: Force (True) or skip (False) the response cache and request
+                coalescing; by default only calls at or below cache_max_temperature
+                share responses
+            **kwargs: Additional parameters (temperature, max_tokens, top_p,
+                response_mime_type='application/json' to request JSON output, and
+                latency_tier / task to steer model routing when model is not given,
+                similarity_threshold to also serve near-duplicate prompts from the
+                similarity cache)
             
         Returns:
             Generated response as string
         """
+        tier, task = kwargs.pop('latency_tier', None), kwargs.pop('task', None)
+        similarity_threshold = kwargs.pop('similarity_threshold', None)
+        temperature = kwargs.get('temperature', 0.7)
+        
+        # Counted once per request; routing only needs it when no model is given
+        prompt_tokens = await self.aestimate_tokens(prompt) if self._is_routed(model) else None
+        
+        if not self._is_repeatable(temperature, use_cache):
+            route = self._select_model(prompt, model, tier, task, prompt_tokens)
+            return await self._agenerate_uncached(
+                prompt, route.model, self._generation_params(kwargs), route.fallback, prompt_tokens
+            )
+        
+        model_identity = self._cache_identity(prompt, model, tier, task, prompt_tokens)
+        request_key = ResponseCache.make_key(
+            model_identity, prompt, temperature,
+            kwargs.get('max_tokens', 4000), kwargs.get('top_p', 0.95),
+            kwargs.get('response_mime_type')
+        )
+        if self.response_cache:
+            cached = await self.response_cache.aget(request_key)
+            if cached is not None:
+                self.metrics.record_cache_hit(model_identity)
+                return cached
+        
+        # Near-duplicate tier: only for low-temperature callers that opt in
+        similarity_namespace = None
+        if self.similarity_cache and similarity_threshold and temperature <= self.similarity_max_temperature:
+            similarity_namespace = ResponseCache.make_key(
+                model_identity, "", temperature,
+                kwargs.get('max_tokens', 4000), kwargs.get('top_p', 0.95),
+                kwargs.get('response_mime_type')
+            )
+            hit = self.similarity_cache.lookup(similarity_namespace, prompt, similarity_threshold, current_agent.get())
+            if hit is not None:
+                self.metrics.record_cache_hit(model_identity)
+                self.logger.debug(f"Similarity cache hit ({hit[1]:.2f}) for {current_agent.get() or 'unattributed'}")
+                return hit[0]
+        
+        async def generate():
+            route = self._select_model(prompt, model, tier, task, prompt_tokens)
+            response = await self._agenerate_uncached(
+                prompt, route.model, self._generation_params(kwargs), route.fallback, prompt_tokens
+            )
+            if self.response_cache:
+                await self.response_cache.aset(request_key, response)
+            if similarity_namespace:
+                self.similarity_cache.store(similarity_namespace, prompt, response, current_agent.get())
+            return response
+        
+        return await self.single_flight.ado(request_key, generate)
+    
+    def _is_routed(self, model: Optional[str] = None) -> bool:
+        """Whether the router picks the model for a call, and so needs its prompt size"""
+        return not model and self.router is not None
+    
+    def _select_model(self, prompt: str, model: Optional[str] = None, tier: Optional[str] = None,
+                      task: Optional[str] = None, prompt_tokens: Optional[int] = None) -> RouteDecision:
+        """
+        Pick the model and fallback for one call: an explicit model wins,
+        otherwise the router decides from prompt size, tier and live model state
+        """
+        if not self._is_routed(model):
+            return RouteDecision(
+                model or self.default_model,
+                self.fallback_model,
+                tier="explicit" if model else "default",
+                reason="model requested by caller" if model else "routing disabled"
+            )
+        if prompt_tokens is None:
+            prompt_tokens = self.estimate_tokens(prompt)
+        return self.router.route(prompt_tokens, tier, task)
+    
+    def _cache_identity(self, prompt: str, model: Optional[str] = None, tier: Optional[str] = None,
+                        task: Optional[str] = None, prompt_tokens: Optional[int] = None) -> str:
+        """
+        Model identity for cache and coalescing keys; routed calls are keyed
+        by tier so a cached answer survives the router switching models
+        """
+        if not self._is_routed(model):
+            return model or self.default_model
+        if prompt_tokens is None:
+            prompt_tokens = self.estimate_tokens(prompt)
+        return f"route:{self.router.resolve_tier(prompt_tokens, tier, task)}"
+    
+    def _generation_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Map call kwargs to GenerationConfig fields"""
+        params = {
+            'temperature': kwargs.get('temperature', 0.7),
+            'max_output_tokens': kwargs.get('max_tokens', 4000),
+            'top_p': kwargs.get('top_p', 0.95)
+        }
+        if kwargs.get('response_mime_type'):
+            params['response_mime_type'] = kwargs['response_mime_type']
+        return params
+    
+    def _get_breaker(self, model_name: str):
+        return get_circuit_breaker(model_name, self.circuit_failure_threshold, self.circuit_recovery_timeout)
+    
+    def _bump(self, counter: str):
+        with self._latencies_lock:
+            self._resilience_stats[counter] += 1
+    
+    def _record_latency(self, model_name: str, seconds: float):
+        with self._latencies_lock:
+            self._latencies.setdefault(model_name, deque(maxlen=200)).append(seconds)
+    
+    def _get_resilience_counters(self) -> Dict[str, int]:
+        with self._latencies_lock:
+            return dict(self._resilience_stats)
+    
+    def _latency_percentile(self, model_name: str, percentile: float) -> Optional[float]:
+        """Percentile of recent successful call latencies, None without enough samples"""
+        with self._latencies_lock:
+            samples = sorted(self._latencies.get(model_name, ()))
+        if len(samples) < 10:
+            return None
+        index = min(len(samples) - 1, int(round(percentile * (len(samples) - 1))))
+        return samples[index]
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+        ceiling = min(self.retry_backoff_max, self.retry_backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    async def _agenerate_once(self, prompt: str, model_name: str, generation_params: Dict[str, Any],
+                              prompt_tokens: int) -> str:
+        """
+        Make a single model call bounded by the configured timeout
+        """
+        model, contents = await asyncio.to_thread(self._model_for_prompt, model_name, prompt, generation_params)
+        await self._aacquire_budget(model_name, prompt_tokens)
+        started = time.monotonic()
+        response = await asyncio.wait_for(
+            asyncio.to_thread(self._call_model, model, contents),
+            timeout=self.timeout
+        )
+        
+        if response and response.text:
+            usage = getattr(response, 'usage_metadata', None)
+            completion_tokens = getattr(usage, 'candidates_token_count', None) or await self.aestimate_tokens(response.text)
+            self._record_token_usage(model_name, prompt, response.text, response, started, prompt_tokens, completion_tokens)
+            return response.text
+        else:
+            raise Exception("Empty response from AI model")
+    
+    async def _agenerate_with_retries(self, prompt: str, model_name: str, generation_params: Dict[str, Any],
+                                      prompt_tokens: int) -> str:
+        """
+        Call one model up to 1 + max_retries times with exponential backoff,
+        honouring its circuit breaker
+        """
+        breaker = self._get_breaker(model_name)
+        last_error = None
+        
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow_request():
+                self._bump('circuit_rejections')
+                raise CircuitOpenError(f"Circuit open for {model_name}, skipping call")
+            
+            start_time = time.monotonic()
+            try:
+                response = await self._agenerate_once(prompt, model_name, generation_params, prompt_tokens)
+            except RateLimitExceeded:
+                # Not a model fault, and we have already waited our turn
+                breaker.release_trial()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                self._record_failure(model_name, start_time, e)
+                last_error = e
+                if isinstance(e, asyncio.TimeoutError):
+                    last_error = Exception(f"{model_name} timed out after {self.timeout}s")
+                if attempt < self.max_retries:
+                    delay = self._backoff_delay(attempt)
+                    self._bump('retries')
+                    self.logger.warning(
+                        f"{model_name} call failed ({str(last_error)}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (a lost hedge race, a cancelled job or a timed-out
+                # caller): the outcome is unknown, so hand back a trial slot
+                # rather than leave the breaker half-open forever
+                breaker.release_trial()
+                raise
+            
+            breaker.record_success()
+            self._record_latency(model_name, time.monotonic() - start_time)
+            return response
+        
+        raise last_error
+    
+    def _fallback_available(self, model_name: str, prompt: str, fallback: Optional[str],
+                            prompt_tokens: Optional[int] = None) -> bool:
+        """Check the fallback model is healthy and has rate-limit headroom"""
+        if not fallback or model_name == fallback:
+            return False
+        if not self._get_breaker(fallback).is_available():
+            self.logger.warning(f"Fallback model {fallback} circuit is open, not redirecting")
+            return False
+        if prompt_tokens is None:
+            prompt_tokens = self.estimate_tokens(prompt)
+        if not self._has_budget(fallback, prompt_tokens):
+            self.logger.warning(f"Fallback model {fallback} is at its rate limit, not redirecting")
+            return False
+        return True
+    
+    def _hedge_delay(self, model_name: str) -> float:
+        """Delay before hedging: the primary's observed p95 latency"""
+        p95 = self._latency_percentile(model_name, 0.95)
+        delay = p95 if p95 is not None else self.hedge_default_delay
+        return max(delay, self.hedge_min_delay)
+    
+    async def _agenerate_hedged(self, prompt: str, model_name: str, generation_params: Dict[str, Any], fallback: str,
+                                prompt_tokens: int) -> str:
+        """
+        Start the primary; if it hasn't answered within its p95 latency, race
+        the fallback against it and take whichever succeeds first. A primary
+        that fails outright gets a plain fallback instead.
+        """
+        primary = asyncio.ensure_future(self._agenerate_with_retries(prompt, model_name, generation_params, prompt_tokens))
+        secondary = None
+        raced = False
+        errors = []
+        
+        done, pending = await asyncio.wait({primary}, timeout=self._hedge_delay(model_name))
+        try:
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary and raced:
+                            self._bump('hedges_won')
+                        return task.result()
+                    errors.append(task.exception())
+                
+                if secondary is None and self._fallback_available(model_name, prompt, fallback, prompt_tokens):
+                    raced = bool(pending)
+                    if raced:
+                        self.logger.info(f"{model_name} slower than p95, hedging with {fallback}")
+                    else:
+                        self.logger.info(f"Retrying with fallback model: {fallback}")
+                    self._bump('hedges_fired' if raced else 'fallbacks')
+                    if not raced:
+                        self.metrics.record_fallback(model_name)
+                    secondary = asyncio.ensure_future(
+                        self._agenerate_with_retries(prompt, fallback, generation_params, prompt_tokens)
+                    )
+                    pending.add(secondary)
+                
+                if not pending:
+                    raise errors[0]
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _agenerate_uncached(self, prompt: str, model_name: str, generation_params: Dict[str, Any],
+                                  fallback: Optional[str], prompt_tokens: Optional[int] = None) -> str:
+        """
+        Call the model with retries, falling back (or hedging) to the fallback model
+        """
         if not self.client:
             raise Exception("AI client not initialized. Check GEMINI_API_KEY.")
         
-        model_name = model or self.default_model
+        if prompt_tokens is None:
+            prompt_tokens = await self.aestimate_tokens(prompt)
+        
+        if self.hedging_enabled and fallback and model_name != fallback:
+            try:
+                return await self._agenerate_hedged(prompt, model_name, generation_params, fallback, prompt_tokens)
+            except Exception as e:
+                self.logger.error(f"Error generating AI response: {str(e)}")
+                raise Exception(f"AI response generation failed: {str(e)}")
         
         try:
-            model = self.client.GenerativeModel(model_name)
-            generation_config = genai.types.GenerationConfig(
-                temperature=kwargs.get('temperature', 0.7),
-                max_output_tokens=kwargs.get('max_tokens', 4000),
-                top_p=kwargs.get('top_p', 0.95)
-            )
-            response = model.generate_content(prompt, generation_config=generation_config)
-            
-            if response and response.text:
-                return response.text
-            else:
-                raise Exception("Empty response from AI model")
+            return await self._agenerate_with_retries(prompt, model_name, generation_params, prompt_tokens)
                 
         except Exception as e:
             self.logger.error(f"Error generating AI response: {str(e)}")
             
-            # Try fallback model if primary fails
-            if model_name != self.fallback_model:
-                self.logger.info(f"Retrying with fallback model: {self.fallback_model}")
+            # Try fallback model if primary fails and it can absorb the call
+            if self._fallback_available(model_name, prompt, fallback, prompt_tokens):
+                self._bump('fallbacks')
+                self.metrics.record_fallback(model_name)
+                self.logger.info(f"Retrying with fallback model: {fallback}")
                 try:
-                    return self.generate_response(prompt, self.fallback_model, **kwargs)
+                    return await self._agenerate_with_retries(prompt, fallback, generation_params, prompt_tokens)
                 except Exception as fallback_error:
                     self.logger.error(f"Fallback model also failed: {str(fallback_error)}")
             
             raise Exception(f"AI response generation failed: {str(e)}")
     
-    def generate_structured_response(self, prompt: str, response_schema = None, model: str = None) -> Dict[str, Any]:
+    def generate_response(self, prompt: str, model: str = None, use_cache: Optional[bool] = None, **kwargs) -> str:
         """
-        Generate structured JSON response
+        Generate AI response for given prompt (blocking wrapper around agenerate_response)
         
         Args:
             prompt: The input prompt
-            response_schema: Pydantic model for response validation
-            model: Model to use
+            model: Model to use (defaults to default_model)
+            use_cache: Force (True) or skip (False) the response cache
+            **kwargs: Additional parameters
             
         Returns:
-            Parsed JSON response
+            Generated response as string
+        """
+        return self._run_sync(self.agenerate_response(prompt, model, use_cache=use_cache, **kwargs))
+    
+    def _stream_uncached(self, prompt: str, model_name: str, fallback: Optional[str], **kwargs) -> Iterator[str]:
+        """
+        Stream chunks from the model, switching to the fallback model only if
+        the primary fails before producing any text
         """
         if not self.client:
             raise Exception("AI client not initialized. Check GEMINI_API_KEY.")
         
-        model_name = model or self.default_model
-        
+        emitted = []
+        breaker = self._get_breaker(model_name)
+        started = None
         try:
-            model = self.client.GenerativeModel(model_name)
-            generation_config = genai.types.GenerationConfig(
-                temperature=0.3  # Lower temperature for structured output
-            )
+            if not breaker.allow_request():
+                self._bump('circuit_rejections')
+                raise CircuitOpenError(f"Circuit open for {model_name}, skipping call")
             
-            # Add JSON instruction to prompt
-            json_prompt = f"{prompt}\n\nPlease respond with valid JSON format."
-            response = model.generate_content(json_prompt, generation_config=generation_config)
+            # Same handle selection as non-streaming calls, including the context cache
+            model, contents = self._model_for_prompt(model_name, prompt, self._generation_params(kwargs))
+            self._acquire_budget(model_name, self.estimate_tokens(prompt))
+            started = time.monotonic()
             
-            if response and response.text:
-                try:
-                    return json.loads(response.text)
-                except json.JSONDecodeError as e:
-                    self.logger.error(f"Failed to parse JSON response: {str(e)}")
-                    # Try to extract JSON from response
-                    return self._extract_json_from_text(response.text)
-            else:
+            # Hold an in-flight slot for the whole stream
+            with self._inflight:
+                response = model.generate_content(
+                    contents,
+                    stream=True,
+                    request_options={'timeout': self.timeout}
+                )
+                for chunk in response:
+                    text = chunk.text
+                    if text:
+                        emitted.append(text)
+                        yield text
+            
+            if not emitted:
                 raise Exception("Empty response from AI model")
-                
+            breaker.record_success()
+            self._record_token_usage(model_name, prompt, ''.join(emitted), response, started)
+            
         except Exception as e:
-            self.logger.error(f"Error generating structured AI response: {str(e)}")
-            raise Exception(f"Structured AI response generation failed: {str(e)}")
+            self.logger.error(f"Error streaming AI response: {str(e)}")
+            if isinstance(e, RateLimitExceeded):
+                breaker.release_trial()
+            elif not isinstance(e, CircuitOpenError):
+                breaker.record_failure()
+            if started is not None:
+                self._record_failure(model_name, started, e)
+            
+            if not emitted and self._fallback_available(model_name, prompt, fallback):
+                self._bump('fallbacks')
+                self.metrics.record_fallback(model_name)
+                self.logger.info(f"Retrying stream with fallback model: {fallback}")
+                yield from self._stream_uncached(prompt, fallback, None, **kwargs)
+                return
+            
+            raise Exception(f"AI response streaming failed: {str(e)}")
+        except BaseException:
+            # Consumer closed the stream early or the call was interrupted
+            breaker.release_trial()
+            raise
     
-    def _extract_json_from_text(self, text: str) -> Dict[str, Any]:
+    def generate_stream(self, prompt: str, model: str = None, use_cache: Optional[bool] = None, **kwargs) -> Iterator[str]:
+        """
+        Generate AI response for given prompt, yielding text chunks as they arrive
+        
+        Args:
+            prompt: The input prompt
+            model: Model to use (defaults to default_model)
+            use_cache: Force (True) or skip (False) the response cache
+            **kwargs: Additional parameters (see agenerate_response)
+            
+        Yields:
+            Text chunks; a cached response is yielded as a single chunk
         """
-        Attempt to extract JSON from text response
+        tier, task = kwargs.pop('latency_tier', None), kwargs.pop('task', None)
+        temperature = kwargs.get('temperature', 0.7)
+        
+        cache_key = None
+        if self.response_cache and self._is_repeatable(temperature, use_cache):
+            model_identity = self._cache_identity(prompt, model, tier, task)
+            cache_key = ResponseCache.make_key(
+                model_identity, prompt, temperature,
+                kwargs.get('max_tokens', 4000), kwargs.get('top_p', 0.95),
+                kwargs.get('response_mime_type')
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.metrics.record_cache_hit(model_identity)
+                yield cached
+                return
+        
+        route = self._select_model(prompt, model, tier, task)
+        chunks = []
+        for chunk in self._stream_uncached(prompt, route.model, route.fallback, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        
+        # Only complete streams are cached
+        if cache_key:
+            self.response_cache.set(cache_key, ''.join(chunks))
+    
+    async def agenerate_stream(self, prompt: str, model: str = None, use_cache: Optional[bool] = None, **kwargs) -> AsyncIterator[str]:
         """
-        try:
-            # Look for JSON-like patterns
-            import re
+        Async variant of generate_stream; the blocking stream is pumped on a
+        worker thread so the event loop stays free between chunks
+        
+        Args:
+            prompt: The input prompt
+            model: Model to use (defaults to default_model)
+            use_cache: Force (True) or skip (False) the response cache
+            **kwargs: Additional parameters
             
-            # Find content between { and }
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+        Yields:
+            Text chunks as they arrive
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+        
+        def emit(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Loop already closed; consumer is gone
+                stop.set()
+        
+        def pump():
+            stream = self.generate_stream(prompt, model, use_cache=use_cache, **kwargs)
+            try:
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    emit((chunk, None))
+                emit((finished, None))
+            except Exception as e:
+                emit((finished, e))
+            finally:
+                stream.close()
+        
+        # Run the pump in a copy of our context so the stream is attributed to
+        # the calling agent
+        context = contextvars.copy_context()
+        loop.run_in_executor(None, context.run, pump)
+        try:
+            while True:
+                chunk, error = await queue.get()
+                if chunk is finished:
+                    if error:
+                        raise error
+                    break
+                yield chunk
+        finally:
+            stop.set()
+    
+    async def agenerate_structured_response(self, prompt: str, response_schema = None, model: str = None, use_cache: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Generate structured JSON response without blocking the event loop
+        
+        Args:
+            prompt: The input prompt
+            response_schema: Pydantic model for response validation
+            model: Model to use
+            use_cache: Force (True) or skip (False) the response cache
             
-            # Fallback: return text in error format
-            return {"error": "Could not parse JSON", "raw_response": text}
+        Returns:
+            Parsed JSON response
+        """
+        # Add JSON instruction to prompt
+        json_prompt = f"{prompt}\n\nPlease respond with valid JSON format."
+        
+        # Lower temperature and JSON output mode for structured output
+        temperature = 0.3
+        mime_type = "application/json"
+        
+        async def generate():
+            route = self._select_model(json_prompt, model, prompt_tokens=prompt_tokens)
+            response_text = await self._agenerate_uncached(
+                json_prompt, route.model, {'temperature': temperature, 'response_mime_type': mime_type}, route.fallback,
+                prompt_tokens
+            )
+            if request_key and self.response_cache:
+                await self.response_cache.aset(request_key, response_text)
+            return response_text
+        
+        prompt_tokens = await self.aestimate_tokens(json_prompt) if self._is_routed(model) else None
+        request_key = None
+        response_text = None
+        if self._is_repeatable(temperature, use_cache):
+            model_identity = self._cache_identity(json_prompt, model, prompt_tokens=prompt_tokens)
+            request_key = ResponseCache.make_key(model_identity, json_prompt, temperature, response_mime_type=mime_type)
+            if self.response_cache:
+                response_text = await self.response_cache.aget(request_key)
+                if response_text is not None:
+                    self.metrics.record_cache_hit(model_identity)
+        
+        try:
+            if response_text is None:
+                if request_key:
+                    response_text = await self.single_flight.ado(request_key, generate)
+                else:
+                    response_text = await generate()
             
+            return self._extract_json_from_text(response_text)
+                
         except Exception as e:
-            self.logger.error(f"Failed to extract JSON from text: {str(e)}")
-            return {"error": "JSON extraction failed", "raw_response": text}
+            self.logger.error(f"Error generating structured AI response: {str(e)}")
+            raise Exception(f"Structured AI response generation failed: {str(e)}")
     
-    def analyze_image(self, image_path: str, prompt: str = None) -> str:
+    def generate_structured_response(self, prompt: str, response_schema = None, model: str = None, use_cache: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Generate structured JSON response (blocking wrapper around agenerate_structured_response)
+        
+        Args:
+            prompt: The input prompt
+            response_schema: Pydantic model for response validation
+            model: Model to use
+            use_cache: Force (True) or skip (False) the response cache
+            
+        Returns:
+            Parsed JSON response
+        """
+        return self._run_sync(self.agenerate_structured_response(prompt, response_schema, model, use_cache))
+    
+    def _extract_json_from_text(self, text: str) -> Dict[str, Any]:
+        """
+        Extract JSON from a text response, stripping code fences and
+        surrounding prose and repairing trailing commas or a truncated tail
+        """
+        extraction = extract_json(text, prefer='{')
+        
+        if extraction['repairs']:
+            self.logger.info(f"Repaired JSON response: {', '.join(extraction['repairs'])}")
+        
+        if extraction['success'] and isinstance(extraction['data'], dict):
+            return extraction['data']
+        
+        error = extraction['error'] or f"expected a JSON object, got {type(extraction['data']).__name__}"
+        self.logger.error(f"Failed to extract JSON from text: {error}")
+        return {"error": "Could not parse JSON", "raw_response": text}
+    
+    def analyze_image(self, image_path: str, prompt: str = None, use_cache: Optional[bool] = None) -> str:
         """
         Analyze image with AI
         
+        The image is downsized and stripped of metadata before upload, and the
+        analysis is cached by image content hash and prompt, so the same asset
+        is never analyzed twice.
+        
         Args:
             image_path: Path to image file
             prompt: Optional analysis prompt
+            use_cache: Force (True) or bypass (False) the response cache
             
         Returns:
             Analysis result
@@ -152,45 +936,154 @@ class AIClient:
         if not self.client:
             raise Exception("AI client not initialized. Check GEMINI_API_KEY.")
         
+        started = None
+        model_name = None
         try:
             with open(image_path, "rb") as f:
                 image_bytes = f.read()
                 
             analysis_prompt = prompt or "Analyze this image in detail and describe its key elements, context, and any notable aspects."
             
-            # Create PIL Image for Gemini
-            from PIL import Image
-            import io
-            image = Image.open(io.BytesIO(image_bytes))
+            # Vision route (pro model for image analysis when routing is disabled)
+            explicit_model = None if self.router else "gemini-1.5-pro"
+            model_identity = self._cache_identity(analysis_prompt, explicit_model, 'vision')
+            request_key = ResponseCache.make_key(
+                model_identity,
+                f"{analysis_prompt}\n<image sha256={ImagePreprocessor.content_hash(image_bytes)} "
+                f"{self.image_preprocessor.signature}>"
+            )
+            cacheable = bool(self.response_cache) and use_cache is not False
+            if cacheable:
+                cached = self.response_cache.get(request_key)
+                if cached is not None:
+                    self.metrics.record_cache_hit(model_identity)
+                    return cached
             
-            model = self.client.GenerativeModel("gemini-1.5-pro")  # Use pro model for image analysis
-            response = model.generate_content([analysis_prompt, image])
+            def analyze():
+                nonlocal started, model_name
+                prepared = self.image_preprocessor.prepare(image_bytes)
+                model_name = self._select_model(analysis_prompt, explicit_model, tier="vision").model
+                model = self._get_model(model_name)
+                self._acquire_budget(model_name, self.estimate_tokens(analysis_prompt) + self.IMAGE_TOKENS)
+                started = time.monotonic()
+                response = self._call_model(model, [analysis_prompt, prepared.as_part()])
+                if not response.text:
+                    return "No analysis available"
+                self._record_token_usage(model_name, analysis_prompt, response.text, response, started)
+                if cacheable:
+                    self.response_cache.set(request_key, response.text)
+                return response.text
             
-            return response.text if response.text else "No analysis available"
+            return self.single_flight.do(request_key, analyze)
             
         except Exception as e:
+            if started is not None:
+                self._record_failure(model_name, started, e)
             self.logger.error(f"Error analyzing image: {str(e)}")
             raise Exception(f"Image analysis failed: {str(e)}")
     
-    def health_check(self) -> bool:
+    def analyze_images(self, image_paths: List[str], prompt: str = None, max_concurrency: int = None,
+                       use_cache: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze many images with bounded concurrency
+        
+        Duplicate assets in the batch (same content) are analyzed once.
+        
+        Args:
+            image_paths: Paths to image files
+            prompt: Optional analysis prompt shared by every image
+            max_concurrency: Images processed at once (defaults to image_batch_concurrency)
+            use_cache: Force (True) or bypass (False) the response cache
+            
+        Returns:
+            One result per path, in input order, with 'success' and either
+            'analysis' or 'error'
+        """
+        def analyze(image_path: str) -> Dict[str, Any]:
+            try:
+                return {
+                    'image_path': image_path,
+                    'success': True,
+                    'analysis': self.analyze_image(image_path, prompt, use_cache=use_cache)
+                }
+            except Exception as e:
+                return {'image_path': image_path, 'success': False, 'error': str(e)}
+        
+        if not image_paths:
+            return []
+        workers = max(1, min(max_concurrency or self.image_batch_concurrency, len(image_paths)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-analysis") as executor:
+            return list(executor.map(analyze, image_paths))
+    
+    async def aanalyze_images(self, image_paths: List[str], prompt: str = None, max_concurrency: int = None,
+                              use_cache: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Async variant of analyze_images; file reads, preprocessing and the
+        model calls run on worker threads so the event loop stays free
+        
+        Args:
+            image_paths: Paths to image files
+            prompt: Optional analysis prompt shared by every image
+            max_concurrency: Images processed at once (defaults to image_batch_concurrency)
+            use_cache: Force (True) or bypass (False) the response cache
+            
+        Returns:
+            Same as analyze_images
+        """
+        return await asyncio.to_thread(self.analyze_images, image_paths, prompt, max_concurrency, use_cache)
+    
+    def _get_health_monitor(self, model_name: str):
+        """Get the process-wide health monitor of one model"""
+        return get_health_monitor(
+            model_name,
+            lambda: self._probe_service(model_name),
+            ttl=self._health_check_ttl,
+            probe_interval=self._health_probe_interval
+        )
+    
+    def _probe_service(self, model_name: str = None) -> bool:
+        """
+        Cheap liveness probe: fetch model metadata instead of generating text,
+        so it is neither billed nor counted against rate limits
+        
+        Args:
+            model_name: Model to probe (defaults to default_model)
+        """
+        try:
+            return self.client.get_model_info(model_name or self.default_model) is not None
+        except Exception as e:
+            self.logger.error(f"AI health probe failed: {str(e)}")
+            return False
+    
+    def health_check(self, force: bool = False) -> bool:
         """
         Check if AI service is available
         
+        Served from a cached status derived from recent calls; the metadata
+        probe only runs when there has been no traffic for health_check_ttl
+        seconds, and then in the background.
+        
+        Args:
+            force: Probe now and wait for the result
+            
         Returns:
             True if service is healthy, False otherwise
         """
         if not self.client:
             return False
         
-        try:
-            # Simple test request
-            model = self.client.GenerativeModel(self.default_model)
-            response = model.generate_content("Hello")
-            return bool(response and response.text)
-            
-        except Exception as e:
-            self.logger.error(f"AI health check failed: {str(e)}")
-            return False
+        return self.health_monitor.is_healthy(force=force)
+    
+    def get_health_status(self) -> Dict[str, Any]:
+        """
+        Get cached health details without probing
+        
+        Returns:
+            Dictionary with status, source, age and recent outcomes
+        """
+        if not self.client:
+            return {'healthy': False, 'source': 'not_configured'}
+        return self.health_monitor.get_status()
     
     def get_available_models(self) -> list:
         """
@@ -223,10 +1116,39 @@ class AIClient:
             text: Input text
             
         Returns:
-            Estimated token count
+            Estimated token count from the configured estimator
         """
-        # Rough estimation: ~4 characters per token for English text
-        return len(text) // 4
+        return self.token_estimator.count(text)
+    
+    async def aestimate_tokens(self, text: str) -> int:
+        """
+        Estimate token count for text without blocking the event loop
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Estimated token count; network-backed estimators run on a worker thread
+        """
+        if self.token_estimator.remote:
+            return await asyncio.to_thread(self.token_estimator.count, text)
+        return self.token_estimator.count(text)
+    
+    def fit_prompt_sections(self, sections: List[PromptSection], budget: int = None, summarizer=None) -> Dict[str, Any]:
+        """
+        Fit prompt context sections into a token budget, trimming the
+        lowest-priority sections first
+        
+        Args:
+            sections: PromptSection list
+            budget: Token budget for all sections (defaults to context_token_budget)
+            summarizer: Optional callable(text, target_tokens) -> str used instead of truncation
+            
+        Returns:
+            Fit report with rendered 'sections' keyed by name (see PromptBudget.fit)
+        """
+        budget = budget or self.context_token_budget
+        return PromptBudget(self.token_estimator, summarizer).fit(sections, budget)
     
     def get_model_limits(self, model: str = None) -> Dict[str, Any]:
         """
@@ -274,40 +1196,188 @@ class AIClient:
         
         return limits.get(model_name, limits["gemini-2.5-flash"])
     
-    def batch_generate(self, prompts: list, model: str = None, **kwargs) -> list:
+    async def _abatch_item(self, index: int, prompt: str, model: Optional[str], semaphore: asyncio.Semaphore, **kwargs) -> Dict[str, Any]:
+        """
+        Generate one batch slot, capturing failures in the result record
+        """
+        async with semaphore:
+            start_time = time.monotonic()
+            try:
+                response = await self.agenerate_response(prompt, model, **kwargs)
+                return {
+                    'index': index,
+                    'success': True,
+                    'response': response,
+                    'error': None,
+                    'error_type': None,
+                    'execution_time': (time.monotonic() - start_time) * 1000
+                }
+            except Exception as e:
+                self.logger.error(f"Error in batch generation for prompt {index}: {str(e)}")
+                return {
+                    'index': index,
+                    'success': False,
+                    'response': None,
+                    'error': str(e),
+                    'error_type': type(e).__name__,
+                    'execution_time': (time.monotonic() - start_time) * 1000
+                }
+    
+    async def abatch_generate_iter(self, prompts: list, model: str = None, max_concurrency: int = None, **kwargs) -> AsyncIterator[Dict[str, Any]]:
         """
-        Generate responses for multiple prompts
+        Generate responses for multiple prompts, yielding each result as it completes
         
         Args:
             prompts: List of prompts
             model: Model to use
+            max_concurrency: Maximum prompts in flight (defaults to max_concurrent_requests)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Result records ({'index', 'success', 'response', 'error', 'error_type', 'execution_time'})
+            in completion order
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.max_concurrent_requests))
+        tasks = [
+            asyncio.ensure_future(self._abatch_item(index, prompt, model, semaphore, **kwargs))
+            for index, prompt in enumerate(prompts)
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Consumer stopped early or was cancelled
+            for task in tasks:
+                task.cancel()
+    
+    async def abatch_generate(self, prompts: list, model: str = None, max_concurrency: int = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Generate responses for multiple prompts concurrently
+        
+        Args:
+            prompts: List of prompts
+            model: Model to use
+            max_concurrency: Maximum prompts in flight (defaults to max_concurrent_requests)
             **kwargs: Additional parameters
             
         Returns:
-            List of responses
+            List of result records in input order
+        """
+        results = [None] * len(prompts)
+        async for result in self.abatch_generate_iter(prompts, model, max_concurrency, **kwargs):
+            results[result['index']] = result
+        return results
+    
+    def batch_generate(self, prompts: list, model: str = None, max_concurrency: int = None, **kwargs) -> List[Dict[str, Any]]:
         """
-        responses = []
+        Generate responses for multiple prompts (blocking wrapper around abatch_generate)
         
-        for prompt in prompts:
-            try:
-                response = self.generate_response(prompt, model, **kwargs)
-                responses.append(response)
-            except Exception as e:
-                self.logger.error(f"Error in batch generation for prompt: {str(e)}")
-                responses.append(f"Error: {str(e)}")
+        Args:
+            prompts: List of prompts
+            model: Model to use
+            max_concurrency: Maximum prompts in flight (defaults to max_concurrent_requests)
+            **kwargs: Additional parameters
+            
+        Returns:
+            List of result records in input order; failed slots have success=False
+            and carry the error instead of a response
+        """
+        return self._run_sync(self.abatch_generate(prompts, model, max_concurrency, **kwargs))
+    
+    async def agenerate_packed(self, items: List[Any], instruction: str, output_schema: Dict[str, Any],
+                               validator: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                               max_items: int = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Apply one small instruction (classify, score, tag, ...) to many items
+        using few model calls
+        
+        Items are packed into prompts that return indexed JSON results; items a
+        packed call loses or answers invalidly are retried individually.
+        
+        Args:
+            items: Items to process (strings as-is, anything else as compact JSON)
+            instruction: What to do with each item
+            output_schema: Example result object; every key is required in each result
+            validator: Optional extra check per result
+            max_items: Items per packed call (defaults to packing_max_items)
+            **kwargs: Generation parameters (temperature, task, latency_tier, ...)
+            
+        Returns:
+            One record per item in input order with 'success' and either 'data'
+            and 'packed' or 'error'
+        """
+        kwargs.setdefault('temperature', 0.2)
+        return await self.prompt_packer.run(items, instruction, output_schema, validator, max_items, **kwargs)
+    
+    def generate_packed(self, items: List[Any], instruction: str, output_schema: Dict[str, Any],
+                        validator: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                        max_items: int = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Blocking wrapper around agenerate_packed
         
-        return responses
+        Args:
+            items: Items to process
+            instruction: What to do with each item
+            output_schema: Example result object; every key is required in each result
+            validator: Optional extra check per result
+            max_items: Items per packed call
+            **kwargs: Generation parameters
+            
+        Returns:
+            One record per item in input order
+        """
+        return self._run_sync(self.agenerate_packed(items, instruction, output_schema, validator, max_items, **kwargs))
+    
+    def _known_models(self) -> List[str]:
+        """Default, fallback and every routed model, in first-seen order"""
+        models = [self.default_model, self.fallback_model]
+        if self.router:
+            for candidates in self.router.routes.values():
+                models.extend(candidates)
+        return list(dict.fromkeys(models))
     
     def get_usage_stats(self) -> Dict[str, Any]:
         """
-        Get usage statistics (placeholder for future implementation)
+        Get usage statistics
         
         Returns:
-            Dictionary with usage stats
+            Dictionary with usage stats; 'by_model' and 'by_agent' carry request
+            and error counts, latency percentiles, tokens, cache hits and fallbacks
         """
+        rate_limits = self.rate_limiter.get_usage() if self.rate_limiter else {}
+        metrics = self.metrics.snapshot()
+        totals = metrics['totals']
+        
         return {
-            "requests_made": "Not available",
-            "tokens_used": "Not available",
-            "rate_limit_remaining": "Not available",
-            "last_request_time": "Not available"
+            "requests_made": totals['requests'],
+            "errors": totals['errors'],
+            "tokens_used": {
+                "prompt_tokens": totals['prompt_tokens'],
+                "completion_tokens": totals['completion_tokens']
+            },
+            "token_estimator": self.token_estimator.name,
+            "rate_limit_remaining": {
+                model: max(usage['rate_limit_rpm'] - usage['requests_last_minute'], 0)
+                for model, usage in rate_limits.items()
+            } if self.rate_limiter else "Not available",
+            "rate_limits": rate_limits,
+            "last_request_time": totals['last_request_time'] or "Never",
+            "by_model": metrics['by_model'],
+            "by_agent": metrics['by_agent'],
+            "cache": self.response_cache.get_stats() if self.response_cache else {"enabled": False},
+            "coalescing": self.single_flight.get_stats(),
+            "event_loop": self.loop_runner.get_stats(),
+            "images": self.image_preprocessor.get_stats(),
+            "packing": self.prompt_packer.get_stats(),
+            "shared_context": self.context_store.get_stats(),
+            "similarity_cache": self.similarity_cache.get_stats() if self.similarity_cache else {"enabled": False},
+            "routing": self.router.get_stats() if self.router else {"enabled": False},
+            "resilience": {
+                **self._get_resilience_counters(),
+                "circuits": {
+                    model: self._get_breaker(model).get_state()
+                    for model in self._known_models()
+                }
+            }
         }
@@ -0,0 +1,146 @@
+import time
+import logging
+import threading
+from typing import Dict, Any
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the model's circuit is open"""
+    pass
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker
+
+    closed:    calls flow; consecutive failures are counted
+    open:      calls are rejected until recovery_timeout has passed
+    half_open: a single trial call is let through; success closes the
+               circuit, failure re-opens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {
+            'successes': 0,
+            'failures': 0,
+            'rejected': 0,
+            'times_opened': 0
+        }
+
+    def _recovery_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.recovery_timeout
+
+    def allow_request(self) -> bool:
+        """
+        Ask permission for one call; half-open circuits admit a single trial
+
+        Returns:
+            True if the call may proceed
+        """
+        with self._lock:
+            if self._state == self.OPEN and self._recovery_due():
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+                self.logger.info(f"Circuit for {self.name} is half-open, allowing a trial request")
+
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            self._stats['rejected'] += 1
+            return False
+
+    def is_available(self) -> bool:
+        """Check, without claiming a trial slot, whether a call would be admitted"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                return self._recovery_due()
+            return not self._trial_in_flight
+
+    def release_trial(self):
+        """Give back a half-open trial slot when the call never reached the model"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                self.logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            self._stats['successes'] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._stats['failures'] += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats['times_opened'] += 1
+                    self.logger.warning(
+                        f"Circuit for {self.name} opened after {self._consecutive_failures} consecutive failures"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._recovery_due():
+                return self.HALF_OPEN
+            return self._state
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters
+
+        Returns:
+            Dictionary with state, consecutive failures and counters
+        """
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                **self._stats
+            }
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a model, creating it on first use
+
+    Args:
+        name: Model name
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds an open circuit waits before a trial call
+
+    Returns:
+        Shared CircuitBreaker
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, failure_threshold, recovery_timeout)
+            _breakers[name] = breaker
+        return breaker
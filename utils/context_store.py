@@ -0,0 +1,174 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+# Every shared prefix opens with this marker and its digest, so a prompt's
+# prefix can be recognized without scanning it
+PREFIX_MARKER = "[shared context "
+PREFIX_END = "[end shared context]"
+
+def canonical_json(content: Any) -> str:
+    """Compact JSON with sorted keys, so equal content always renders identically"""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':'), sort_keys=True, default=str)
+
+@dataclass
+class SharedContext:
+    """A project's context block, rendered once as a stable prompt prefix"""
+    project_key: str
+    name: str
+    digest: str
+    prefix: str
+    tokens: int
+
+    @property
+    def reference(self) -> str:
+        """Text that points the model at the prefix instead of repeating it"""
+        return f"(see the shared {self.name} at the top of this prompt)"
+
+class ContextStore:
+    """
+    Per-project store of shared prompt context
+
+    Content such as a parsed brief is serialized canonically once per change
+    and rendered as a prefix that agents put at the very start of their
+    prompts. Identical prefixes let the provider's prefix / context cache
+    serve those tokens; the store also measures how often each prefix is
+    re-sent to each model, which is the reuse such a cache can capture.
+    """
+
+    def __init__(self, estimate_tokens=None, max_projects: int = 256, reuse_window: int = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.estimate_tokens = estimate_tokens or (lambda text: max(1, len(text) // 4))
+        self.max_projects = max(1, max_projects)
+        self.reuse_window = reuse_window
+
+        self._contexts = OrderedDict()  # (project_key, name) -> SharedContext
+        self._by_digest = {}  # digest -> SharedContext
+        self._last_sent = {}  # (digest, model) -> monotonic time of the last send
+        self._lock = threading.Lock()
+        self._stats = {
+            'uses': 0,
+            'reuses': 0,
+            'prefix_tokens_sent': 0,
+            'prefix_tokens_reused': 0,
+            'provider_cached_uses': 0
+        }
+
+    @staticmethod
+    def project_key_for(content: Any) -> str:
+        """Project identity from an id/title in the content, else its digest"""
+        if isinstance(content, dict):
+            for field in ('project_id', 'id', 'project_title', 'project_name'):
+                if content.get(field):
+                    return str(content[field])
+        return hashlib.sha256(canonical_json(content).encode('utf-8')).hexdigest()[:16]
+
+    def put(self, name: str, content: Any, project_key: str = None) -> SharedContext:
+        """
+        Register (or refresh) a project's shared context
+
+        Args:
+            name: What the content is ('project brief', ...)
+            content: Content to share
+            project_key: Project identity; derived from the content if omitted
+
+        Returns:
+            SharedContext whose prefix is identical for identical content
+        """
+        project_key = project_key or self.project_key_for(content)
+        body = canonical_json(content)
+        digest = hashlib.sha256(f"{name}\n{body}".encode('utf-8')).hexdigest()[:16]
+
+        with self._lock:
+            existing = self._contexts.get((project_key, name))
+            if existing is not None and existing.digest == digest:
+                self._contexts.move_to_end((project_key, name))
+                return existing
+
+        prefix = f"{PREFIX_MARKER}{digest}]\nShared {name}:\n{body}\n{PREFIX_END}\n"
+        shared = SharedContext(project_key, name, digest, prefix, self.estimate_tokens(prefix))
+
+        with self._lock:
+            replaced = self._contexts.pop((project_key, name), None)
+            if replaced is not None:
+                self._by_digest.pop(replaced.digest, None)
+            self._contexts[(project_key, name)] = shared
+            self._by_digest[digest] = shared
+            while len(self._contexts) > self.max_projects:
+                _, evicted = self._contexts.popitem(last=False)
+                self._by_digest.pop(evicted.digest, None)
+        return shared
+
+    def match(self, prompt: str) -> Optional[SharedContext]:
+        """
+        Find the registered shared context a prompt starts with
+
+        Args:
+            prompt: Full prompt text
+
+        Returns:
+            SharedContext or None
+        """
+        if not prompt.startswith(PREFIX_MARKER):
+            return None
+        digest = prompt[len(PREFIX_MARKER):prompt.find("]", len(PREFIX_MARKER))]
+        with self._lock:
+            shared = self._by_digest.get(digest)
+        return shared if shared is not None and prompt.startswith(shared.prefix) else None
+
+    def record_use(self, shared: SharedContext, model_name: str, provider_cached: bool = False):
+        """
+        Record one call that carried a shared prefix
+
+        Args:
+            shared: The prefix sent
+            model_name: Model it was sent to
+            provider_cached: Whether the provider's context cache served it
+        """
+        now = time.monotonic()
+        with self._lock:
+            last_sent = self._last_sent.get((shared.digest, model_name))
+            self._last_sent[(shared.digest, model_name)] = now
+            self._stats['uses'] += 1
+            self._stats['prefix_tokens_sent'] += shared.tokens
+            if provider_cached:
+                self._stats['provider_cached_uses'] += 1
+            if last_sent is not None and now - last_sent <= self.reuse_window:
+                self._stats['reuses'] += 1
+                self._stats['prefix_tokens_reused'] += shared.tokens
+
+            if len(self._last_sent) > self.max_projects * 16:
+                cutoff = now - self.reuse_window
+                self._last_sent = {key: sent for key, sent in self._last_sent.items() if sent >= cutoff}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get prefix reuse statistics
+
+        Returns:
+            Dictionary with stored contexts, uses, reuses and the share of
+            prefix tokens that repeated within the reuse window
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['contexts'] = len(self._contexts)
+        stats['reuse_rate'] = round(stats['reuses'] / stats['uses'], 3) if stats['uses'] else None
+        return stats
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def get_context_store(estimate_tokens=None) -> ContextStore:
+    """Get the process-wide context store shared by every agent"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ContextStore(estimate_tokens)
+        return _shared_store
@@ -0,0 +1,201 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+
+class HealthMonitor:
+    """
+    Cached, mostly passive health status for the AI service
+
+    Real traffic reports its outcomes, so a service that answered recently
+    is healthy without any extra call. Only when there has been no traffic
+    for a while is the cheap probe run, either on the background interval
+    or (once the cached result expires) on a helper thread while callers
+    keep getting the last known status.
+    """
+
+    def __init__(self, name: str, probe: Callable[[], bool], ttl: float = 60.0,
+                 probe_interval: float = 300.0, failure_threshold: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.probe = probe
+        self.ttl = ttl
+        self.probe_interval = probe_interval
+        self.failure_threshold = max(1, failure_threshold)
+
+        self._lock = threading.Lock()
+        self._healthy = None          # last known status, None until first check
+        self._checked_at = 0.0        # monotonic time of the last status update
+        self._source = None           # 'traffic' or 'probe'
+        self._last_success_at = None
+        self._last_failure_at = None
+        self._consecutive_failures = 0
+        self._last_error = None
+        self._probe_running = False
+        self._stats = {
+            'probes': 0,
+            'probe_failures': 0,
+            'cached_reads': 0
+        }
+
+        self._probe_thread = None
+        self._stop = threading.Event()
+
+    def report(self, success: bool, error: BaseException = None):
+        """
+        Record the outcome of a real call
+
+        Args:
+            success: Whether the call succeeded
+            error: Exception for failed calls
+        """
+        now = time.monotonic()
+        with self._lock:
+            if success:
+                self._consecutive_failures = 0
+                self._last_success_at = now
+                self._set_status(True, 'traffic', now)
+            else:
+                self._consecutive_failures += 1
+                self._last_failure_at = now
+                self._last_error = str(error) if error else None
+                if self._consecutive_failures >= self.failure_threshold:
+                    self._set_status(False, 'traffic', now)
+
+    def _set_status(self, healthy: bool, source: str, now: float):
+        """Update cached status; caller holds the lock"""
+        if self._healthy is not None and healthy != self._healthy:
+            level = logging.INFO if healthy else logging.WARNING
+            self.logger.log(level, f"AI service {self.name} is now {'healthy' if healthy else 'unhealthy'} ({source})")
+        self._healthy = healthy
+        self._checked_at = now
+        self._source = source
+
+    def _run_probe(self) -> bool:
+        try:
+            healthy = bool(self.probe())
+            error = None
+        except Exception as e:
+            healthy = False
+            error = str(e)
+
+        with self._lock:
+            self._stats['probes'] += 1
+            if not healthy:
+                self._stats['probe_failures'] += 1
+                self._last_error = error or self._last_error
+            self._set_status(healthy, 'probe', time.monotonic())
+            self._probe_running = False
+        return healthy
+
+    def _probe_in_background(self):
+        """Refresh a stale status without making the caller wait"""
+        with self._lock:
+            if self._probe_running:
+                return
+            self._probe_running = True
+        threading.Thread(target=self._run_probe, name=f"health-probe-{self.name}", daemon=True).start()
+
+    def is_healthy(self, force: bool = False) -> bool:
+        """
+        Get the cached health status
+
+        Args:
+            force: Run the probe now and wait for its result
+
+        Returns:
+            True if the service is considered healthy
+        """
+        with self._lock:
+            known = self._healthy
+            stale = time.monotonic() - self._checked_at >= self.ttl
+            if known is not None and not force:
+                self._stats['cached_reads'] += 1
+
+        if force or known is None:
+            # Nothing known yet: the first caller pays for one cheap probe
+            with self._lock:
+                self._probe_running = True
+            return self._run_probe()
+
+        if stale:
+            self._probe_in_background()
+        return known
+
+    def start(self) -> bool:
+        """
+        Start probing every probe_interval seconds on a daemon thread; probes
+        are skipped while real traffic keeps the status fresh
+
+        Returns:
+            True if this call started the prober
+        """
+        if self.probe_interval <= 0:
+            return False
+        with self._lock:
+            if self._probe_thread is not None:
+                return False
+
+            def run():
+                while not self._stop.wait(self.probe_interval):
+                    with self._lock:
+                        if self._probe_running or time.monotonic() - self._checked_at < self.probe_interval:
+                            continue
+                        self._probe_running = True
+                    self._run_probe()
+
+            self._probe_thread = threading.Thread(target=run, name=f"health-monitor-{self.name}", daemon=True)
+            self._probe_thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get cached status details without triggering a probe
+
+        Returns:
+            Dictionary with status, its source and age, and recent outcomes
+        """
+        def seconds_ago(stamp: Optional[float]) -> Optional[float]:
+            return round(now - stamp, 1) if stamp else None
+
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'healthy': self._healthy,
+                'source': self._source,
+                'age_seconds': seconds_ago(self._checked_at) if self._healthy is not None else None,
+                'last_success_seconds_ago': seconds_ago(self._last_success_at),
+                'last_failure_seconds_ago': seconds_ago(self._last_failure_at),
+                'consecutive_failures': self._consecutive_failures,
+                'last_error': self._last_error,
+                **self._stats
+            }
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+def get_health_monitor(name: str, probe: Callable[[], bool], ttl: float = 60.0,
+                       probe_interval: float = 300.0) -> HealthMonitor:
+    """
+    Get the process-wide health monitor for a model, creating and starting
+    it on first use
+
+    Args:
+        name: Model name
+        probe: Cheap callable returning True when the service is reachable
+        ttl: Seconds a status is served before it is refreshed
+        probe_interval: Seconds between background probes (0 disables them)
+
+    Returns:
+        Shared HealthMonitor
+    """
+    with _monitors_lock:
+        monitor = _monitors.get(name)
+        if monitor is None:
+            monitor = HealthMonitor(name, probe, ttl, probe_interval)
+            monitor.start()
+            _monitors[name] = monitor
+        return monitor
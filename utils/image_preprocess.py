@@ -0,0 +1,157 @@
+import io
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+
+@dataclass
+class PreparedImage:
+    """A downsized, metadata-free image ready to upload"""
+    content_hash: str
+    mime_type: str
+    data: bytes
+    original_size: Tuple[int, int]
+    size: Tuple[int, int]
+    original_bytes: int
+
+    def as_part(self) -> Dict[str, Any]:
+        """Inline blob content part accepted by generate_content"""
+        return {'mime_type': self.mime_type, 'data': self.data}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'content_hash': self.content_hash,
+            'mime_type': self.mime_type,
+            'original_size': list(self.original_size),
+            'size': list(self.size),
+            'original_bytes': self.original_bytes,
+            'bytes': len(self.data)
+        }
+
+class ImagePreprocessor:
+    """
+    Downsizes images to a maximum edge, strips metadata and re-encodes them
+    compactly before upload
+
+    Opaque images become JPEG and images with transparency become WebP
+    (PNG if the WebP encoder is unavailable). Results are kept in a small
+    LRU keyed by the SHA-256 of the original bytes, so repeated assets are
+    decoded once.
+    """
+
+    def __init__(self, max_edge: int = 1536, quality: int = 85, cache_entries: int = 32):
+        self.logger = logging.getLogger(__name__)
+        self.max_edge = max(64, max_edge)
+        self.quality = min(95, max(30, quality))
+        self.cache_entries = max(0, cache_entries)
+
+        self._cache = OrderedDict()  # content hash -> PreparedImage
+        self._lock = threading.Lock()
+        self._stats = {'prepared': 0, 'cache_hits': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+    @property
+    def signature(self) -> str:
+        """Identifies the settings; a change means a different upload"""
+        return f"edge={self.max_edge},q={self.quality}"
+
+    @staticmethod
+    def content_hash(image_bytes: bytes) -> str:
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def prepare(self, image_bytes: bytes) -> PreparedImage:
+        """
+        Downsize, strip and re-encode an image
+
+        Args:
+            image_bytes: Original encoded image
+
+        Returns:
+            PreparedImage with the upload bytes and before/after sizes
+        """
+        content_hash = self.content_hash(image_bytes)
+        with self._lock:
+            prepared = self._cache.get(content_hash)
+            if prepared is not None:
+                self._cache.move_to_end(content_hash)
+                self._stats['cache_hits'] += 1
+                return prepared
+
+        prepared = self._encode(image_bytes, content_hash)
+
+        with self._lock:
+            self._stats['prepared'] += 1
+            self._stats['bytes_in'] += prepared.original_bytes
+            self._stats['bytes_out'] += len(prepared.data)
+            if self.cache_entries:
+                self._cache[content_hash] = prepared
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return prepared
+
+    def prepare_file(self, image_path: str) -> PreparedImage:
+        with open(image_path, "rb") as f:
+            return self.prepare(f.read())
+
+    def _encode(self, image_bytes: bytes, content_hash: str) -> PreparedImage:
+        from PIL import Image, ImageOps
+
+        image = Image.open(io.BytesIO(image_bytes))
+        original_size = image.size
+
+        # Decode at reduced scale where the codec supports it (JPEG), then
+        # bake in the EXIF orientation before the EXIF block is dropped
+        image.draft('RGB', (self.max_edge, self.max_edge))
+        image = ImageOps.exif_transpose(image)
+
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        if max(image.size) > self.max_edge:
+            resample = getattr(Image, 'Resampling', Image).LANCZOS
+            image.thumbnail((self.max_edge, self.max_edge), resample)
+
+        # Nothing from the source (EXIF, ICC, text chunks) is carried over
+        image.info = {}
+
+        output = io.BytesIO()
+        if has_alpha:
+            try:
+                image.save(output, format='WEBP', quality=self.quality, method=4)
+                mime_type = 'image/webp'
+            except (OSError, KeyError) as e:
+                self.logger.debug(f"WebP encoder unavailable, using PNG: {str(e)}")
+                output = io.BytesIO()
+                image.save(output, format='PNG', optimize=True)
+                mime_type = 'image/png'
+        else:
+            image.save(output, format='JPEG', quality=self.quality, optimize=True, progressive=True)
+            mime_type = 'image/jpeg'
+
+        return PreparedImage(
+            content_hash=content_hash,
+            mime_type=mime_type,
+            data=output.getvalue(),
+            original_size=original_size,
+            size=image.size,
+            original_bytes=len(image_bytes)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get preprocessing statistics
+
+        Returns:
+            Dictionary with counts, bytes before/after and the upload ratio
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached'] = len(self._cache)
+        stats['max_edge'] = self.max_edge
+        stats['upload_ratio'] = (
+            round(stats['bytes_out'] / stats['bytes_in'], 3) if stats['bytes_in'] else None
+        )
+        return stats
@@ -0,0 +1,93 @@
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import streamlit as st
+
+# Seconds between progress polls of a running job
+POLL_INTERVAL = 1.0
+
+# st.fragment (Streamlit >= 1.37) reruns only the progress panel; older
+# releases fall back to a short sleep and a full rerun
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+def start_job(state_key: str, agent_name: str, input_data: Dict[str, Any], **context) -> str:
+    """
+    Submit an agent run to the background job queue and remember it in session state
+
+    Args:
+        state_key: Session state key the page tracks its job under
+        agent_name: Agent to run
+        input_data: Input for the agent
+        **context: Extra values the page needs to render the result later
+
+    Returns:
+        Job id
+    """
+    job_id = st.session_state.orchestrator.submit_job(agent_name, input_data)
+    st.session_state[state_key] = {
+        'job_id': job_id,
+        'agent_name': agent_name,
+        'input_data': input_data,
+        'context': context,
+        'handled': False
+    }
+    return job_id
+
+def tracked_job(state_key: str) -> Optional[Dict[str, Any]]:
+    """The job a page is tracking (id, input_data and context), if any"""
+    return st.session_state.get(state_key)
+
+def clear_job(state_key: str):
+    """Stop tracking a page's job, e.g. to start another one"""
+    st.session_state.pop(state_key, None)
+
+def _show_progress(job_id: str):
+    orchestrator = st.session_state.orchestrator
+    if orchestrator.get_job_result(job_id) is not None:
+        st.rerun()  # finished: rerun the page so it renders the result
+
+    job = orchestrator.get_job_status(job_id)
+
+    col1, col2 = st.columns([5, 1])
+    with col1:
+        st.progress(job['progress'], text=job['progress_message'] or job['status'].title())
+    with col2:
+        if st.button("✖️ Cancel", key=f"cancel_job_{job_id}"):
+            orchestrator.cancel_job(job_id)
+            st.rerun()
+
+_poll_progress = _fragment(run_every=POLL_INTERVAL)(_show_progress) if _fragment is not None else None
+
+def job_result(state_key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Show the progress of a page's job, or return its result once it has finished
+
+    Never blocks on the job: while it is queued or running a progress panel
+    polls it every POLL_INTERVAL seconds and reruns the page when it is done.
+
+    Args:
+        state_key: Session state key passed to start_job
+
+    Returns:
+        (result, is_new): the agent's result dictionary, or None while the
+        job is active or when no job is tracked; is_new is True only on the
+        first rerun that sees the result, so one-off actions (saving, sending
+        notifications) run once
+    """
+    tracked = tracked_job(state_key)
+    if not tracked:
+        return None, False
+
+    result = st.session_state.orchestrator.get_job_result(tracked['job_id'])
+    if result is not None:
+        is_new = not tracked['handled']
+        tracked['handled'] = True
+        return result, is_new
+
+    if _poll_progress is not None:
+        _poll_progress(tracked['job_id'])
+    else:
+        _show_progress(tracked['job_id'])
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+    return None, False
@@ -0,0 +1,179 @@
+import re
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+# Opening markdown fence (optionally tagged json) up to the closing fence or,
+# for truncated output, the end of the text
+_FENCE = re.compile(r"```[ \t]*(?:json5?|JSON)?[ \t]*\r?\n?(.*?)(?:```|\Z)", re.DOTALL)
+
+# Characters that matter to the structural scanner; everything else is skipped
+_STRUCTURAL = re.compile(r'["\\{}\[\]]')
+
+# A complete JSON string literal
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+# Attempts at trimming a truncated tail back to the previous complete item
+MAX_TRUNCATION_CUTS = 8
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], List[str], bool]:
+    """
+    Single-pass scan for the end of the JSON value opening at start
+
+    Returns:
+        (end index or None if the text ran out, closers still open, whether
+        the text ended inside a string); a mismatched bracket ends the value
+        where it occurs
+    """
+    stack = []
+    in_string = False
+    skip_until = -1
+
+    for match in _STRUCTURAL.finditer(text, start):
+        index = match.start()
+        if index < skip_until:
+            continue
+        char = match.group()
+
+        if in_string:
+            if char == '\\':
+                skip_until = index + 2
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in '}]':
+            if not stack or stack[-1] != char:
+                return index, stack, False
+            stack.pop()
+            if not stack:
+                return index + 1, [], False
+
+    return None, stack, in_string
+
+def _remove_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket, leaving strings untouched"""
+    pieces = []
+    position = 0
+    for match in _STRING.finditer(text):
+        pieces.append(_TRAILING_COMMA.sub(r"\1", text[position:match.start()]))
+        pieces.append(match.group())
+        position = match.end()
+    pieces.append(_TRAILING_COMMA.sub(r"\1", text[position:]))
+    return ''.join(pieces)
+
+def _last_separator(text: str) -> int:
+    """Index of the last comma outside strings, or -1"""
+    last = -1
+    position = 0
+    for match in _STRING.finditer(text):
+        comma = text.rfind(',', position, match.start())
+        if comma != -1:
+            last = comma
+        position = match.end()
+    comma = text.rfind(',', position)
+    return comma if comma != -1 else last
+
+def _close_truncated(fragment: str) -> Optional[Any]:
+    """
+    Complete a truncated JSON fragment: close an open string, drop a dangling
+    comma, key or partial item, then append the missing closing brackets
+    """
+    for _ in range(MAX_TRUNCATION_CUTS):
+        _, stack, in_string = _scan(fragment, 0)
+        candidate = fragment
+        if in_string:
+            if candidate.endswith('\\'):
+                candidate = candidate[:-1]
+            candidate += '"'
+        candidate = candidate.rstrip()
+        candidate = candidate.rstrip(',:').rstrip()
+        candidate = _remove_trailing_commas(candidate + ''.join(reversed(stack)))
+
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            pass
+
+        # Give up the last (partial) item and try again
+        cut = _last_separator(fragment)
+        if cut <= 0:
+            return None
+        fragment = fragment[:cut]
+    return None
+
+def extract_json(text: str, prefer: str = '{') -> Dict[str, Any]:
+    """
+    Extract the first JSON value from model output
+
+    Strips markdown code fences and surrounding prose, locates the first
+    balanced object with a single linear scan, and repairs trailing commas
+    and truncated tails.
+
+    Args:
+        text: Raw model output
+        prefer: Opening character to look for first ('{' for objects, '[' for arrays)
+
+    Returns:
+        Dictionary with 'success', parsed 'data', the 'repairs' applied and 'error'
+    """
+    repairs = []
+
+    if not text or not text.strip():
+        return {'success': False, 'data': None, 'repairs': repairs, 'error': "Empty response"}
+
+    stripped = text.strip()
+    try:
+        return {'success': True, 'data': json.loads(stripped), 'repairs': repairs, 'error': None}
+    except json.JSONDecodeError:
+        pass
+
+    if '```' in stripped:
+        fence = _FENCE.search(stripped)
+        if fence:
+            stripped = fence.group(1).strip()
+            repairs.append('stripped_code_fence')
+
+    other = '[' if prefer == '{' else '{'
+    start = stripped.find(prefer)
+    if start == -1:
+        start = stripped.find(other)
+    if start == -1:
+        return {'success': False, 'data': None, 'repairs': repairs, 'error': "No JSON object found"}
+
+    end, stack, _ = _scan(stripped, start)
+
+    if end is not None and not stack:
+        span = stripped[start:end]
+        if start > 0 or stripped[end:].strip():
+            repairs.append('stripped_surrounding_text')
+        try:
+            return {'success': True, 'data': json.loads(span), 'repairs': repairs, 'error': None}
+        except json.JSONDecodeError as e:
+            cleaned = _remove_trailing_commas(span)
+            if cleaned != span:
+                try:
+                    data = json.loads(cleaned)
+                    repairs.append('removed_trailing_commas')
+                    return {'success': True, 'data': data, 'repairs': repairs, 'error': None}
+                except json.JSONDecodeError as cleaned_error:
+                    e = cleaned_error
+            return {'success': False, 'data': None, 'repairs': repairs, 'error': f"Invalid JSON: {str(e)}"}
+
+    if end is None:
+        if start > 0:
+            repairs.append('stripped_surrounding_text')
+        data = _close_truncated(stripped[start:])
+        if data is not None:
+            repairs.append('closed_truncated_json')
+            return {'success': True, 'data': data, 'repairs': repairs, 'error': None}
+        return {'success': False, 'data': None, 'repairs': repairs, 'error': "Truncated JSON could not be repaired"}
+
+    return {'success': False, 'data': None, 'repairs': repairs, 'error': "Mismatched brackets in JSON"}
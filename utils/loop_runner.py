@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Dict, Any, Optional, Coroutine
+
+class EventLoopRunner:
+    """
+    A persistent asyncio event loop on a dedicated daemon thread
+
+    Synchronous callers (Streamlit pages, sync facades) hand coroutines to
+    run_sync instead of calling asyncio.run, so the loop - and anything bound
+    to it, such as semaphores, queues and client sessions - lives across
+    calls instead of being created and torn down per call.
+    """
+
+    def __init__(self, name: str = "async-runner"):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'timeouts': 0, 'errors': 0}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The runner's event loop, started on first use"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        """Start the loop thread; caller holds the lock"""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        started.wait()
+        self._loop = loop
+        self.logger.debug(f"Event loop thread '{self.name}' started")
+
+    def in_runner_thread(self) -> bool:
+        """Whether the caller is running on the runner's own loop thread"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the runner loop without waiting for it
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            concurrent.futures.Future with its result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the runner loop and block until it finishes
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait; on expiry the coroutine is cancelled
+
+        Returns:
+            Coroutine result
+
+        Raises:
+            TimeoutError: If the timeout expired
+            RuntimeError: If called from the runner's own loop thread (await instead)
+        """
+        if self.in_runner_thread():
+            coro.close()
+            raise RuntimeError("run_sync called from the event loop runner's thread; await the coroutine instead")
+
+        future = self.submit(coro)
+        with self._lock:
+            self._stats['calls'] += 1
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise TimeoutError(f"Operation timed out after {timeout} seconds")
+        except Exception:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel pending tasks and stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None or loop.is_closed():
+            return
+
+        async def cancel_pending():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout)
+        except Exception as e:
+            self.logger.warning(f"Error cancelling pending tasks: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get runner statistics
+
+        Returns:
+            Dictionary with call, timeout and error counts and pending tasks
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            loop = self._loop
+        stats['running'] = loop is not None and loop.is_running()
+        stats['pending_tasks'] = len(asyncio.all_tasks(loop)) if stats['running'] else 0
+        return stats
+
+_shared_runner = None
+_shared_runner_lock = threading.Lock()
+
+def get_loop_runner() -> EventLoopRunner:
+    """Get the process-wide event loop runner used by every sync caller"""
+    global _shared_runner
+    with _shared_runner_lock:
+        if _shared_runner is None:
+            _shared_runner = EventLoopRunner()
+        return _shared_runner
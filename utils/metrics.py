@@ -0,0 +1,301 @@
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+# Name of the agent on whose behalf AI calls are being made
+current_agent = contextvars.ContextVar('ai_current_agent', default=None)
+
+# Token counters of the innermost usage_scope, if any
+current_usage = contextvars.ContextVar('ai_current_usage', default=None)
+
+UNATTRIBUTED = "unattributed"
+
+@contextmanager
+def agent_scope(agent_name: str):
+    """
+    Attribute AI calls made inside the block to an agent
+
+    Args:
+        agent_name: Calling agent name
+    """
+    token = current_agent.set(agent_name)
+    try:
+        yield
+    finally:
+        try:
+            current_agent.reset(token)
+        except ValueError:
+            # Generator finalized from a different context; nothing to restore
+            pass
+
+@contextmanager
+def usage_scope():
+    """
+    Count the AI calls and tokens spent inside the block
+
+    Calls made by tasks and threads started inside the block are included,
+    since they inherit the context.
+
+    Yields:
+        Dictionary with 'requests', 'prompt_tokens' and 'completion_tokens',
+        updated as calls complete
+    """
+    usage = {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+    token = current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        try:
+            current_usage.reset(token)
+        except ValueError:
+            pass
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles"""
+
+    BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2000, 3000, 5000, 8000, 13000, 20000, 30000, 60000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float):
+        self.counts[bisect_left(self.BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Approximate percentile (0-1) in milliseconds, None if empty"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.BUCKETS_MS[index - 1] if index > 0 else 0.0
+                upper = self.BUCKETS_MS[index] if index < len(self.BUCKETS_MS) else self.max_ms
+                position = (rank - cumulative) / bucket_count
+                return round(min(lower + (upper - lower) * position, self.max_ms), 1)
+            cumulative += bucket_count
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'avg_ms': round(self.sum_ms / self.count, 1) if self.count else None,
+            'max_ms': round(self.max_ms, 1) if self.count else None
+        }
+
+class _UsageStats:
+    """Counters for one model or agent"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.error_types = defaultdict(int)
+        self.latency = LatencyHistogram()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.last_request_time = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'error_types': dict(self.error_types),
+            'latency': self.latency.to_dict(),
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cache_hits': self.cache_hits,
+            'fallbacks': self.fallbacks,
+            'last_request_time': self.last_request_time.isoformat() if self.last_request_time else None
+        }
+
+class AIMetrics:
+    """
+    Thread-safe, process-wide usage telemetry for AI calls
+
+    Records per model and per calling agent; cumulative totals back the
+    snapshot API while a separate window is flushed periodically to a sink
+    (normally the database) and reset.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._started_at = datetime.now()
+        self._by_model = defaultdict(_UsageStats)
+        self._by_agent = defaultdict(_UsageStats)
+        self._window_by_model = defaultdict(_UsageStats)
+        self._window_by_agent = defaultdict(_UsageStats)
+        self._window_started_at = datetime.now()
+
+        self._flush_thread = None
+        self._flush_stop = threading.Event()
+
+    def _targets(self, model: str, agent: Optional[str]) -> List[_UsageStats]:
+        """Stats objects to update for one event; caller holds the lock"""
+        agent = agent or current_agent.get() or UNATTRIBUTED
+        return [
+            self._by_model[model],
+            self._by_agent[agent],
+            self._window_by_model[model],
+            self._window_by_agent[agent]
+        ]
+
+    def record_request(self, model: str, latency_ms: float, prompt_tokens: int = 0,
+                       completion_tokens: int = 0, error: BaseException = None, agent: str = None):
+        """
+        Record one model call
+
+        Args:
+            model: Model name
+            latency_ms: Call latency in milliseconds
+            prompt_tokens: Prompt tokens consumed
+            completion_tokens: Completion tokens produced
+            error: Exception if the call failed
+            agent: Calling agent (defaults to the current agent_scope)
+        """
+        now = datetime.now()
+        with self._lock:
+            for stats in self._targets(model, agent):
+                stats.requests += 1
+                stats.latency.observe(latency_ms)
+                stats.prompt_tokens += prompt_tokens
+                stats.completion_tokens += completion_tokens
+                stats.last_request_time = now
+                if error is not None:
+                    stats.errors += 1
+                    stats.error_types[type(error).__name__] += 1
+            usage = current_usage.get()
+            if usage is not None:
+                usage['requests'] += 1
+                usage['prompt_tokens'] += prompt_tokens
+                usage['completion_tokens'] += completion_tokens
+
+    def record_cache_hit(self, model: str, agent: str = None):
+        with self._lock:
+            for stats in self._targets(model, agent):
+                stats.cache_hits += 1
+
+    def record_fallback(self, model: str, agent: str = None):
+        """Record that a call on the given (primary) model fell back"""
+        with self._lock:
+            for stats in self._targets(model, agent):
+                stats.fallbacks += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get cumulative metrics since process start
+
+        Returns:
+            Dictionary with 'totals', 'by_model' and 'by_agent'
+        """
+        with self._lock:
+            by_model = {name: stats.to_dict() for name, stats in self._by_model.items()}
+            by_agent = {name: stats.to_dict() for name, stats in self._by_agent.items()}
+
+        last_times = [stats['last_request_time'] for stats in by_model.values() if stats['last_request_time']]
+        totals = {
+            'requests': sum(stats['requests'] for stats in by_model.values()),
+            'errors': sum(stats['errors'] for stats in by_model.values()),
+            'prompt_tokens': sum(stats['prompt_tokens'] for stats in by_model.values()),
+            'completion_tokens': sum(stats['completion_tokens'] for stats in by_model.values()),
+            'cache_hits': sum(stats['cache_hits'] for stats in by_model.values()),
+            'fallbacks': sum(stats['fallbacks'] for stats in by_model.values()),
+            'last_request_time': max(last_times) if last_times else None
+        }
+
+        return {
+            'started_at': self._started_at.isoformat(),
+            'totals': totals,
+            'by_model': by_model,
+            'by_agent': by_agent
+        }
+
+    def flush(self, sink: Callable[[List[Dict[str, Any]]], Any]) -> int:
+        """
+        Hand the current window to a sink as rows and start a new window
+
+        Args:
+            sink: Callable receiving a list of row dictionaries
+
+        Returns:
+            Number of rows flushed
+        """
+        with self._lock:
+            window_by_model, self._window_by_model = self._window_by_model, defaultdict(_UsageStats)
+            window_by_agent, self._window_by_agent = self._window_by_agent, defaultdict(_UsageStats)
+            window_start, self._window_started_at = self._window_started_at, datetime.now()
+
+        window_end = datetime.now()
+        rows = []
+        for scope, window in (('model', window_by_model), ('agent', window_by_agent)):
+            for name, stats in window.items():
+                rows.append({
+                    'scope': scope,
+                    'name': name,
+                    'window_start': window_start,
+                    'window_end': window_end,
+                    **stats.to_dict()
+                })
+
+        if rows:
+            try:
+                sink(rows)
+            except Exception as e:
+                self.logger.warning(f"Failed to flush AI metrics: {str(e)}")
+        return len(rows)
+
+    def start_periodic_flush(self, sink: Callable[[List[Dict[str, Any]]], Any], interval: float) -> bool:
+        """
+        Flush to the sink every interval seconds on a daemon thread; only the
+        first caller in the process starts the flusher
+
+        Args:
+            sink: Callable receiving a list of row dictionaries
+            interval: Seconds between flushes
+
+        Returns:
+            True if this call started the flusher
+        """
+        if interval <= 0:
+            return False
+        with self._lock:
+            if self._flush_thread is not None:
+                return False
+
+            def run():
+                while not self._flush_stop.wait(interval):
+                    self.flush(sink)
+
+            self._flush_thread = threading.Thread(target=run, name="ai-metrics-flush", daemon=True)
+            self._flush_thread.start()
+        self.logger.info(f"AI metrics flushing every {interval}s")
+        return True
+
+    def stop_periodic_flush(self):
+        self._flush_stop.set()
+
+_shared_metrics = None
+_shared_metrics_lock = threading.Lock()
+
+def get_ai_metrics() -> AIMetrics:
+    """Get the process-wide AI metrics collector"""
+    global _shared_metrics
+    with _shared_metrics_lock:
+        if _shared_metrics is None:
+            _shared_metrics = AIMetrics()
+        return _shared_metrics
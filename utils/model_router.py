@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import deque, Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable
+
+@dataclass
+class RouteDecision:
+    """Which model a call was routed to, and why"""
+    model: str
+    fallback: Optional[str]
+    tier: str
+    reason: str
+    prompt_tokens: int = 0
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'fallback': self.fallback,
+            'tier': self.tier,
+            'reason': self.reason,
+            'prompt_tokens': self.prompt_tokens,
+            'skipped': dict(self.skipped)
+        }
+
+class ModelRouter:
+    """
+    Chooses a model per call from a tier's ordered candidate list
+
+    The tier comes from the caller (an agent's declared latency_tier or a
+    cheap task type) or, when unspecified, from the prompt size. The first
+    candidate that fits the prompt, has a closed circuit, has rate-limit
+    headroom and whose observed p95 latency is within the tier's budget
+    wins; the fallback is the next usable candidate from the same tier, so
+    a fast-tier call is never redirected to a slow model.
+    """
+
+    TIERS = ("fast", "standard", "quality", "vision")
+
+    # Task types that are always served from the fast tier
+    CHEAP_TASKS = ("classification", "extraction", "tagging", "sentiment", "routing")
+
+    def __init__(self, routes: Dict[str, List[str]], latency_budgets: Dict[str, float],
+                 small_prompt_tokens: int,
+                 limits_fn: Callable[[str], Dict[str, Any]],
+                 available_fn: Callable[[str], bool],
+                 headroom_fn: Callable[[str, int], bool],
+                 p95_fn: Callable[[str], Optional[float]]):
+        self.logger = logging.getLogger(__name__)
+        self.routes = {tier: models for tier, models in routes.items() if models}
+        self.latency_budgets = latency_budgets
+        self.small_prompt_tokens = small_prompt_tokens
+        self._limits_fn = limits_fn
+        self._available_fn = available_fn
+        self._headroom_fn = headroom_fn
+        self._p95_fn = p95_fn
+
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=100)
+        self._counts = Counter()
+
+    def resolve_tier(self, prompt_tokens: int, tier: Optional[str] = None, task: Optional[str] = None) -> str:
+        if task in self.CHEAP_TASKS:
+            return "fast"
+        if tier in self.routes:
+            return tier
+        return "fast" if prompt_tokens <= self.small_prompt_tokens else "standard"
+
+    def _rejection(self, model: str, prompt_tokens: int, tier: str) -> Optional[str]:
+        """Why a candidate can't take the call right now, or None if it can"""
+        max_input = self._limits_fn(model).get('max_input_tokens')
+        if max_input and prompt_tokens > max_input:
+            return f"prompt of {prompt_tokens} tokens exceeds {max_input}"
+        if not self._available_fn(model):
+            return "circuit open"
+        if not self._headroom_fn(model, prompt_tokens):
+            return "no rate-limit headroom"
+        budget = self.latency_budgets.get(tier)
+        p95 = self._p95_fn(model)
+        if budget and p95 is not None and p95 > budget:
+            return f"p95 {p95:.1f}s over {tier} budget {budget:.1f}s"
+        return None
+
+    def route(self, prompt_tokens: int, tier: Optional[str] = None, task: Optional[str] = None) -> RouteDecision:
+        """
+        Choose a model and fallback for one call
+
+        Args:
+            prompt_tokens: Estimated prompt tokens
+            tier: Declared latency tier ('fast', 'standard', 'quality', 'vision')
+            task: Optional task type; cheap tasks are pinned to the fast tier
+
+        Returns:
+            RouteDecision with the chosen model, fallback and reason
+        """
+        resolved = self.resolve_tier(prompt_tokens, tier, task)
+        candidates = self.routes.get(resolved) or self.routes.get("standard", [])
+
+        skipped = {}
+        usable = []
+        for model in candidates:
+            rejection = self._rejection(model, prompt_tokens, resolved)
+            if rejection:
+                skipped[model] = rejection
+            else:
+                usable.append(model)
+
+        if usable:
+            model = usable[0]
+            if skipped:
+                reason = f"{resolved} tier; skipped {', '.join(f'{m} ({why})' for m, why in skipped.items())}"
+            elif task in self.CHEAP_TASKS:
+                reason = f"{task} task pinned to fast tier"
+            elif tier in self.routes:
+                reason = f"declared {resolved} tier"
+            else:
+                reason = f"{prompt_tokens}-token prompt -> {resolved} tier"
+            fallback = usable[1] if len(usable) > 1 else None
+        else:
+            # Nothing is usable right now; take the preferred model and let
+            # the rate limiter / circuit breaker decide
+            model = candidates[0]
+            reason = (f"{resolved} tier; no candidate usable "
+                      f"({', '.join(f'{m}: {why}' for m, why in skipped.items())}), using preferred model")
+            fallback = None
+
+        decision = RouteDecision(model, fallback, resolved, reason, prompt_tokens, skipped)
+        with self._lock:
+            self._recent.append(decision)
+            self._counts[(resolved, model)] += 1
+        self.logger.debug(f"Routed {prompt_tokens}-token call to {model}: {reason}")
+        return decision
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get routing counts and recent decisions
+
+        Returns:
+            Dictionary with configured routes, per tier/model counts and the
+            last few decisions
+        """
+        with self._lock:
+            counts = {f"{tier}:{model}": count for (tier, model), count in self._counts.items()}
+            recent = [decision.to_dict() for decision in list(self._recent)[-10:]]
+        return {
+            'routes': self.routes,
+            'counts': counts,
+            'recent': recent
+        }
+
+def parse_routes(spec: str) -> List[str]:
+    """Parse a comma-separated model list"""
+    return [model.strip() for model in (spec or "").split(",") if model.strip()]
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+from utils.json_extract import extract_json
+from utils.token_budget import render_compact
+
+def build_packed_prompt(instruction: str, item_texts: List[str], output_schema: Dict[str, Any]) -> str:
+    """Prompt asking for one indexed JSON result per item"""
+    items_block = "\n".join(f"[{index}] {text}" for index, text in enumerate(item_texts))
+    result_shape = render_compact({'index': 'Item number from the list', **output_schema})
+    return f"""{instruction}
+
+Apply this to each of the {len(item_texts)} numbered items below independently.
+
+Items:
+{items_block}
+
+Respond with JSON of the form {{"results": [...]}} containing exactly one object per item, in item order, shaped like:
+{result_shape}"""
+
+def build_single_prompt(instruction: str, item_text: str, output_schema: Dict[str, Any]) -> str:
+    """Prompt for one item on its own, used to retry items a packed call lost"""
+    return f"""{instruction}
+
+Item:
+{item_text}
+
+Respond with a single JSON object shaped like:
+{render_compact(output_schema)}"""
+
+def _is_valid(result: Any, output_schema: Dict[str, Any],
+              validator: Optional[Callable[[Dict[str, Any]], bool]]) -> bool:
+    if not isinstance(result, dict) or any(key not in result for key in output_schema):
+        return False
+    try:
+        return validator(result) if validator else True
+    except Exception:
+        return False
+
+def split_packed_response(text: str, count: int, output_schema: Dict[str, Any],
+                          validator: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Split a packed response into per-item results
+
+    Args:
+        text: Raw model output
+        count: Number of items in the pack
+        output_schema: Expected keys of each result
+        validator: Optional extra check per result
+
+    Returns:
+        Dictionary of item index to result for every item that came back
+        valid; missing, duplicated-later and invalid items are left out.
+        Entries are matched by position only when none carries an index;
+        in a response that mixes the two, unindexed entries are dropped
+        rather than guessed.
+    """
+    parsed = extract_json(text)
+    if not parsed['success']:
+        return {}
+
+    data = parsed['data']
+    entries = data.get('results') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return {}
+
+    indexed = any(isinstance(entry, dict) and 'index' in entry for entry in entries)
+
+    results = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict) or (indexed and 'index' not in entry):
+            continue
+        index = entry.get('index', position)
+        try:
+            index = int(index)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < count or index in results:
+            continue
+        result = {key: value for key, value in entry.items() if key != 'index'}
+        if _is_valid(result, output_schema, validator):
+            results[index] = result
+    return results
+
+class PromptPacker:
+    """
+    Packs many small homogeneous requests into few model calls
+
+    Items are grouped into packs bounded by item count and estimated prompt
+    tokens; each pack is one call returning indexed JSON results. Items whose
+    result is missing from a pack response or fails validation are retried
+    one at a time. Items of a pack whose call failed outright (after the
+    generate function's own retries) fail with its error rather than being
+    retried individually, which would multiply the request rate during a
+    rate limit or outage.
+    """
+
+    def __init__(self, generate: Callable[..., Awaitable[str]], estimate_tokens: Callable[[str], int],
+                 max_items: int = 20, max_tokens: int = 6000):
+        self.logger = logging.getLogger(__name__)
+        self._generate = generate
+        self._estimate_tokens = estimate_tokens
+        self.max_items = max(1, max_items)
+        self.max_tokens = max(1, max_tokens)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'packed_calls': 0,
+            'items': 0,
+            'items_packed': 0,
+            'single_calls': 0,
+            'items_failed': 0
+        }
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._stats[counter] += amount
+
+    def plan_packs(self, item_texts: List[str], max_items: int = None) -> List[List[int]]:
+        """
+        Group item indices into packs
+
+        Args:
+            item_texts: Rendered items
+            max_items: Per-call override of the item limit
+
+        Returns:
+            List of packs, each a list of item indices in input order
+        """
+        limit = max(1, max_items or self.max_items)
+        packs, current, current_tokens = [], [], 0
+        for index, text in enumerate(item_texts):
+            tokens = self._estimate_tokens(text)
+            if current and (len(current) >= limit or current_tokens + tokens > self.max_tokens):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    async def _run_pack(self, instruction: str, item_texts: List[str], indices: List[int],
+                        output_schema: Dict[str, Any], validator,
+                        generation_kwargs: Dict[str, Any]) -> Tuple[Dict[int, Dict[str, Any]], Optional[str]]:
+        """Run one pack; returns (item index -> result, error if the call itself failed)"""
+        if len(indices) == 1:
+            return {}, None  # a pack of one is just a single call; leave it to the retry path
+
+        prompt = build_packed_prompt(instruction, [item_texts[index] for index in indices], output_schema)
+        self._count('packed_calls')
+        try:
+            response = await self._generate(prompt, **generation_kwargs)
+        except Exception as e:
+            self.logger.warning(f"Packed call for {len(indices)} items failed: {str(e)}")
+            return {}, str(e)
+
+        results = split_packed_response(response, len(indices), output_schema, validator)
+        if len(results) < len(indices):
+            self.logger.info(f"Packed call returned {len(results)}/{len(indices)} valid results")
+        return {indices[position]: result for position, result in results.items()}, None
+
+    async def _run_single(self, instruction: str, item_text: str, output_schema: Dict[str, Any],
+                          validator, generation_kwargs: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        try:
+            response = await self._generate(build_single_prompt(instruction, item_text, output_schema), **generation_kwargs)
+        except Exception as e:
+            return None, str(e)
+
+        parsed = extract_json(response)
+        if not parsed['success']:
+            return None, parsed['error']
+        result = parsed['data']
+        if isinstance(result, dict) and isinstance(result.get('results'), list) and result['results']:
+            result = result['results'][0]
+        if isinstance(result, dict):
+            result.pop('index', None)
+        if not _is_valid(result, output_schema, validator):
+            return None, "Result did not match the expected output"
+        return result, None
+
+    async def run(self, items: List[Any], instruction: str, output_schema: Dict[str, Any],
+                  validator: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                  max_items: int = None, **generation_kwargs) -> List[Dict[str, Any]]:
+        """
+        Run the same instruction over many items
+
+        Args:
+            items: Items to process (strings are used as-is, anything else as compact JSON)
+            instruction: What to do with each item
+            output_schema: Example result object; every key is required in each result
+            validator: Optional extra check per result
+            max_items: Per-call override of the pack size
+            **generation_kwargs: Passed to the generate function
+
+        Returns:
+            One dictionary per item, in input order, with 'success' and either
+            'data' and 'packed' (whether it came from a packed call) or 'error'
+        """
+        if not items:
+            return []
+
+        generation_kwargs.setdefault('response_mime_type', 'application/json')
+        item_texts = [render_compact(item) for item in items]
+        packs = self.plan_packs(item_texts, max_items)
+        self._count('items', len(items))
+
+        pack_results = await asyncio.gather(*[
+            self._run_pack(instruction, item_texts, indices, output_schema, validator, generation_kwargs)
+            for indices in packs
+        ])
+        results = {}
+        call_errors = {}  # item index -> error of its failed pack call
+        for indices, (pack_result, error) in zip(packs, pack_results):
+            results.update(pack_result)
+            if error is not None:
+                call_errors.update({index: error for index in indices})
+        self._count('items_packed', len(results))
+
+        # Retry what answered packs lost or got wrong, one item per call
+        missing = [index for index in range(len(items)) if index not in results and index not in call_errors]
+        retries = await asyncio.gather(*[
+            self._run_single(instruction, item_texts[index], output_schema, validator, generation_kwargs)
+            for index in missing
+        ])
+        self._count('single_calls', len(missing))
+
+        outcomes = [{'success': True, 'data': results[index], 'packed': True} if index in results else None
+                    for index in range(len(items))]
+        for index, (result, error) in zip(missing, retries):
+            if result is not None:
+                outcomes[index] = {'success': True, 'data': result, 'packed': False}
+            else:
+                self._count('items_failed')
+                outcomes[index] = {'success': False, 'error': error}
+        for index, error in call_errors.items():
+            self._count('items_failed')
+            outcomes[index] = {'success': False, 'error': error}
+        return outcomes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get packing statistics
+
+        Returns:
+            Dictionary with packed call and per-item outcome counts
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['items_per_call'] = (
+            round(stats['items'] / (stats['packed_calls'] + stats['single_calls']), 2)
+            if stats['packed_calls'] + stats['single_calls'] else None
+        )
+        return stats
@@ -0,0 +1,276 @@
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller waited longer than allowed for rate-limit budget"""
+    pass
+
+class _ModelBudget:
+    """Sliding-window request/token accounting for a single model"""
+
+    MINUTE = 60.0
+    DAY = 86400.0
+
+    def __init__(self, rpm: int, tpm: int, rpd: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.rpd = rpd
+        self.minute_requests = deque()  # timestamps
+        self.minute_tokens = deque()    # (timestamp, tokens)
+        self.minute_token_total = 0
+        self.day_requests = deque()     # timestamps
+        self.waiters = deque()          # FIFO of tickets
+
+    def prune(self, now: float):
+        while self.minute_requests and now - self.minute_requests[0] >= self.MINUTE:
+            self.minute_requests.popleft()
+        while self.minute_tokens and now - self.minute_tokens[0][0] >= self.MINUTE:
+            self.minute_token_total -= self.minute_tokens.popleft()[1]
+        while self.day_requests and now - self.day_requests[0] >= self.DAY:
+            self.day_requests.popleft()
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until a request of the given size fits, 0 if it fits now"""
+        waits = [0.0]
+
+        if self.rpm and len(self.minute_requests) >= self.rpm:
+            waits.append(self.minute_requests[0] + self.MINUTE - now)
+
+        if self.rpd and len(self.day_requests) >= self.rpd:
+            waits.append(self.day_requests[0] + self.DAY - now)
+
+        # A single oversized request is let through once the window is empty
+        if self.tpm and self.minute_tokens and self.minute_token_total + tokens > self.tpm:
+            excess = self.minute_token_total + tokens - self.tpm
+            freed = 0
+            for stamp, used in self.minute_tokens:
+                freed += used
+                if freed >= excess:
+                    waits.append(stamp + self.MINUTE - now)
+                    break
+
+        return max(waits)
+
+    def record(self, tokens: int, now: float):
+        self.minute_requests.append(now)
+        self.day_requests.append(now)
+        self.add_tokens(tokens, now)
+
+    def add_tokens(self, tokens: int, now: float):
+        if tokens > 0:
+            self.minute_tokens.append((now, tokens))
+            self.minute_token_total += tokens
+
+class RateLimiter:
+    """
+    Process-wide per-model rate limiter enforcing RPM, TPM and RPD budgets
+
+    Callers for the same model are served strictly in arrival order; sync
+    callers block their thread, async callers sleep without blocking the loop.
+    """
+
+    # Upper bound on a single async sleep so queue movement is noticed promptly
+    ASYNC_POLL_INTERVAL = 0.25
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._budgets = {}
+        self._condition = threading.Condition()
+        self._tickets = itertools.count()
+
+    def register_model(self, model: str, limits: Dict[str, Any]):
+        """
+        Register a model's limits (as returned by AIClient.get_model_limits)
+
+        Args:
+            model: Model name
+            limits: Dictionary with rate_limit_rpm, rate_limit_tpm and rate_limit_rpd
+        """
+        with self._condition:
+            if model not in self._budgets:
+                self._budgets[model] = _ModelBudget(
+                    rpm=limits.get('rate_limit_rpm', 0),
+                    tpm=limits.get('rate_limit_tpm', 0),
+                    rpd=limits.get('rate_limit_rpd', 0)
+                )
+
+    def is_registered(self, model: str) -> bool:
+        return model in self._budgets
+
+    def _try_acquire(self, model: str, tokens: int, ticket: int) -> float:
+        """Grant the budget if the ticket is first in line; caller holds the lock"""
+        budget = self._budgets[model]
+        now = time.monotonic()
+        budget.prune(now)
+
+        if budget.waiters[0] != ticket:
+            return self.ASYNC_POLL_INTERVAL
+
+        wait = budget.wait_time(tokens, now)
+        if wait <= 0:
+            budget.waiters.popleft()
+            budget.record(tokens, now)
+            self._condition.notify_all()
+        return max(wait, 0.0)
+
+    def _enqueue(self, model: str) -> int:
+        ticket = next(self._tickets)
+        self._budgets[model].waiters.append(ticket)
+        return ticket
+
+    def _abandon(self, model: str, ticket: int):
+        budget = self._budgets[model]
+        try:
+            budget.waiters.remove(ticket)
+        except ValueError:
+            pass
+        self._condition.notify_all()
+
+    def acquire(self, model: str, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Block the calling thread until the model has budget for one request
+
+        Args:
+            model: Registered model name
+            tokens: Estimated tokens the request will consume
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True once budget is granted
+
+        Raises:
+            RateLimitExceeded: If the timeout elapsed first
+        """
+        if model not in self._budgets:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            ticket = self._enqueue(model)
+            try:
+                while True:
+                    wait = self._try_acquire(model, tokens, ticket)
+                    if wait <= 0:
+                        return True
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitExceeded(f"Rate limit budget for {model} not available within {timeout}s")
+                        wait = min(wait, remaining)
+                    self._condition.wait(wait)
+            except BaseException:
+                # Timeout or interruption (KeyboardInterrupt, SystemExit): give up our place in line
+                if ticket in self._budgets[model].waiters:
+                    self._abandon(model, ticket)
+                raise
+
+    async def aacquire(self, model: str, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Async variant of acquire that sleeps instead of blocking the event loop
+
+        Args:
+            model: Registered model name
+            tokens: Estimated tokens the request will consume
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True once budget is granted
+
+        Raises:
+            RateLimitExceeded: If the timeout elapsed first
+        """
+        if model not in self._budgets:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            ticket = self._enqueue(model)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_acquire(model, tokens, ticket)
+                if wait <= 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RateLimitExceeded(f"Rate limit budget for {model} not available within {timeout}s")
+                    wait = min(wait, remaining)
+                await asyncio.sleep(min(wait, self.ASYNC_POLL_INTERVAL))
+        except BaseException:
+            # Timeout or cancellation: give up our place in line
+            with self._condition:
+                if ticket in self._budgets[model].waiters:
+                    self._abandon(model, ticket)
+            raise
+
+    def has_capacity(self, model: str, tokens: int = 0) -> bool:
+        """
+        Check without waiting whether a request would be admitted right now
+
+        Args:
+            model: Model name
+            tokens: Estimated tokens for the request
+
+        Returns:
+            True if the model has budget and nobody is queued ahead
+        """
+        with self._condition:
+            budget = self._budgets.get(model)
+            if budget is None:
+                return True
+            now = time.monotonic()
+            budget.prune(now)
+            return not budget.waiters and budget.wait_time(tokens, now) <= 0
+
+    def add_tokens(self, model: str, tokens: int):
+        """
+        Charge additional tokens (e.g. the completion) against a model's TPM budget
+
+        Args:
+            model: Model name
+            tokens: Tokens to add
+        """
+        with self._condition:
+            budget = self._budgets.get(model)
+            if budget is not None:
+                budget.add_tokens(tokens, time.monotonic())
+
+    def get_usage(self) -> Dict[str, Any]:
+        """
+        Get current budget usage per model
+
+        Returns:
+            Dictionary keyed by model with window usage, limits and queue depth
+        """
+        usage = {}
+        with self._condition:
+            now = time.monotonic()
+            for model, budget in self._budgets.items():
+                budget.prune(now)
+                usage[model] = {
+                    'requests_last_minute': len(budget.minute_requests),
+                    'rate_limit_rpm': budget.rpm,
+                    'tokens_last_minute': budget.minute_token_total,
+                    'rate_limit_tpm': budget.tpm,
+                    'requests_last_day': len(budget.day_requests),
+                    'rate_limit_rpd': budget.rpd,
+                    'queued': len(budget.waiters)
+                }
+        return usage
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter shared by every AIClient"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
@@ -0,0 +1,290 @@
+import os
+import time
+import json
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from typing import Dict, Any, Optional
+
+class ResponseCache:
+    """
+    Two-tier cache for AI responses: an in-process LRU backed by a SQLite table
+
+    Async code uses aget/aset, which check the LRU on the event loop and hand
+    only the disk tier to a worker thread.
+    """
+
+    TABLE_NAME = "ai_response_cache"
+
+    def __init__(self, max_entries: int = 256, ttl: int = 3600, db_path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.db_path = db_path
+
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'writes': 0,
+            'disk_errors': 0
+        }
+
+        if self.db_path:
+            self._ensure_table()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: Any = None, max_tokens: Any = None, top_p: Any = None,
+                 response_mime_type: str = None) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            model: Model name
+            prompt: Full prompt sent to the model
+            temperature, max_tokens, top_p: Generation parameters
+            response_mime_type: Requested output format, if any
+
+        Returns:
+            SHA-256 hex digest identifying the request
+        """
+        # Plain-text requests keep the key layout they always had
+        fields = [model, prompt, temperature, max_tokens, top_p]
+        if response_mime_type:
+            fields.append(response_mime_type)
+        payload = json.dumps(
+            fields,
+            ensure_ascii=False,
+            separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @contextmanager
+    def _connect(self):
+        """Connection for one transaction, committed on success and always closed"""
+        with closing(sqlite3.connect(self.db_path, timeout=5)) as conn, conn:
+            yield conn
+
+    def _ensure_table(self):
+        """Create the disk tier table if it doesn't exist"""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                        cache_key TEXT PRIMARY KEY,
+                        response TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+        except Exception as e:
+            self.logger.warning(f"Disabling disk response cache: {str(e)}")
+            self.db_path = None
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return bool(self.ttl) and (time.time() - stored_at) > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached response or None on miss
+        """
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        return self._record_disk_lookup(key, self._disk_get(key))
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Async get: the LRU is checked on the event loop, a disk lookup runs
+        on a worker thread
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached response or None on miss
+        """
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        disk_value = await asyncio.to_thread(self._disk_get, key) if self.db_path else None
+        return self._record_disk_lookup(key, disk_value)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if not self._is_expired(stored_at):
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                self._stats['memory_hits'] += 1
+                return value
+            del self._entries[key]
+            self._stats['expirations'] += 1
+        return None
+
+    def _record_disk_lookup(self, key: str, value: Optional[str]) -> Optional[str]:
+        """Count a disk tier lookup and promote a hit into the LRU"""
+        with self._lock:
+            if value is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            self._stats['disk_hits'] += 1
+            self._store_in_memory(key, value, time.time())
+        return value
+
+    def set(self, key: str, value: str):
+        """
+        Store a response in both tiers
+
+        Args:
+            key: Cache key from make_key
+            value: Response text
+        """
+        self._disk_set(key, value, self._memory_set(key, value))
+
+    async def aset(self, key: str, value: str):
+        """
+        Async set: the LRU is updated on the event loop, the disk write runs
+        on a worker thread
+
+        Args:
+            key: Cache key from make_key
+            value: Response text
+        """
+        stored_at = self._memory_set(key, value)
+        if self.db_path:
+            await asyncio.to_thread(self._disk_set, key, value, stored_at)
+
+    def _memory_set(self, key: str, value: str) -> float:
+        stored_at = time.time()
+        with self._lock:
+            self._store_in_memory(key, value, stored_at)
+            self._stats['writes'] += 1
+        return stored_at
+
+    def _store_in_memory(self, key: str, value: str, stored_at: float):
+        """Insert into the LRU; caller holds the lock"""
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT response, created_at FROM {self.TABLE_NAME} WHERE cache_key = ?",
+                    (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if self._is_expired(row[1]):
+                    conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE cache_key = ?", (key,))
+                    with self._lock:
+                        self._stats['expirations'] += 1
+                    return None
+                return row[0]
+        except Exception as e:
+            self.logger.warning(f"Disk cache read failed: {str(e)}")
+            with self._lock:
+                self._stats['disk_errors'] += 1
+            return None
+
+    def _disk_set(self, key: str, value: str, stored_at: float):
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.TABLE_NAME} (cache_key, response, created_at) VALUES (?, ?, ?)",
+                    (key, value, stored_at)
+                )
+        except Exception as e:
+            self.logger.warning(f"Disk cache write failed: {str(e)}")
+            with self._lock:
+                self._stats['disk_errors'] += 1
+
+    def invalidate(self, key: str):
+        """Remove a single entry from both tiers"""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE cache_key = ?", (key,))
+            except Exception as e:
+                self.logger.warning(f"Disk cache delete failed: {str(e)}")
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(f"DELETE FROM {self.TABLE_NAME}")
+            except Exception as e:
+                self.logger.warning(f"Disk cache clear failed: {str(e)}")
+
+    def prune_expired(self) -> int:
+        """
+        Delete expired rows from the disk tier
+
+        Returns:
+            Number of rows removed
+        """
+        if not self.db_path or not self.ttl:
+            return 0
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    f"DELETE FROM {self.TABLE_NAME} WHERE created_at < ?",
+                    (time.time() - self.ttl,)
+                )
+                removed = cursor.rowcount
+            with self._lock:
+                self._stats['expirations'] += removed
+            return removed
+        except Exception as e:
+            self.logger.warning(f"Disk cache prune failed: {str(e)}")
+            return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit/miss/eviction counters and sizes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        stats['disk_enabled'] = bool(self.db_path)
+        return stats
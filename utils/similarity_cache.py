@@ -0,0 +1,210 @@
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# Volatile values that make otherwise identical prompts differ, most specific first
+_VOLATILE_PATTERNS = [
+    # key/value pairs for identifiers and timestamps, in JSON, dict repr or prose
+    (re.compile(r"""(["']?\b(?:request_id|task_id|workflow_id|session_id|timestamp|created_at|updated_at)\b["']?\s*[:=]\s*)(["']?)[^"',}\s]+\2""", re.IGNORECASE), r"\1<v>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?\b"), "<ts>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<id>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}\b"), "<date>"),
+    (re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?\b"), "<time>"),
+    # hex-looking tokens of 8+ characters with at least one digit and one letter
+    (re.compile(r"\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{8,}\b", re.IGNORECASE), "<hex>")
+]
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+
+def normalize_prompt(prompt: str) -> str:
+    """Replace timestamps, ids and other volatile values with placeholders"""
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        prompt = pattern.sub(replacement, prompt)
+    return prompt.lower()
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles
+
+    Each shingle is hashed once to 64 bits; num_perm universal hash
+    permutations are applied with vectorized numpy arithmetic.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        tokens = _WORD.findall(text)
+        size = self.shingle_size
+        if len(tokens) <= size:
+            shingles = {" ".join(tokens)}
+        else:
+            shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        return np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        ) >> np.uint64(3)  # keep values below the 61-bit prime
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a (normalized) text
+
+        Args:
+            text: Text to sign
+
+        Returns:
+            Array of num_perm unsigned 64-bit minimums
+        """
+        hashes = self._shingle_hashes(text)
+        # (a * x + b) mod p, with wrap-around multiplication; good enough mixing
+        # for similarity estimation and far cheaper than exact modular products
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_61
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(left: np.ndarray, right: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the texts behind two signatures"""
+        return float(np.mean(left == right))
+
+class SimilarityCache:
+    """
+    Near-duplicate response cache over MinHash signatures with an LSH index
+
+    Prompts are normalized (timestamps, request ids, uuids and similar values
+    replaced), signed with MinHash and bucketed by signature bands. A lookup
+    only compares against entries sharing at least one band, in the same
+    namespace (model and generation parameters), and serves the most similar
+    one at or above the caller's threshold.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 3600, num_perm: int = 128, bands: int = 32):
+        self.logger = logging.getLogger(__name__)
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+
+        self._entries = OrderedDict()  # entry id -> (namespace, signature, band keys, response, stored_at)
+        self._buckets = defaultdict(set)  # band key -> entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._agent_stats = defaultdict(lambda: {'lookups': 0, 'hits': 0, 'stores': 0})
+        self._stats = {'evictions': 0, 'expirations': 0}
+
+    def _band_keys(self, namespace: str, signature: np.ndarray):
+        return [
+            (namespace, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _remove(self, entry_id: int):
+        """Drop an entry and its bucket memberships; caller holds the lock"""
+        _, _, band_keys, _, _ = self._entries.pop(entry_id)
+        for key in band_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def lookup(self, namespace: str, prompt: str, threshold: float, agent: str = None) -> Optional[Tuple[str, float]]:
+        """
+        Find a cached response for a near-duplicate prompt
+
+        Args:
+            namespace: Model / generation parameter scope
+            prompt: Prompt text (normalized here)
+            threshold: Minimum estimated similarity, 0-1
+            agent: Agent name for hit-rate reporting
+
+        Returns:
+            (response, similarity) or None on miss
+        """
+        signature = self.hasher.signature(normalize_prompt(prompt))
+        now = time.time()
+        best_id, best_similarity = None, threshold
+
+        with self._lock:
+            self._agent_stats[agent or 'unattributed']['lookups'] += 1
+            candidates = set()
+            for key in self._band_keys(namespace, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            for entry_id in candidates:
+                _, entry_signature, _, _, stored_at = self._entries[entry_id]
+                if self.ttl and now - stored_at > self.ttl:
+                    self._remove(entry_id)
+                    self._stats['expirations'] += 1
+                    continue
+                similarity = self.hasher.similarity(signature, entry_signature)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None:
+                return None
+            self._entries.move_to_end(best_id)
+            self._agent_stats[agent or 'unattributed']['hits'] += 1
+            return self._entries[best_id][3], best_similarity
+
+    def store(self, namespace: str, prompt: str, response: str, agent: str = None):
+        """
+        Index a response under its prompt's signature
+
+        Args:
+            namespace: Model / generation parameter scope
+            prompt: Prompt text (normalized here)
+            response: Response to serve for near-duplicates
+            agent: Agent name for reporting
+        """
+        signature = self.hasher.signature(normalize_prompt(prompt))
+        band_keys = self._band_keys(namespace, signature)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (namespace, signature, band_keys, response, time.time())
+            for key in band_keys:
+                self._buckets[key].add(entry_id)
+            self._agent_stats[agent or 'unattributed']['stores'] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-agent hit rates and index size
+
+        Returns:
+            Dictionary with entry count, evictions and per-agent lookups/hits/hit_rate
+        """
+        with self._lock:
+            by_agent = {
+                agent: {
+                    **stats,
+                    'hit_rate': round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else None
+                }
+                for agent, stats in self._agent_stats.items()
+            }
+            return {
+                'entries': len(self._entries),
+                'buckets': len(self._buckets),
+                **self._stats,
+                'by_agent': by_agent
+            }
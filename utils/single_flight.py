@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Awaitable
+
+class LeaderAbandoned(Exception):
+    """The leader of a coalesced call was cancelled before finishing"""
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one underlying execution
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait for the same result or exception. In-flight
+    calls are tracked with concurrent.futures.Future so sharing works across
+    threads as well as across asyncio tasks on any event loop. If the leader
+    is cancelled, its followers elect a new leader and run the work again.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'executions': 0,
+            'coalesced': 0
+        }
+
+    def _join_or_lead(self, key: str):
+        """Return (future, is_leader) for a key"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self._stats['executions'] += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an async call once per key among concurrent callers
+
+        Args:
+            key: Identity of the request
+            func: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            Result of the shared execution
+        """
+        future, is_leader = self._join_or_lead(key)
+
+        while not is_leader:
+            try:
+                # Shield so a cancelled follower doesn't cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except LeaderAbandoned:
+                future, is_leader = self._join_or_lead(key)
+
+        try:
+            result = await func()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # Cancellation or interpreter shutdown: let a follower take over
+            self._finish(key, future, error=LeaderAbandoned("Coalesced request was abandoned by its leader"))
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run a blocking call once per key among concurrent callers
+
+        Args:
+            key: Identity of the request
+            func: Zero-argument callable to run
+
+        Returns:
+            Result of the shared execution
+        """
+        future, is_leader = self._join_or_lead(key)
+
+        while not is_leader:
+            try:
+                return future.result()
+            except LeaderAbandoned:
+                future, is_leader = self._join_or_lead(key)
+
+        try:
+            result = func()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._finish(key, future, error=LeaderAbandoned("Coalesced request was abandoned by its leader"))
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters
+
+        Returns:
+            Dictionary with executions, coalesced calls and current in-flight keys
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._inflight)
+        return stats
+
+_shared_single_flight = None
+_shared_single_flight_lock = threading.Lock()
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide request coalescer shared by every AIClient"""
+    global _shared_single_flight
+    with _shared_single_flight_lock:
+        if _shared_single_flight is None:
+            _shared_single_flight = SingleFlight()
+        return _shared_single_flight
@@ -0,0 +1,268 @@
+import re
+import json
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable
+
+class TokenEstimator(ABC):
+    """Base interface for token counters"""
+
+    name = "base"
+    # True when count() may block on I/O, so async callers run it off the event loop
+    remote = False
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Count the tokens a model would see for some text
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Token count, 0 for empty text
+        """
+        pass
+
+class HeuristicTokenEstimator(TokenEstimator):
+    """
+    Offline approximation of subword tokenizers
+
+    Words count as one token plus one per 7 characters, digit runs as one
+    token per 3 digits, and each punctuation mark, newline or indentation
+    run as one token. Much closer than len//4 on JSON-heavy prompts, where
+    braces, quotes and indentation dominate.
+    """
+
+    name = "heuristic"
+
+    _PIECES = re.compile(r"[^\W\d_]+|\d+|\n| {2,}|[^\w\s]")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokens = 0
+        for match in self._PIECES.finditer(text):
+            piece = match.group()
+            first = piece[0]
+            if first.isalpha():
+                tokens += 1 + len(piece) // 7
+            elif first.isdigit():
+                tokens += (len(piece) + 2) // 3
+            else:
+                tokens += 1
+        return tokens
+
+class TiktokenEstimator(TokenEstimator):
+    """BPE-backed estimator using tiktoken (optional dependency)"""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        import tiktoken
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+class GeminiTokenEstimator(TokenEstimator):
+    """
+    Exact counts from Gemini's count_tokens endpoint, memoized by content hash
+
+    Each uncached count is a network round-trip, so errors fall back to the
+    heuristic rather than failing the caller.
+    """
+
+    name = "gemini"
+    remote = True
+
+    def __init__(self, genai_module, model: str, max_entries: int = 1024):
+        self.logger = logging.getLogger(__name__)
+        self._model = genai_module.GenerativeModel(model)
+        self._fallback = HeuristicTokenEstimator()
+        self._memo = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        try:
+            tokens = self._model.count_tokens(text).total_tokens
+        except Exception as e:
+            self.logger.warning(f"count_tokens failed, using heuristic: {str(e)}")
+            return self._fallback.count(text)
+        with self._lock:
+            self._memo[key] = tokens
+            while len(self._memo) > self._max_entries:
+                self._memo.popitem(last=False)
+        return tokens
+
+def create_token_estimator(kind: str = "heuristic", genai_module=None, model: str = None) -> TokenEstimator:
+    """
+    Build a token estimator, falling back to the heuristic if the requested
+    backend is unavailable
+
+    Args:
+        kind: 'heuristic', 'tiktoken' or 'gemini'
+        genai_module: Configured google.generativeai module (for 'gemini')
+        model: Model name (for 'gemini')
+
+    Returns:
+        TokenEstimator instance
+    """
+    logger = logging.getLogger(__name__)
+    kind = (kind or "heuristic").lower()
+
+    try:
+        if kind == "tiktoken":
+            return TiktokenEstimator()
+        if kind == "gemini" and genai_module is not None and model:
+            return GeminiTokenEstimator(genai_module, model)
+    except Exception as e:
+        logger.warning(f"Token estimator '{kind}' unavailable, using heuristic: {str(e)}")
+
+    return HeuristicTokenEstimator()
+
+@dataclass
+class PromptSection:
+    """A named block of prompt context that may be trimmed to fit a budget"""
+    name: str
+    content: Any
+    priority: int = 0          # higher priorities are trimmed last
+    required: bool = False     # required sections are never trimmed
+
+def render_compact(content: Any) -> str:
+    """Serialize context compactly: strings as-is, everything else as minified JSON"""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=str)
+
+class PromptBudget:
+    """
+    Fits prompt context sections into a token budget
+
+    Sections are serialized compactly first. If they still exceed the budget,
+    the lowest-priority sections are shrunk (lists lose trailing items, text is
+    truncated, or an optional summarizer condenses them) and finally omitted.
+    """
+
+    # Below this many tokens a trimmed section is dropped instead
+    MIN_SECTION_TOKENS = 16
+    OMITTED = "[omitted to fit token budget]"
+
+    def __init__(self, estimator: TokenEstimator, summarizer: Optional[Callable[[str, int], str]] = None):
+        self.estimator = estimator
+        self.summarizer = summarizer
+        # Local counter for the many probes of a trimming search; the
+        # configured estimator only counts the final text
+        self._probe = HeuristicTokenEstimator()
+
+    def fit(self, sections: List[PromptSection], budget: int) -> Dict[str, Any]:
+        """
+        Fit sections into the budget
+
+        Args:
+            sections: Context sections
+            budget: Maximum total tokens for all sections
+
+        Returns:
+            Dictionary with rendered 'sections' (name -> text), 'total_tokens',
+            'original_tokens', 'budget', and the names that were 'trimmed' or 'dropped'
+        """
+        rendered = {}
+        tokens = {}
+        for section in sections:
+            rendered[section.name] = render_compact(section.content)
+            tokens[section.name] = self.estimator.count(rendered[section.name])
+
+        original_tokens = sum(tokens.values())
+        total = original_tokens
+        trimmed, dropped = [], []
+
+        trimmable = sorted(
+            (section for section in sections if not section.required),
+            key=lambda section: section.priority
+        )
+        for section in trimmable:
+            if total <= budget:
+                break
+            excess = total - budget
+            target = tokens[section.name] - excess
+
+            if target >= self.MIN_SECTION_TOKENS:
+                text = self._shrink(section.content, rendered[section.name], target, tokens[section.name])
+                trimmed.append(section.name)
+            else:
+                text = self.OMITTED
+                dropped.append(section.name)
+
+            new_tokens = self.estimator.count(text)
+            total += new_tokens - tokens[section.name]
+            rendered[section.name] = text
+            tokens[section.name] = new_tokens
+
+        return {
+            'sections': rendered,
+            'total_tokens': total,
+            'original_tokens': original_tokens,
+            'budget': budget,
+            'within_budget': total <= budget,
+            'trimmed': trimmed,
+            'dropped': dropped
+        }
+
+    def _shrink(self, content: Any, text: str, target: int, tokens: int) -> str:
+        """Reduce one section of the given size to roughly target tokens"""
+        if self.summarizer:
+            try:
+                return self.summarizer(text, target)
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Summarizer failed, truncating instead: {str(e)}")
+
+        # Search in probe tokens, rescaled to this section's exact count
+        probe_tokens = self._probe.count(text)
+        if tokens and probe_tokens:
+            target = max(int(target * probe_tokens / tokens), 1)
+
+        if isinstance(content, list) and len(content) > 1:
+            return self._shrink_list(content, target)
+        return self._truncate_text(text, target)
+
+    def _shrink_list(self, items: list, target: int) -> str:
+        """Keep the longest prefix of the list that fits"""
+        low, high = 0, len(items)
+        while low < high:
+            middle = (low + high + 1) // 2
+            candidate = render_compact(items[:middle] + [f"... {len(items) - middle} more items"])
+            if self._probe.count(candidate) <= target:
+                low = middle
+            else:
+                high = middle - 1
+        if low == 0:
+            return self._truncate_text(render_compact(items), target)
+        return render_compact(items[:low] + [f"... {len(items) - low} more items"])
+
+    def _truncate_text(self, text: str, target: int) -> str:
+        """Cut text to roughly target tokens, keeping the head"""
+        marker = " ...[truncated]"
+        budget = max(target - self._probe.count(marker), 1)
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._probe.count(text[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low] + marker